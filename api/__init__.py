@@ -2,6 +2,9 @@ from .expenses import register_routes as register_expenses
 from .incomes import register_routes as register_incomes
 from .savings import register_routes as register_savings
 from .summary import register_routes as register_summary
+from .export import register_routes as register_export
+from .imports import register_routes as register_imports
+from .metrics import register_routes as register_metrics
 from .auth import register_routes as register_auth
 
 def register_routes(api):
@@ -9,4 +12,7 @@ def register_routes(api):
     register_incomes(api)
     register_savings(api)
     register_summary(api)
+    register_export(api)
+    register_imports(api)
+    register_metrics(api)
     register_auth(api)
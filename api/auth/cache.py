@@ -0,0 +1,38 @@
+from sqlalchemy.orm import make_transient_to_detached
+
+from database import db
+
+from ..cache import TTLCache
+from .model import User
+
+
+identity_cache = TTLCache()
+
+
+def get_user(key, loader):
+    """Return the user cached under `key`, calling `loader` on a miss.
+
+    The cache holds detached copies, which are merged into the current
+    session without a query, so no request shares instances with another.
+    """
+    snapshot = identity_cache.get(key)
+    if snapshot is not None:
+        return db.session.merge(snapshot, load=False)
+
+    user = loader()
+    if user is not None:
+        snapshot = _snapshot(user)
+        identity_cache.set(('id', user.id), snapshot)
+        identity_cache.set(key, snapshot)
+    return user
+
+
+def invalidate_user(user_id: int):
+    identity_cache.invalidate_where(lambda key, user: user.id == user_id)
+
+
+def _snapshot(user: User):
+    columns = db.inspect(User).column_attrs
+    snapshot = User(**{column.key: getattr(user, column.key) for column in columns})
+    make_transient_to_detached(snapshot)
+    return snapshot
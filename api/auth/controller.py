@@ -1,7 +1,7 @@
 from flask import request
 from flask_restx import Resource, Namespace
 from flask_accepts import accepts, responds
-from flask_login import login_user, current_user, login_required
+from flask_login import login_user, logout_user, current_user, login_required
 
 from app import api
 from ..utils import make_json_response
@@ -32,6 +32,14 @@ class UserResource(Resource):
         user_id = current_user.id
         return AuthService.update_profile(request.parsed_obj, user_id=user_id)
 
+    @responds(status_code=204, api=api)
+    @api.response(204, "User successfully deactivated.")
+    @login_required
+    def delete(self):
+        user_id = current_user.id
+        logout_user()
+        AuthService.deactivate(user_id)
+
 
 @api.route('/login')
 class UserLoginResource(Resource):
@@ -1,4 +1,8 @@
 import bcrypt
+import hashlib
+import uuid
+
+from datetime import datetime
 
 from flask_login import UserMixin
 
@@ -10,11 +14,15 @@ class User(db.Model, UserMixin):
     username = db.Column(db.String(25), nullable=False, unique=True)
     _password_hash = db.Column(db.String(255))
     active = db.Column(db.Boolean, nullable=False, default=True)
-    token = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(255))
     first_name = db.Column(db.String(25))
     last_name = db.Column(db.String(25))
 
+    api_tokens = db.relationship(
+        'ApiToken', backref='user', cascade="all,delete", passive_deletes=True,
+        order_by='ApiToken.id', lazy=True
+    )
+
     @property
     def name(self):
         if self.first_name and self.last_name:
@@ -33,5 +41,31 @@ class User(db.Model, UserMixin):
         password_hash = bcrypt.hashpw(password.encode('utf8'), bcrypt.gensalt())
         self._password_hash = password_hash.decode('utf8')
 
+    @property
+    def token(self):
+        # Only the digest is stored, so the token is known right after it is issued.
+        return getattr(self, '_issued_token', None)
+
+    def issue_token(self):
+        """Add a new API token to the user's, returning it."""
+        self._issued_token = uuid.uuid4().hex
+        self.api_tokens.append(ApiToken(token_hash=User.hash_token(self._issued_token)))
+        return self._issued_token
+
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode('utf8')).hexdigest()
+
     def authenticate(self, password):
         return bcrypt.checkpw(password=password.encode('utf8'), hashed_password=self._password_hash.encode('utf8'))
+
+
+class ApiToken(db.Model):
+    """A user's API key, as a SHA-256 digest. A user holds one per client
+    logged in, so logging in again does not log the other clients out."""
+    __tablename__ = 'api_token'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
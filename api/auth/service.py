@@ -1,14 +1,20 @@
-import uuid
+import hmac
 
 from flask_login import login_user
 
 from database import db
 
 from .exception import UsernameAlreadyExistsException, LoginException, UserNotFoundException
+from .cache import invalidate_user
 from .model import *
 from .interface import CreateUserInterface, UpdateUserInterface
 
 
+# Tokens of the clients a user logged in from; the oldest one past this
+# number is revoked on login.
+MAX_API_TOKENS = 10
+
+
 class AuthService:
     @staticmethod
     def signup(data: CreateUserInterface):
@@ -17,7 +23,7 @@ class AuthService:
         if is_username_valid:
             new_user = User(username=data['username'])
             new_user.password_hash = data['password']
-            new_user.token = uuid.uuid4().hex
+            new_user.issue_token()
 
             db.session.add(new_user)
             db.session.commit()
@@ -28,9 +34,29 @@ class AuthService:
     @staticmethod
     def login(data: CreateUserInterface):
         user = User.query.filter(User.username == data['username']).first()
-        if user.authenticate(data['password']):
-            return user
-        raise LoginException
+        if not user or not user.active or not user.authenticate(data['password']):
+            raise LoginException
+
+        # Tokens are stored hashed, so the existing ones cannot be handed out
+        # again: each login gets its own, next to those of the other clients.
+        user.issue_token()
+        revoked = user.api_tokens[:-MAX_API_TOKENS]
+        for api_token in revoked:
+            db.session.delete(api_token)
+        db.session.add(user)
+        db.session.commit()
+        if revoked:
+            invalidate_user(user.id)
+        return user
+
+    @staticmethod
+    def get_by_token_hash(token_hash: str):
+        row = db.session.query(User, ApiToken.token_hash).join(
+            ApiToken, ApiToken.user_id == User.id
+        ).filter(ApiToken.token_hash == token_hash).first()
+        if row and hmac.compare_digest(row.token_hash, token_hash):
+            return row.User
+        return None
 
     @staticmethod
     def update_profile(data: UpdateUserInterface, user_id: int):
@@ -45,9 +71,24 @@ class AuthService:
                 setattr(user, key, value)
             db.session.add(user)
             db.session.commit()
+            invalidate_user(user_id)
             
         return User.query.get(user_id)
 
+    @staticmethod
+    def deactivate(user_id: int):
+        user = User.query.get(user_id)
+
+        if not user:
+            raise UserNotFoundException
+
+        user.active = False
+        db.session.add(user)
+        db.session.commit()
+        invalidate_user(user_id)
+
+        return user
+
     @staticmethod
     def _validate_username(username: str, user_id: int = 0):
         user = User.query.filter(User.username == username).first()
@@ -0,0 +1,210 @@
+import threading
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being set.
+
+    Entries set with `stale_after` are still served until they expire, but
+    `lookup` reports them as stale once that many seconds have passed.
+
+    Invalidating a key also bumps its generation, so a value computed before
+    the invalidation is not stored by a `set` given the earlier `generation`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._counter = 0
+        self._epoch = 0
+        self._generations = {}
+        self.configure(maxsize=maxsize, ttl=ttl)
+
+    def configure(self, maxsize: int, ttl: float):
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self.clear()
+
+    def get(self, key, default=None):
+        return self.lookup(key, default)[0]
+
+    def lookup(self, key, default=None):
+        """Return `(value, stale)` for `key`, or `(default, False)` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default, False
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            stale = entry[2] <= now
+            if stale:
+                self.stale_hits += 1
+            return entry[0], stale
+
+    def peek(self, key, default=None):
+        """Like `get`, but leaves the counters and the LRU order alone."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return default
+            return entry[0]
+
+    def generation(self, key):
+        """Current generation of `key`, to pass to `set` when it stores a
+        value computed from now on."""
+        with self._lock:
+            return max(self._generations.get(key, 0), self._epoch)
+
+    def set(self, key, value, ttl: float = None, stale_after: float = None, generation=None) -> bool:
+        """Store `value`, unless `key` was invalidated since `generation`
+        was taken; returns whether it was stored."""
+        now = time.monotonic()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        stale_at = expires_at if stale_after is None else min(now + stale_after, expires_at)
+        with self._lock:
+            if generation is not None and generation != self.generation(key):
+                return False
+            self._entries[key] = (value, expires_at, stale_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._counter += 1
+            if len(self._generations) < self.maxsize:
+                self._generations[key] = self._counter
+            else:
+                self._bump_epoch()
+
+    def invalidate_where(self, predicate):
+        """Drop every entry for which `predicate(key, value)` is true."""
+        with self._lock:
+            keys = [key for key, (value, *_) in self._entries.items() if predicate(key, value)]
+            for key in keys:
+                del self._entries[key]
+            # Keys being computed are not in the cache yet: bump them all.
+            self._counter += 1
+            self._bump_epoch()
+            return len(keys)
+
+    def _bump_epoch(self):
+        # Every key's generation becomes the epoch, so the per key ones can go.
+        self._epoch = self._counter
+        self._generations.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counter += 1
+            self._bump_epoch()
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+            self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'stale_hits': self.stale_hits,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+            }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs `fn`; callers arriving while it is in flight
+    wait for it and receive the same result, or the same exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._calls
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BackgroundRefresher:
+    """Runs refresh callables on a small thread pool inside an app context.
+
+    At most one refresh per key is pending at a time; failures are logged and
+    leave the cached value in place.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cache-refresh')
+
+    def submit(self, key, fn):
+        """Schedule `fn`, returning its future, or None if `key` is already pending."""
+        with self._lock:
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+
+        app = current_app._get_current_object()
+        return self._executor.submit(self._run, app, key, fn)
+
+    def _run(self, app, key, fn):
+        try:
+            with app.app_context():
+                fn()
+        except Exception:
+            app.logger.exception("Background refresh of %r failed", key)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
@@ -4,9 +4,11 @@ from flask_accepts import accepts, responds
 from flask_login import login_required, current_user
 
 from app import api
+from ..pagination import InvalidPageException, page_args
 from ..utils import make_json_response
 
 from .exceptions import (
+    ExpenseAlreadyExistsException,
     ExpenseNotFoundException,
     ExpenseTypeNotFoundException,
 )
@@ -19,6 +21,8 @@ from .schema import (
     ExpenseTypeAcceptSchema,
     ExpenseInputSchema,
     ExpenseReturnSchema,
+    ExpensePageSchema,
+    ExpenseTypePageSchema,
 )
 
 api = Namespace("Expenses", description="Access to your Expenses")
@@ -28,19 +32,31 @@ api = Namespace("Expenses", description="Access to your Expenses")
 
 @api.route('/')
 class ExpenseResource(Resource):
-    @responds(schema=ExpenseReturnSchema(many=True), api=api)
+    @accepts(*page_args(), api=api)
+    @responds(schema=ExpensePageSchema, api=api)
     @api.response(200, "Expenses successfully retrieved.")
     @login_required
     def get(self):
         user_id = current_user.id
-        return ExpenseService.get_all(user_id=user_id)
+        args = request.parsed_args
+        if args['all']:
+            expenses = ExpenseService.get_all(user_id=user_id)
+            return make_json_response(data=ExpenseReturnSchema(many=True).dump(expenses), code=200)
+        try:
+            return ExpenseService.get_page(user_id=user_id, limit=args['limit'], cursor=args['cursor'])
+        except InvalidPageException:
+            return make_json_response(data={"code": 400, "message": "Invalid page"}, code=400)
 
     @accepts(schema=ExpenseInputSchema, api=api)
     @responds(schema=ExpenseReturnSchema, api=api)
     @api.response(200, "Expense successfully added.")
     @login_required
     def post(self):
-        new_expense = ExpenseService.create(data=request.parsed_obj)
+        user_id = current_user.id
+        try:
+            new_expense = ExpenseService.create(data=request.parsed_obj, user_id=user_id)
+        except ExpenseTypeNotFoundException:
+            return make_json_response(data={"code": 404, "message": "Expense Type not found"}, code=404)
         return make_json_response(data=ExpenseReturnSchema().dump(new_expense), code=201)
 
 
@@ -66,6 +82,10 @@ class ExpenseIdResource(Resource):
             return ExpenseService.update(id=expenseId, data=request.parsed_obj, user_id=user_id)
         except ExpenseNotFoundException:
             return make_json_response(data={"code": 404, "message": "Expense not found"}, code=404)
+        except ExpenseTypeNotFoundException:
+            return make_json_response(data={"code": 404, "message": "Expense Type not found"}, code=404)
+        except ExpenseAlreadyExistsException:
+            return make_json_response(data={"code": 409, "message": "Expense already exists"}, code=409)
 
     @responds(status_code=204, api=api)
     @api.response(204, "Expense successfully removed.")
@@ -100,12 +120,20 @@ class ExpenseListResource(Resource):
 
 @api.route('/type')
 class ExpenseTypeResource(Resource):
-    @responds(schema=ExpenseTypeReturnSchema(many=True), api=api)
+    @accepts(*page_args(), api=api)
+    @responds(schema=ExpenseTypePageSchema, api=api)
     @api.response(200, "Expense types successfully retrieved.")
     @login_required
     def get(self):
         user_id = current_user.id
-        return ExpenseTypeService.get_all(user_id=user_id)
+        args = request.parsed_args
+        if args['all']:
+            expense_types = ExpenseTypeService.get_all(user_id=user_id)
+            return make_json_response(data=ExpenseTypeReturnSchema(many=True).dump(expense_types), code=200)
+        try:
+            return ExpenseTypeService.get_page(user_id=user_id, limit=args['limit'], cursor=args['cursor'])
+        except InvalidPageException:
+            return make_json_response(data={"code": 400, "message": "Invalid page"}, code=400)
 
     @accepts(schema=ExpenseTypeAcceptSchema, api=api)
     @responds(schema=ExpenseTypeReturnSchema, api=api)
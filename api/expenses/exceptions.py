@@ -5,4 +5,9 @@ class ExpenseTypeNotFoundException(Exception):
 
 class ExpenseNotFoundException(Exception):
     def __init__(self, message="Expense not found"):
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+
+class ExpenseAlreadyExistsException(Exception):
+    def __init__(self, message="Expense already exists"):
+        super().__init__(message)
@@ -35,3 +35,4 @@ class ExpenseReturnInterface(TypedDict):
     year: int
     paid: bool
     category: str
+    virtual: bool
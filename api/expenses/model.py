@@ -1,11 +1,13 @@
 import enum
 
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import validates
 
 from database import db
 from datetime import datetime
 
 from ..auth.model import User
+from ..utils import period_default, sync_period
 
 
 class ExpenseCategoryEnum(enum.Enum):
@@ -18,6 +20,10 @@ class ExpenseCategoryEnum(enum.Enum):
 
 
 class ExpenseType(db.Model):
+    __table_args__ = (
+        db.Index('ix_expense_type_user_id_category', 'user_id', 'category'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
     category = db.Column(db.Enum(ExpenseCategoryEnum), nullable=False, default=ExpenseCategoryEnum.PERSONAL.value)
@@ -26,7 +32,7 @@ class ExpenseType(db.Model):
     end_date = db.Column(db.Date, nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
-    expense_values = db.relationship('Expense', backref='expense_type', cascade="all,delete", lazy=True)
+    expense_values = db.relationship('Expense', backref='expense_type', cascade="all,delete", passive_deletes=True, lazy=True)
     user = db.relationship('User', backref='expense_type')
 
     @property
@@ -35,13 +41,23 @@ class ExpenseType(db.Model):
 
 
 class Expense(db.Model):
+    __table_args__ = (
+        db.Index('uq_expense_type_id_year_month', 'type_id', 'year', 'month', unique=True),
+        db.Index('ix_expense_type_id_period', 'type_id', 'period'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.Numeric(precision=10, scale=2), nullable=False)
     month = db.Column(db.Integer, nullable=False, default=datetime.today().month)
     year = db.Column(db.Integer, nullable=False, default=datetime.today().year)
-    type_id = db.Column(db.Integer, db.ForeignKey('expense_type.id'), nullable=False)
+    period = db.Column(db.Integer, nullable=False, default=period_default)
+    type_id = db.Column(db.Integer, db.ForeignKey('expense_type.id', ondelete='CASCADE'), nullable=False)
     paid = db.Column(db.Boolean, default=False)
 
+    @validates('year', 'month')
+    def _sync_period(self, key, value):
+        return sync_period(self, key, value)
+
     @property
     def type_name(self):
         return self.expense_type.name
@@ -18,6 +18,12 @@ class ExpenseReturnSchema(Schema):
     paid = fields.Boolean(attribute="paid")
     typeName = fields.String(attribute="type_name")
     category = fields.String(attribute="category")
+    virtual = fields.Boolean(attribute="virtual", dump_default=False)
+
+
+class ExpensePageSchema(Schema):
+    items = fields.List(fields.Nested(ExpenseReturnSchema), attribute="items")
+    nextCursor = fields.String(attribute="next_cursor", allow_none=True)
 
 
 class ExpenseTypeReturnSchema(Schema):
@@ -28,6 +34,13 @@ class ExpenseTypeReturnSchema(Schema):
     baseValue = fields.Float(attribute="base_value")
     endDate = fields.Date(attribute="end_date", required=False, allow_none=True)
     expenseValues = fields.List(fields.Nested(ExpenseReturnSchema), required=False, attribute="expense_values")
+    updatedValues = fields.Integer(attribute="updated_values", required=False)
+
+
+class ExpenseTypePageSchema(Schema):
+    # Without the values: those are paged by the value list endpoint.
+    items = fields.List(fields.Nested(ExpenseTypeReturnSchema, exclude=('expenseValues',)), attribute="items")
+    nextCursor = fields.String(attribute="next_cursor", allow_none=True)
 
 
 class ExpenseInputSchema(Schema):
@@ -1,9 +1,17 @@
 import datetime
 
+from sqlalchemy.dialects import mysql
+
 from database import db
 
+from ..pagination import paginate
+from ..summary import cache as summary_cache
+from ..summary.read_model import EXPENSE, LedgerService, MonthlySummaryService
+from ..utils import to_period
+
 from .model import *
 from .exceptions import (
+    ExpenseAlreadyExistsException,
     ExpenseNotFoundException, 
     ExpenseTypeNotFoundException,
 )
@@ -17,7 +25,18 @@ from .interface import (
 class ExpenseTypeService:
     @staticmethod
     def get_all(user_id: int):
-        return ExpenseType.query.filter(ExpenseType.user_id == user_id).all()
+        return ExpenseType.query.options(db.selectinload(ExpenseType.expense_values)).filter(
+            ExpenseType.user_id == user_id
+        ).all()
+
+    @staticmethod
+    def get_page(user_id: int, limit: int = None, cursor: str = None):
+        return paginate(
+            ExpenseType.query.filter(ExpenseType.user_id == user_id),
+            (ExpenseType.id,),
+            limit=limit,
+            cursor=cursor
+        )
 
     @staticmethod
     def get_one(id: int, user_id: int):
@@ -40,6 +59,7 @@ class ExpenseTypeService:
         obj = ExpenseType(**data)
         db.session.add(obj)
         db.session.commit()
+        summary_cache.invalidate_user(obj.user_id)
 
         return obj
 
@@ -51,20 +71,29 @@ class ExpenseTypeService:
         for key, value in data.items():
             setattr(obj, key, value)
 
-        if current_base_value != data.get('base_value', 0):
+        obj.updated_values = 0
+        if 'base_value' in data and data['base_value'] != current_base_value:
             today = datetime.today()
-            expenses = Expense.query.filter(
+            pending = (
                 Expense.type_id == id,
-                Expense.year >= today.year,
+                Expense.period >= to_period(today.year, today.month),
                 Expense.paid != True
-               
-            ).all()
-            for expense in expenses:
-                if (expense.year == today.year and expense.month >= today.month) or expense.month > today.month:
-                    ExpenseService.update(expense.id, {'value': data['base_value']}, user_id=user_id)
+            )
+            MonthlySummaryService.apply_grouped_delta(
+                MonthlySummaryService.expense_totals_query(value=data['base_value'] - Expense.value).filter(*pending)
+            )
+            LedgerService.update_values(EXPENSE, id, data['base_value'], *pending)
+            obj.updated_values = Expense.query.filter(*pending).update(
+                {'value': data['base_value']}, synchronize_session=False
+            )
 
         db.session.add(obj)
+        if 'name' in data or 'category' in data:
+            db.session.flush()
+            LedgerService.refresh_type(EXPENSE, id)
         db.session.commit()
+        # Type changes reach the virtual rows of every month.
+        summary_cache.invalidate_user(user_id)
 
         return obj
 
@@ -72,75 +101,154 @@ class ExpenseTypeService:
     def delete(id: int, user_id: int):
         obj = ExpenseTypeService.get_one(id, user_id=user_id)
 
+        MonthlySummaryService.apply_grouped_delta(
+            MonthlySummaryService.expense_totals_query().filter(Expense.type_id == id), sign=-1
+        )
+        LedgerService.remove_type(EXPENSE, id)
         db.session.delete(obj)
         db.session.commit()
+        summary_cache.invalidate_user(user_id)
 
 
 class ExpenseService:
     @staticmethod
     def get_all(user_id: int):
-        return db.session.query(Expense).join(ExpenseType).filter(ExpenseType.user_id == user_id).all()
+        return db.session.query(Expense).join(ExpenseType).options(
+            db.contains_eager(Expense.expense_type)
+        ).filter(ExpenseType.user_id == user_id).all()
 
     @staticmethod
-    def get_one(id: int, user_id: int):
-        expense = db.session.query(Expense).join(ExpenseType).filter(
+    def get_page(user_id: int, limit: int = None, cursor: str = None):
+        return paginate(
+            db.session.query(Expense).join(ExpenseType).options(db.contains_eager(Expense.expense_type)).filter(
+                ExpenseType.user_id == user_id
+            ),
+            (Expense.period, Expense.id),
+            limit=limit,
+            cursor=cursor
+        )
+
+    @staticmethod
+    def get_one(id: int, user_id: int, for_update: bool = False):
+        query = db.session.query(Expense).join(ExpenseType).filter(
             ExpenseType.user_id == user_id,
             Expense.id == id
-        ).first()
+        )
+        if for_update:
+            query = query.with_for_update(of=Expense).populate_existing()
+        expense = query.first()
         if not expense:
             raise ExpenseNotFoundException()
         return expense
  
     @staticmethod
     def get_by_category(category: str, user_id: int):
-        types = ExpenseTypeService.get_by_category(category=category, user_id=user_id)
-        type_ids = [t.id for t in types]
-        return Expense.query.filter(Expense.type_id.in_(type_ids)).all()
+        return db.session.query(Expense).join(ExpenseType).options(
+            db.contains_eager(Expense.expense_type)
+        ).filter(
+            ExpenseType.category == category,
+            ExpenseType.user_id == user_id
+        ).all()
 
     @staticmethod
-    def create(data: ExpenseInterface):
-        obj = Expense(**data)
-        db.session.add(obj)
+    def create(data: ExpenseInterface, user_id: int):
+        ExpenseTypeService.get_one(data['type_id'], user_id=user_id)
+
+        # Upsert on (type_id, year, month), so persisting an edited virtual
+        # expense does not fail if the month got materialized meanwhile. The
+        # key, row or gap, is locked first: the delta is then taken from the
+        # value the upsert replaces.
+        existing = Expense.query.filter(
+            Expense.type_id == data['type_id'],
+            Expense.year == data.get('year'),
+            Expense.month == data.get('month')
+        ).with_for_update().populate_existing().first()
+        if existing:
+            MonthlySummaryService.apply_delta(
+                existing.user_id, existing.year, existing.month,
+                **MonthlySummaryService.expense_delta(existing.value, existing.paid, sign=-1)
+            )
+
+        table = Expense.__table__
+        stmt = mysql.insert(table).values(**data)
+        updates = {key: stmt.inserted[key] for key in ('value', 'paid') if key in data}
+        result = db.session.execute(stmt.on_duplicate_key_update(
+            id=db.func.last_insert_id(table.c.id), **updates
+        ))
+
+        obj = db.session.get(Expense, result.lastrowid, populate_existing=True)
+        MonthlySummaryService.apply_delta(
+            obj.user_id, obj.year, obj.month, **MonthlySummaryService.expense_delta(obj.value, obj.paid)
+        )
+        LedgerService.record_expense(obj)
         db.session.commit()
 
+        summary_cache.invalidate_period(obj.user_id, obj.year, obj.month)
         return obj
 
     @staticmethod
     def update(id: int, data: ExpenseUpdateInterface, user_id: int):
-        obj = ExpenseService.get_one(id, user_id=user_id)
+        obj = ExpenseService.get_one(id, user_id=user_id, for_update=True)
+        new_type = ExpenseTypeService.get_one(data['type_id'], user_id=user_id) if 'type_id' in data else None
+        key = (data.get('type_id', obj.type_id), data.get('year', obj.year), data.get('month', obj.month))
+        if key != (obj.type_id, obj.year, obj.month) and Expense.query.filter(
+            Expense.type_id == key[0], Expense.year == key[1], Expense.month == key[2]
+        ).with_for_update().first():
+            raise ExpenseAlreadyExistsException()
+        previous_year, previous_month = obj.year, obj.month
+        MonthlySummaryService.apply_delta(
+            user_id, obj.year, obj.month, **MonthlySummaryService.expense_delta(obj.value, obj.paid, sign=-1)
+        )
 
         for key, value in data.items():
             setattr(obj, key, value)
+        if new_type is not None:
+            obj.expense_type = new_type
 
+        MonthlySummaryService.apply_delta(
+            user_id, obj.year, obj.month, **MonthlySummaryService.expense_delta(obj.value, obj.paid)
+        )
+        if (previous_year, previous_month) != (obj.year, obj.month):
+            LedgerService.remove(EXPENSE, user_id, previous_year, previous_month, obj.id)
+        LedgerService.record_expense(obj)
         db.session.add(obj)
         db.session.commit()
+        summary_cache.invalidate_period(user_id, previous_year, previous_month)
+        summary_cache.invalidate_period(user_id, obj.year, obj.month)
 
         return obj
 
     @staticmethod
     def delete(id: int, user_id: int):
-        obj = ExpenseService.get_one(id, user_id=user_id)
+        obj = ExpenseService.get_one(id, user_id=user_id, for_update=True)
+        year, month = obj.year, obj.month
+        MonthlySummaryService.apply_delta(
+            user_id, year, month, **MonthlySummaryService.expense_delta(obj.value, obj.paid, sign=-1)
+        )
+        LedgerService.remove(EXPENSE, user_id, year, month, obj.id)
         db.session.delete(obj)
         db.session.commit()
+        summary_cache.invalidate_period(user_id, year, month)
 
     @staticmethod
     def get_expense_list(month: int, year: int, user_id: int, category: str = 'all'):
+        """Expenses of the month, without writing anything: recurrent types that
+        have no expense for the month yet are projected as virtual rows."""
         expenses = []
 
-        if category != 'all':
-            expense_types = ExpenseTypeService.get_by_category(category=category, user_id=user_id)
-        else:
-            expense_types = ExpenseTypeService.get_all(user_id=user_id)
+        query = db.session.query(ExpenseType, Expense).outerjoin(
+            Expense,
+            db.and_(
+                Expense.type_id == ExpenseType.id,
+                Expense.year == year,
+                Expense.month == month
+            )
+        ).filter(ExpenseType.user_id == user_id)
 
-        for expense_type in expense_types:
-            if expense_type.recurrent:
-                expense = ExpenseService._get_or_create(expense_type, year, month)
-            else:
-                expense = Expense.query.filter(
-                    Expense.type_id == expense_type.id, 
-                    Expense.month == month, 
-                    Expense.year == year).first()
+        if category != 'all':
+            query = query.filter(ExpenseType.category == category)
 
+        for expense_type, expense in query.order_by(ExpenseType.id).all():
             if expense:
                 data = ExpenseReturnInterface({
                     "id": expense.id,
@@ -150,27 +258,83 @@ class ExpenseService:
                     "month": month,
                     "year": year,
                     "paid": getattr(expense, "paid", False),
-                    "category": expense_type.category.value
+                    "category": expense_type.category.value,
+                    "virtual": False
                 })
-                expenses.append(data)
+            elif ExpenseService._is_projected(expense_type, year, month):
+                data = ExpenseReturnInterface({
+                    "id": None,
+                    "type_name": expense_type.name,
+                    "type_id": expense_type.id,
+                    "value": expense_type.base_value or 0,
+                    "month": month,
+                    "year": year,
+                    "paid": False,
+                    "category": expense_type.category.value,
+                    "virtual": True
+                })
+            else:
+                continue
+            expenses.append(data)
         
         return expenses
 
     @staticmethod
-    def _get_or_create(expense_type: ExpenseType, year: int, month: int):
-        expense = Expense.query.filter(Expense.type_id == expense_type.id, Expense.month == month, Expense.year == year).first()
-        
-        if not expense:
-            if expense_type.end_date and datetime(year, month, 1).date() > expense_type.end_date:
-                return None
-            
-            data = ExpenseInterface({
-                "type_id": expense_type.id,
-                "value": expense_type.base_value or 0,
-                "month": month,
-                "year": year,
-                "paid": False,
-            })
-            expense = ExpenseService.create(data)
+    def get_projected_types_query(year: int, month: int, user_id: int, *columns):
+        """Query of `columns` over the recurrent types that have no expense for
+        the month yet, i.e. the ones projected as virtual rows."""
+        return db.session.query(*columns).select_from(ExpenseType).outerjoin(
+            Expense,
+            db.and_(
+                Expense.type_id == ExpenseType.id,
+                Expense.year == year,
+                Expense.month == month
+            )
+        ).filter(
+            ExpenseType.user_id == user_id,
+            ExpenseType.recurrent == True,
+            db.or_(
+                ExpenseType.end_date == None,
+                ExpenseType.end_date >= datetime(year, month, 1).date()
+            ),
+            Expense.id == None
+        )
 
-        return expense
+    @staticmethod
+    def get_month_projection_query(year: int, month: int, user_id: int):
+        """Scalar subquery summing the base value of the projected types."""
+        return ExpenseService.get_projected_types_query(
+            year, month, user_id,
+            db.func.coalesce(db.func.sum(db.func.coalesce(ExpenseType.base_value, 0)), 0)
+        ).scalar_subquery()
+
+    @staticmethod
+    def get_projected_range_query(months, user_id: int):
+        """Per-period sum of the base values projected into `months`, a
+        selectable with a `period` column."""
+        return db.session.query(
+            months.c.period.label('period'),
+            db.func.sum(db.func.coalesce(ExpenseType.base_value, 0)).label('total')
+        ).select_from(months).join(
+            ExpenseType,
+            db.and_(
+                ExpenseType.user_id == user_id,
+                ExpenseType.recurrent == True,
+            db.or_(
+                ExpenseType.end_date == None,
+                db.func.year(ExpenseType.end_date) * 12 + db.func.month(ExpenseType.end_date) >= months.c.period
+            )
+            )
+        ).outerjoin(
+            Expense,
+            db.and_(
+                Expense.type_id == ExpenseType.id,
+                Expense.period == months.c.period
+            )
+        ).filter(Expense.id == None).group_by(months.c.period)
+
+    @staticmethod
+    def _is_projected(expense_type: ExpenseType, year: int, month: int):
+        if not expense_type.recurrent:
+            return False
+        return not expense_type.end_date or datetime(year, month, 1).date() <= expense_type.end_date
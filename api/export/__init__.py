@@ -0,0 +1,7 @@
+from copy import deepcopy
+
+def register_routes(root_api, root="/api"):
+    from .controller import api as export_api
+
+    root_api.add_namespace(deepcopy(export_api), path=f"{root}/export")
+    return root_api
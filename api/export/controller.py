@@ -0,0 +1,40 @@
+from flask import request, Response, stream_with_context
+from flask_restx import Resource, Namespace
+from flask_accepts import accepts
+from flask_login import login_required, current_user
+
+from app import api
+from ..utils import make_json_response, parse_year_month
+
+from .exceptions import InvalidExportFormatException
+from .service import ExportService
+
+
+api = Namespace("Export", description="Export your ledger")
+
+
+@api.route('/')
+class ExportResource(Resource):
+    @accepts(
+        dict(name='format', type=str, required=False, default='ndjson', help="`ndjson` or `csv`"),
+        dict(name='from', type=str, required=False, help="First month, as YYYY-MM"),
+        dict(name='to', type=str, required=False, help="Last month, as YYYY-MM"),
+        api=api
+    )
+    @api.response(200, "Export successfully streamed.")
+    @login_required
+    def get(self):
+        user_id = current_user.id
+        args = request.parsed_args
+        try:
+            start = parse_year_month(args['from']) if args['from'] else None
+            end = parse_year_month(args['to']) if args['to'] else None
+            chunks = ExportService.export(format=args['format'], user_id=user_id, start=start, end=end)
+        except (ValueError, InvalidExportFormatException):
+            return make_json_response(data={"code": 400, "message": "Invalid export parameters"}, code=400)
+
+        return Response(
+            stream_with_context(chunks),
+            mimetype=ExportService.mimetype(args['format']),
+            headers={'Content-Disposition': f"attachment; filename=ledger.{args['format']}"}
+        )
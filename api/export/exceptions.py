@@ -0,0 +1,3 @@
+class InvalidExportFormatException(Exception):
+    def __init__(self, message="Invalid export format"):
+        super().__init__(message)
@@ -0,0 +1,7 @@
+from copy import deepcopy
+
+def register_routes(root_api, root="/api"):
+    from .controller import api as imports_api
+
+    root_api.add_namespace(deepcopy(imports_api), path=f"{root}/import")
+    return root_api
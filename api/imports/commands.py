@@ -0,0 +1,30 @@
+import click
+
+from flask.cli import AppGroup
+
+from ..summary.cache import bump_generation, staleness_notice
+
+from .exceptions import InvalidImportFileException
+from .service import ImportService
+
+
+imports_cli = AppGroup('import', help="Bulk import data.")
+
+
+@imports_cli.command('statement')
+@click.argument('file', type=click.File('r', encoding='utf-8-sig', lazy=False))
+@click.option('--user-id', type=int, required=True, help="User to import the statement for.")
+def import_statement(file, user_id):
+    """Import a bank statement CSV into the user's expenses and incomes."""
+    try:
+        report = ImportService.import_statement(user_id=user_id, lines=file)
+    except InvalidImportFileException as e:
+        raise click.ClickException(str(e))
+    bump_generation()
+
+    for error in report['errors']:
+        click.echo(f"Line {error['line']}: {error['message']}")
+    click.echo(f"Imported {report['imported']} lines, created {report['created_types']} types.")
+    click.echo(staleness_notice())
+    if report['errors']:
+        raise SystemExit(1)
@@ -0,0 +1,36 @@
+import io
+
+from flask import request
+from flask_restx import Resource, Namespace
+from flask_accepts import accepts, responds
+from flask_login import login_required, current_user
+from werkzeug.datastructures import FileStorage
+
+from app import api
+from ..utils import make_json_response
+
+from .exceptions import InvalidImportFileException
+from .schema import ImportReturnSchema
+from .service import ImportService
+
+
+api = Namespace("Import", description="Bulk import of bank statements")
+
+
+@api.route('/')
+class ImportResource(Resource):
+    @accepts(
+        dict(name='file', type=FileStorage, location='files', required=True,
+             help="CSV with date, type and amount columns"),
+        api=api
+    )
+    @responds(schema=ImportReturnSchema, api=api)
+    @api.response(200, "Statement successfully imported.")
+    @login_required
+    def post(self):
+        user_id = current_user.id
+        lines = io.TextIOWrapper(request.parsed_args['file'].stream, encoding='utf-8-sig', newline='')
+        try:
+            return ImportService.import_statement(user_id=user_id, lines=lines)
+        except InvalidImportFileException:
+            return make_json_response(data={"code": 400, "message": "Invalid import file"}, code=400)
@@ -0,0 +1,3 @@
+class InvalidImportFileException(Exception):
+    def __init__(self, message="Invalid import file"):
+        super().__init__(message)
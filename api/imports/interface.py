@@ -0,0 +1,13 @@
+from mypy_extensions import TypedDict
+from typing import List
+
+
+class ImportErrorInterface(TypedDict):
+    line: int
+    message: str
+
+
+class ImportReportInterface(TypedDict):
+    imported: int
+    created_types: int
+    errors: List[ImportErrorInterface]
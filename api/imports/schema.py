@@ -0,0 +1,11 @@
+from marshmallow import Schema, fields
+
+
+class ImportErrorSchema(Schema):
+    line = fields.Integer(attribute="line")
+    message = fields.String(attribute="message")
+
+class ImportReturnSchema(Schema):
+    imported = fields.Integer(attribute="imported")
+    createdTypes = fields.Integer(attribute="created_types")
+    errors = fields.List(fields.Nested(ImportErrorSchema))
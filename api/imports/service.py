@@ -0,0 +1,228 @@
+import csv
+import datetime
+
+from decimal import Decimal, InvalidOperation
+
+from flask_restx import inputs
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import db
+
+from ..expenses.model import Expense, ExpenseCategoryEnum, ExpenseType
+from ..incomes.model import Income, IncomeType
+from ..summary import cache as summary_cache
+from ..summary.read_model import EXPENSE, INCOME, LedgerService, MonthlySummaryService
+from ..utils import parse_year_month, to_period
+
+from .exceptions import InvalidImportFileException
+from .interface import ImportReportInterface
+
+
+IMPORT_CHUNK_SIZE = 1000
+
+IMPORT_COLUMNS = ('date', 'type', 'amount')
+
+IMPORT_TARGETS = {
+    EXPENSE: dict(
+        type_model=ExpenseType,
+        model=Expense,
+        status='paid',
+        totals_query=MonthlySummaryService.expense_totals_query,
+        entries_query=LedgerService.expense_entries_query,
+    ),
+    INCOME: dict(
+        type_model=IncomeType,
+        model=Income,
+        status='received',
+        totals_query=MonthlySummaryService.income_totals_query,
+        entries_query=LedgerService.income_entries_query,
+    ),
+}
+
+MAX_VALUE = Decimal('99999999.99')
+
+
+class ImportService:
+    """Bulk import of bank statements.
+
+    The CSV has a `date` (YYYY-MM-DD or YYYY-MM), a `type` name and a signed
+    `amount` per line, and optionally a `category` for the expense types it
+    creates and a `status`. Negative amounts are expenses, positive ones
+    incomes. The lines of a type in a month add up to that month's value,
+    on top of the one already recorded.
+
+    The file is read as a stream, `IMPORT_CHUNK_SIZE` lines at a time; each
+    chunk is written, with the read models, in one transaction. Invalid
+    lines are reported and skipped without stopping the import.
+    """
+
+    @staticmethod
+    def import_statement(user_id: int, lines) -> ImportReportInterface:
+        """Import the CSV read from `lines`, any iterable of text lines."""
+        reader = csv.DictReader(lines)
+        if not reader.fieldnames:
+            raise InvalidImportFileException()
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        if not set(IMPORT_COLUMNS) <= set(reader.fieldnames):
+            raise InvalidImportFileException()
+
+        report = {'imported': 0, 'created_types': 0, 'errors': []}
+        chunk = []
+        try:
+            for row in reader:
+                try:
+                    chunk.append((reader.line_num, ImportService._parse(row)))
+                except ValueError as e:
+                    report['errors'].append({'line': reader.line_num, 'message': str(e)})
+
+                if len(chunk) == IMPORT_CHUNK_SIZE:
+                    ImportService._import_chunk(user_id, chunk, report)
+                    chunk = []
+        except (csv.Error, UnicodeDecodeError):
+            report['errors'].append({'line': reader.line_num, 'message': "Unreadable line, import stopped"})
+
+        if chunk:
+            ImportService._import_chunk(user_id, chunk, report)
+        return report
+
+    @staticmethod
+    def _parse(row: dict) -> dict:
+        date = (row.get('date') or '').strip()
+        try:
+            if len(date) > len('YYYY-MM'):
+                date = datetime.date.fromisoformat(date)
+                year, month = date.year, date.month
+            else:
+                year, month = parse_year_month(date)
+        except ValueError:
+            raise ValueError("Invalid date")
+
+        name = (row.get('type') or '').strip()
+        if not name or len(name) > ExpenseType.name.type.length:
+            raise ValueError("Invalid type")
+
+        try:
+            amount = Decimal((row.get('amount') or '').strip()).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise ValueError("Invalid amount")
+        if not amount or abs(amount) > MAX_VALUE:
+            raise ValueError("Invalid amount")
+
+        category = (row.get('category') or '').strip()
+        try:
+            category = ExpenseCategoryEnum(category.lower()) if category else ExpenseCategoryEnum.PERSONAL
+        except ValueError:
+            raise ValueError("Invalid category")
+
+        # Statement lines are settled transactions: paid or received unless
+        # the file says otherwise.
+        status = (row.get('status') or '').strip()
+        try:
+            status = inputs.boolean(status) if status else True
+        except ValueError:
+            raise ValueError("Invalid status")
+
+        return {
+            'model': EXPENSE if amount < 0 else INCOME,
+            'year': year,
+            'month': month,
+            'name': name,
+            'value': abs(amount),
+            'category': category,
+            'status': status,
+        }
+
+    @staticmethod
+    def _import_chunk(user_id: int, chunk: list, report: dict):
+        try:
+            created_types = 0
+            for model in IMPORT_TARGETS:
+                rows = [row for _, row in chunk if row['model'] == model]
+                if rows:
+                    created_types += ImportService._import_rows(user_id, model, rows)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            report['errors'].extend(
+                {'line': line, 'message': "Could not be saved"} for line, _ in chunk
+            )
+            return
+
+        report['imported'] += len(chunk)
+        report['created_types'] += created_types
+        summary_cache.invalidate_user(user_id)
+
+    @staticmethod
+    def _import_rows(user_id: int, model: str, rows: list) -> int:
+        """Upsert `rows`, all of `model`, and their read models; returns the
+        number of types created for them."""
+        target = IMPORT_TARGETS[model]
+        type_ids, created_types = ImportService._get_or_create_types(user_id, target['type_model'], rows)
+
+        # One value per type and month, adding up the lines that share them.
+        values = {}
+        for row in rows:
+            key = (type_ids[row['name'].lower()], row['year'], row['month'])
+            value, status = values.get(key, (0, False))
+            values[key] = (value + row['value'], status or row['status'])
+
+        source, status = target['model'], target['status']
+        imported = db.tuple_(source.type_id, source.year, source.month).in_(list(values))
+
+        MonthlySummaryService.apply_grouped_delta(target['totals_query']().filter(imported), sign=-1)
+
+        table = source.__table__
+        stmt = mysql.insert(table).values([
+            {
+                'type_id': type_id,
+                'year': year,
+                'month': month,
+                'period': to_period(year, month),
+                'value': value,
+                status: row_status,
+            }
+            for (type_id, year, month), (value, row_status) in values.items()
+        ])
+        db.session.execute(stmt.on_duplicate_key_update(**{
+            'value': table.c.value + stmt.inserted.value,
+            status: db.or_(table.c[status], stmt.inserted[status]),
+        }))
+
+        MonthlySummaryService.apply_grouped_delta(target['totals_query']().filter(imported))
+        LedgerService.replace_from(model, user_id, target['entries_query']().filter(imported))
+
+        return created_types
+
+    @staticmethod
+    def _get_or_create_types(user_id: int, type_model, rows: list):
+        """Ids of the rows' types by lowercased name, inserting the missing
+        ones in one executemany; returns them with the number created."""
+        names = {}
+        for row in rows:
+            names.setdefault(row['name'].lower(), row)
+
+        type_ids = ImportService._get_types(user_id, type_model, names)
+        missing = [row for key, row in names.items() if key not in type_ids]
+        if not missing:
+            return type_ids, 0
+
+        new_types = [dict(user_id=user_id, name=row['name'], recurrent=False) for row in missing]
+        if type_model is ExpenseType:
+            for new_type, row in zip(new_types, missing):
+                new_type['category'] = row['category']
+        db.session.execute(db.insert(type_model), new_types)
+
+        return ImportService._get_types(user_id, type_model, names), len(missing)
+
+    @staticmethod
+    def _get_types(user_id: int, type_model, names: dict):
+        type_ids = {}
+        rows = db.session.query(type_model.id, type_model.name).filter(
+            type_model.user_id == user_id,
+            type_model.name.in_([row['name'] for row in names.values()])
+        ).order_by(type_model.id)
+        # Names may repeat: map each to the oldest type.
+        for id, name in rows:
+            type_ids.setdefault(name.lower(), id)
+        return type_ids
@@ -4,9 +4,11 @@ from flask_accepts import accepts, responds
 from flask_login import login_required, current_user
 
 from app import api
+from ..pagination import InvalidPageException, page_args
 from ..utils import make_json_response
 
 from .exceptions import (
+    IncomeAlreadyExistsException,
     IncomeNotFoundException,
     IncomeTypeNotFoundException
 )
@@ -16,6 +18,8 @@ from .schema import (
     IncomeReturnSchema,
     IncomeTypeSchema,
     IncomeTypeReturnSchema,
+    IncomePageSchema,
+    IncomeTypePageSchema,
 )
 
 api = Namespace("Incomes", description="Access to your Incomes")
@@ -23,12 +27,20 @@ api = Namespace("Incomes", description="Access to your Incomes")
 
 @api.route('/type')
 class IncomeTypeResource(Resource):
-    @responds(schema=IncomeTypeReturnSchema(many=True), api=api)
+    @accepts(*page_args(), api=api)
+    @responds(schema=IncomeTypePageSchema, api=api)
     @api.response(200, "Income types successfully retrieved.")
     @login_required
     def get(self):
         user_id = current_user.id
-        return IncomeTypeService.get_all(user_id=user_id)
+        args = request.parsed_args
+        if args['all']:
+            income_types = IncomeTypeService.get_all(user_id=user_id)
+            return make_json_response(data=IncomeTypeReturnSchema(many=True).dump(income_types), code=200)
+        try:
+            return IncomeTypeService.get_page(user_id=user_id, limit=args['limit'], cursor=args['cursor'])
+        except InvalidPageException:
+            return make_json_response(data={"code": 400, "message": "Invalid page"}, code=400)
 
     @accepts(schema=IncomeTypeSchema, api=api)
     @responds(schema=IncomeTypeReturnSchema, api=api)
@@ -78,19 +90,31 @@ class IncomeTypeIdResource(Resource):
 
 @api.route('/')
 class IncomeResource(Resource):
-    @responds(schema=IncomeReturnSchema(many=True), api=api)
+    @accepts(*page_args(), api=api)
+    @responds(schema=IncomePageSchema, api=api)
     @api.response(200, "Incomes successfully retrieved.")
     @login_required
     def get(self):
         user_id = current_user.id
-        return IncomeService.get_all(user_id=user_id)
+        args = request.parsed_args
+        if args['all']:
+            incomes = IncomeService.get_all(user_id=user_id)
+            return make_json_response(data=IncomeReturnSchema(many=True).dump(incomes), code=200)
+        try:
+            return IncomeService.get_page(user_id=user_id, limit=args['limit'], cursor=args['cursor'])
+        except InvalidPageException:
+            return make_json_response(data={"code": 400, "message": "Invalid page"}, code=400)
 
     @accepts(schema=IncomeInputSchema, api=api)
     @responds(schema=IncomeReturnSchema, api=api)
     @api.response(201, "Income successfully added.")
     @login_required
     def post(self):
-        new_income = IncomeService.create(data=request.parsed_obj)
+        user_id = current_user.id
+        try:
+            new_income = IncomeService.create(data=request.parsed_obj, user_id=user_id)
+        except IncomeTypeNotFoundException:
+            return make_json_response(data={"code": 404, "message": "Income Type not found"}, code=404)
         return make_json_response(data=IncomeReturnSchema().dump(new_income), code=201)
 
 
@@ -116,6 +140,10 @@ class IncomeIdResource(Resource):
             return IncomeService.update(id=incomeId, data=request.parsed_obj, user_id=user_id)
         except IncomeNotFoundException:
             return make_json_response(data={"code": 404, "message": "Income not found"}, code=404)
+        except IncomeTypeNotFoundException:
+            return make_json_response(data={"code": 404, "message": "Income Type not found"}, code=404)
+        except IncomeAlreadyExistsException:
+            return make_json_response(data={"code": 409, "message": "Income already exists"}, code=409)
 
     @responds(status_code=204, api=api)
     @api.response(204, "Income successfully removed.")
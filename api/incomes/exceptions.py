@@ -5,4 +5,9 @@ class IncomeTypeNotFoundException(Exception):
 
 class IncomeNotFoundException(Exception):
     def __init__(self, message="Income not found"):
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+
+class IncomeAlreadyExistsException(Exception):
+    def __init__(self, message="Income already exists"):
+        super().__init__(message)
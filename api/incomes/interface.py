@@ -17,3 +17,13 @@ class IncomeInterface(TypedDict):
 class IncomeUpdateInterface(TypedDict):
     value: float
     received: bool    
+
+class IncomeReturnInterface(TypedDict):
+    id: int
+    type_name: str
+    type_id: int
+    value: float
+    month: int
+    year: int
+    received: bool
+    virtual: bool
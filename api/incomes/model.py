@@ -1,24 +1,43 @@
+from sqlalchemy.orm import validates
+
 from database import db
 from datetime import datetime
 
+from ..utils import period_default, sync_period
+
+
 class IncomeType(db.Model):
+    __table_args__ = (
+        db.Index('ix_income_type_user_id_recurrent', 'user_id', 'recurrent'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
     recurrent = db.Column(db.Boolean, default=False)
     base_value = db.Column(db.Numeric(precision=10, scale=2))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
-    income_values = db.relationship('Income', backref='income_type', cascade="all,delete", lazy=True)
+    income_values = db.relationship('Income', backref='income_type', cascade="all,delete", passive_deletes=True, lazy=True)
     user = db.relationship('User', backref='income_type')
 
 class Income(db.Model):
+    __table_args__ = (
+        db.Index('uq_income_type_id_year_month', 'type_id', 'year', 'month', unique=True),
+        db.Index('ix_income_type_id_period', 'type_id', 'period'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.Numeric(precision=10, scale=2), nullable=False)
     month = db.Column(db.Integer, nullable=False, default=datetime.today().month)
     year = db.Column(db.Integer, nullable=False, default=datetime.today().year)
-    type_id = db.Column(db.Integer, db.ForeignKey('income_type.id'), nullable=False)
+    period = db.Column(db.Integer, nullable=False, default=period_default)
+    type_id = db.Column(db.Integer, db.ForeignKey('income_type.id', ondelete='CASCADE'), nullable=False)
     received = db.Column(db.Boolean, default=False)
 
+    @validates('year', 'month')
+    def _sync_period(self, key, value):
+        return sync_period(self, key, value)
+
     @property
     def type_name(self):
         return self.income_type.name
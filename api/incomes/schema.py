@@ -14,6 +14,11 @@ class IncomeReturnSchema(Schema):
     month = fields.Integer(attribute="month")
     year = fields.Integer(attribute="year")
     received = fields.Boolean(attribute="received")
+    virtual = fields.Boolean(attribute="virtual", dump_default=False)
+
+class IncomePageSchema(Schema):
+    items = fields.List(fields.Nested(IncomeReturnSchema), attribute="items")
+    nextCursor = fields.String(attribute="next_cursor", allow_none=True)
 
 class IncomeTypeReturnSchema(Schema):
     id = fields.Integer(attribute="id")
@@ -21,6 +26,12 @@ class IncomeTypeReturnSchema(Schema):
     recurrent = fields.Boolean(attribute="recurrent")
     baseValue = fields.Float(attribute="base_value")
     incomeValues = fields.List(fields.Nested(IncomeReturnSchema), required=False, attribute="income_values")
+    updatedValues = fields.Integer(attribute="updated_values", required=False)
+
+class IncomeTypePageSchema(Schema):
+    # Without the values: those are paged by the value list endpoint.
+    items = fields.List(fields.Nested(IncomeTypeReturnSchema, exclude=('incomeValues',)), attribute="items")
+    nextCursor = fields.String(attribute="next_cursor", allow_none=True)
 
 class IncomeInputSchema(Schema):
     typeId = fields.Integer(attribute="type_id")
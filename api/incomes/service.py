@@ -1,14 +1,23 @@
 import datetime
 
+from sqlalchemy.dialects import mysql
+
 from database import db
 
+from ..pagination import paginate
+from ..summary import cache as summary_cache
+from ..summary.read_model import INCOME, LedgerService, MonthlySummaryService
+from ..utils import to_period
+
 from .model import *
 from .interface import (
     IncomeInterface, 
     IncomeUpdateInterface, 
+    IncomeReturnInterface,
     IncomeTypeInterface
 )
 from .exceptions import (
+    IncomeAlreadyExistsException,
     IncomeNotFoundException, 
     IncomeTypeNotFoundException
 )
@@ -17,7 +26,18 @@ from .exceptions import (
 class IncomeTypeService:
     @staticmethod
     def get_all(user_id: int):
-        return IncomeType.query.filter(IncomeType.user_id == user_id).all()
+        return IncomeType.query.options(db.selectinload(IncomeType.income_values)).filter(
+            IncomeType.user_id == user_id
+        ).all()
+
+    @staticmethod
+    def get_page(user_id: int, limit: int = None, cursor: str = None):
+        return paginate(
+            IncomeType.query.filter(IncomeType.user_id == user_id),
+            (IncomeType.id,),
+            limit=limit,
+            cursor=cursor
+        )
 
     @staticmethod
     def get_one(id: int, user_id: int):
@@ -34,6 +54,7 @@ class IncomeTypeService:
         obj = IncomeType(**data)
         db.session.add(obj)
         db.session.commit()
+        summary_cache.invalidate_user(obj.user_id)
 
         return obj
 
@@ -45,114 +66,241 @@ class IncomeTypeService:
         for key, value in data.items():
             setattr(obj, key, value)
 
-        if current_base_value != data.get('base_value', 0):
+        obj.updated_values = 0
+        if 'base_value' in data and data['base_value'] != current_base_value:
             today = datetime.today()
-            incomes = Income.query.filter(
+            pending = (
                 Income.type_id == id,
-                Income.year >= today.year,
+                Income.period >= to_period(today.year, today.month),
                 Income.received != True
-               
-            ).all()
-            for income in incomes:
-                if (income.year == today.year and income.month >= today.month) or income.month > today.month:
-                    IncomeService.update(income.id, {'value': data['base_value']}, user_id=user_id)
-
+            )
+            MonthlySummaryService.apply_grouped_delta(
+                MonthlySummaryService.income_totals_query(value=data['base_value'] - Income.value).filter(*pending)
+            )
+            LedgerService.update_values(INCOME, id, data['base_value'], *pending)
+            obj.updated_values = Income.query.filter(*pending).update(
+                {'value': data['base_value']}, synchronize_session=False
+            )
 
         db.session.add(obj)
+        if 'name' in data:
+            db.session.flush()
+            LedgerService.refresh_type(INCOME, id)
         db.session.commit()
+        # Type changes reach the virtual rows of every month.
+        summary_cache.invalidate_user(user_id)
 
         return obj
 
     @staticmethod
     def delete(id: int, user_id: int):
         obj = IncomeTypeService.get_one(id, user_id=user_id)
+        MonthlySummaryService.apply_grouped_delta(
+            MonthlySummaryService.income_totals_query().filter(Income.type_id == id), sign=-1
+        )
+        LedgerService.remove_type(INCOME, id)
         db.session.delete(obj)
         db.session.commit()
+        summary_cache.invalidate_user(user_id)
 
 class IncomeService:
     @staticmethod
     def get_all(user_id: int):
-        return db.session.query(Income).join(IncomeType).filter(IncomeType.user_id == user_id).all()
+        return db.session.query(Income).join(IncomeType).options(
+            db.contains_eager(Income.income_type)
+        ).filter(IncomeType.user_id == user_id).all()
+
+    @staticmethod
+    def get_page(user_id: int, limit: int = None, cursor: str = None):
+        return paginate(
+            db.session.query(Income).join(IncomeType).options(db.contains_eager(Income.income_type)).filter(
+                IncomeType.user_id == user_id
+            ),
+            (Income.period, Income.id),
+            limit=limit,
+            cursor=cursor
+        )
 
     @staticmethod
     def get_incomes_list(year: int, month: int, user_id: int):
+        """Incomes of the month, without writing anything: recurrent types that
+        have no income for the month yet are projected as virtual rows."""
         incomes = []
 
-        income_types = IncomeTypeService.get_all(user_id=user_id)
-
-        for income_type in income_types:
-            if income_type.recurrent:
-                income = IncomeService._get_or_create(income_type, year, month)
-            else:
-                income = Income.query.filter(
-                    Income.type_id == income_type.id, 
-                    Income.month == month, 
-                    Income.year == year).first()
+        query = db.session.query(IncomeType, Income).outerjoin(
+            Income,
+            db.and_(
+                Income.type_id == IncomeType.id,
+                Income.year == year,
+                Income.month == month
+            )
+        ).filter(IncomeType.user_id == user_id)
 
+        for income_type, income in query.order_by(IncomeType.id).all():
             if income:
-                data = IncomeInterface({
+                data = IncomeReturnInterface({
                     "id": income.id,
                     "type_name": income_type.name,
                     "type_id": income_type.id,
                     "value": income.value,
                     "month": month,
                     "year": year,
-                    "received": getattr(income, "received", False)
+                    "received": getattr(income, "received", False),
+                    "virtual": False
                 })
-                incomes.append(data)
+            elif income_type.recurrent:
+                data = IncomeReturnInterface({
+                    "id": None,
+                    "type_name": income_type.name,
+                    "type_id": income_type.id,
+                    "value": income_type.base_value or 0,
+                    "month": month,
+                    "year": year,
+                    "received": False,
+                    "virtual": True
+                })
+            else:
+                continue
+            incomes.append(data)
         
         return incomes
 
     @staticmethod
-    def get_one(id: int, user_id: int):
-        income = db.session.query(Income).join(IncomeType).filter(
+    def get_projected_types_query(year: int, month: int, user_id: int, *columns):
+        """Query of `columns` over the recurrent types that have no income for
+        the month yet, i.e. the ones projected as virtual rows."""
+        return db.session.query(*columns).select_from(IncomeType).outerjoin(
+            Income,
+            db.and_(
+                Income.type_id == IncomeType.id,
+                Income.year == year,
+                Income.month == month
+            )
+        ).filter(
+            IncomeType.user_id == user_id,
+            IncomeType.recurrent == True,
+            Income.id == None
+        )
+
+    @staticmethod
+    def get_month_projection_query(year: int, month: int, user_id: int):
+        """Scalar subquery summing the base value of the projected types."""
+        return IncomeService.get_projected_types_query(
+            year, month, user_id,
+            db.func.coalesce(db.func.sum(db.func.coalesce(IncomeType.base_value, 0)), 0)
+        ).scalar_subquery()
+
+    @staticmethod
+    def get_projected_range_query(months, user_id: int):
+        """Per-period sum of the base values projected into `months`, a
+        selectable with a `period` column."""
+        return db.session.query(
+            months.c.period.label('period'),
+            db.func.sum(db.func.coalesce(IncomeType.base_value, 0)).label('total')
+        ).select_from(months).join(
+            IncomeType,
+            db.and_(
+                IncomeType.user_id == user_id,
+                IncomeType.recurrent == True
+            )
+        ).outerjoin(
+            Income,
+            db.and_(
+                Income.type_id == IncomeType.id,
+                Income.period == months.c.period
+            )
+        ).filter(Income.id == None).group_by(months.c.period)
+
+    @staticmethod
+    def get_one(id: int, user_id: int, for_update: bool = False):
+        query = db.session.query(Income).join(IncomeType).filter(
             IncomeType.user_id == user_id,
             Income.id == id
-        ).first()
+        )
+        if for_update:
+            query = query.with_for_update(of=Income).populate_existing()
+        income = query.first()
 
         if not income:
             raise IncomeNotFoundException()
         return income
 
     @staticmethod
-    def create(data: IncomeInterface):
-        obj = Income(**data)
-        db.session.add(obj)
+    def create(data: IncomeInterface, user_id: int):
+        IncomeTypeService.get_one(data['type_id'], user_id=user_id)
+
+        # Upsert on (type_id, year, month), so persisting an edited virtual
+        # income does not fail if the month got materialized meanwhile. The
+        # key, row or gap, is locked first: the delta is then taken from the
+        # value the upsert replaces.
+        existing = Income.query.filter(
+            Income.type_id == data['type_id'],
+            Income.year == data.get('year'),
+            Income.month == data.get('month')
+        ).with_for_update().populate_existing().first()
+        if existing:
+            MonthlySummaryService.apply_delta(
+                existing.user_id, existing.year, existing.month,
+                **MonthlySummaryService.income_delta(existing.value, existing.received, sign=-1)
+            )
+
+        table = Income.__table__
+        stmt = mysql.insert(table).values(**data)
+        updates = {key: stmt.inserted[key] for key in ('value', 'received') if key in data}
+        result = db.session.execute(stmt.on_duplicate_key_update(
+            id=db.func.last_insert_id(table.c.id), **updates
+        ))
+
+        obj = db.session.get(Income, result.lastrowid, populate_existing=True)
+        MonthlySummaryService.apply_delta(
+            obj.user_id, obj.year, obj.month, **MonthlySummaryService.income_delta(obj.value, obj.received)
+        )
+        LedgerService.record_income(obj)
         db.session.commit()
 
+        summary_cache.invalidate_period(obj.user_id, obj.year, obj.month)
         return obj
 
     @staticmethod
     def update(id: int, data: IncomeUpdateInterface, user_id: int):
-        obj = IncomeService.get_one(id, user_id=user_id)
+        obj = IncomeService.get_one(id, user_id=user_id, for_update=True)
+        new_type = IncomeTypeService.get_one(data['type_id'], user_id=user_id) if 'type_id' in data else None
+        key = (data.get('type_id', obj.type_id), data.get('year', obj.year), data.get('month', obj.month))
+        if key != (obj.type_id, obj.year, obj.month) and Income.query.filter(
+            Income.type_id == key[0], Income.year == key[1], Income.month == key[2]
+        ).with_for_update().first():
+            raise IncomeAlreadyExistsException()
+        previous_year, previous_month = obj.year, obj.month
+        MonthlySummaryService.apply_delta(
+            user_id, obj.year, obj.month, **MonthlySummaryService.income_delta(obj.value, obj.received, sign=-1)
+        )
 
         for key, value in data.items():
             setattr(obj, key, value)
+        if new_type is not None:
+            obj.income_type = new_type
 
+        MonthlySummaryService.apply_delta(
+            user_id, obj.year, obj.month, **MonthlySummaryService.income_delta(obj.value, obj.received)
+        )
+        if (previous_year, previous_month) != (obj.year, obj.month):
+            LedgerService.remove(INCOME, user_id, previous_year, previous_month, obj.id)
+        LedgerService.record_income(obj)
         db.session.add(obj)
         db.session.commit()
+        summary_cache.invalidate_period(user_id, previous_year, previous_month)
+        summary_cache.invalidate_period(user_id, obj.year, obj.month)
 
         return obj
 
     @staticmethod
     def delete(id: int, user_id: int):
-        obj = IncomeService.get_one(id, user_id=user_id)
+        obj = IncomeService.get_one(id, user_id=user_id, for_update=True)
+        year, month = obj.year, obj.month
+        MonthlySummaryService.apply_delta(
+            user_id, year, month, **MonthlySummaryService.income_delta(obj.value, obj.received, sign=-1)
+        )
+        LedgerService.remove(INCOME, user_id, year, month, obj.id)
         db.session.delete(obj)
         db.session.commit()
-
-    @staticmethod
-    def _get_or_create(type: IncomeType, year: int, month: int):
-        income = Income.query.filter(
-            Income.type_id == type.id, Income.month == month, Income.year == year
-        ).first()
-
-        if not income:
-            data = IncomeInterface({
-                "type_id": type.id,
-                "value": type.base_value or 0,
-                "month": month,
-                "year": year,
-                "received": False,
-            })
-            income = IncomeService.create(data)
-        return income
+        summary_cache.invalidate_period(user_id, year, month)
@@ -0,0 +1,7 @@
+from copy import deepcopy
+
+def register_routes(root_api, root="/api"):
+    from .controller import api as metrics_api
+
+    root_api.add_namespace(deepcopy(metrics_api), path=f"{root}/metrics")
+    return root_api
@@ -0,0 +1,26 @@
+from flask_restx import Resource, Namespace
+from flask_accepts import responds
+from flask_login import login_required
+
+from app import api
+from ..auth.cache import identity_cache
+from ..summary.cache import summary_cache
+
+from .schema import CacheMetricsReturnSchema
+
+
+api = Namespace("Metrics", description="Counters of this API process")
+
+
+@api.route('/cache')
+class CacheMetricsResource(Resource):
+    @responds(schema=CacheMetricsReturnSchema, api=api)
+    @api.response(200, "Cache metrics successfully retrieved.")
+    @login_required
+    def get(self):
+        # The caches live in each process: these are the counters of the
+        # process serving the request.
+        return {
+            'identity': identity_cache.stats(),
+            'summary': summary_cache.stats(),
+        }
@@ -0,0 +1,14 @@
+from marshmallow import Schema, fields
+
+
+class CacheStatsSchema(Schema):
+    hits = fields.Integer(attribute="hits")
+    misses = fields.Integer(attribute="misses")
+    hitRatio = fields.Float(attribute="hit_ratio")
+    staleHits = fields.Integer(attribute="stale_hits")
+    evictions = fields.Integer(attribute="evictions")
+    entries = fields.Integer(attribute="entries")
+
+class CacheMetricsReturnSchema(Schema):
+    identity = fields.Nested(CacheStatsSchema)
+    summary = fields.Nested(CacheStatsSchema)
@@ -0,0 +1,79 @@
+import base64
+import binascii
+import json
+
+from dataclasses import dataclass
+from typing import List
+
+from flask_restx import inputs
+
+from database import db
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidPageException(Exception):
+    def __init__(self, message="Invalid page"):
+        super().__init__(message)
+
+
+@dataclass
+class Page:
+    items: List
+    next_cursor: str = None
+
+
+def page_args():
+    """Query arguments of the paginated list endpoints, for `@accepts`."""
+    return (
+        dict(name='limit', type=int, required=False, help=f"Page size, up to {MAX_PAGE_SIZE}"),
+        dict(name='cursor', type=str, required=False, help="`nextCursor` of the previous page"),
+        dict(name='all', type=inputs.boolean, required=False, default=False,
+             help="Return every row, unpaginated, as a plain list"),
+    )
+
+
+def encode_cursor(key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidPageException()
+    if not isinstance(key, list) or len(key) != size or not all(isinstance(value, int) for value in key):
+        raise InvalidPageException()
+    return key
+
+
+def paginate(query, columns, limit: int = None, cursor: str = None) -> Page:
+    """Keyset page of `query` ordered by `columns`, which must be unique
+    together. The cursor holds the key of the last row returned, so a page
+    is a range scan from it whatever its depth.
+
+    That holds when an index starts with the query's filter and then the
+    `columns`. The value lists filter on their type's user_id and order by
+    (period, id), which no index covers, so each of their pages sorts every
+    row of the user past the cursor."""
+    limit = DEFAULT_PAGE_SIZE if limit is None else limit
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise InvalidPageException()
+
+    if cursor:
+        key = decode_cursor(cursor, len(columns))
+        # (a, b) > (x, y) spelled out, which MySQL turns into an index range.
+        after = [
+            db.and_(*(column == value for column, value in zip(columns[:i], key[:i])), columns[i] > key[i])
+            for i in range(len(columns))
+        ]
+        query = query.filter(db.or_(*after))
+
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], column.key) for column in columns)
+    return Page(items=rows, next_cursor=next_cursor)
@@ -0,0 +1,34 @@
+import click
+
+from flask.cli import AppGroup
+
+from ..summary.cache import bump_generation, staleness_notice
+
+from .read_model import SavingBalanceService
+
+
+savings_cli = AppGroup('savings', help="Maintain the savings read models.")
+
+
+@savings_cli.command('check-snapshots')
+@click.option('--user-id', type=int, default=None, help="Only check this user's snapshots.")
+@click.option('--rebuild', is_flag=True, default=False, help="Rebuild the snapshots if any is inconsistent.")
+def check_snapshots(user_id, rebuild):
+    """Compare saving_balance_snapshot with the saving values, optionally rebuilding it."""
+    mismatches = SavingBalanceService.check(user_id=user_id)
+    if not mismatches:
+        click.echo("Saving balance snapshots are consistent.")
+        return
+
+    for type_id, period in mismatches:
+        year, month = divmod(period - 1, 12)
+        click.echo(f"Inconsistent snapshot: type {type_id}, {year}-{month + 1:02d}")
+    click.echo(f"{len(mismatches)} inconsistent saving balance snapshots.")
+
+    if rebuild:
+        snapshots = SavingBalanceService.rebuild(user_id=user_id)
+        bump_generation()
+        click.echo(f"Rebuilt {snapshots} saving balance snapshots.")
+        click.echo(staleness_notice())
+    else:
+        raise SystemExit(1)
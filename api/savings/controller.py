@@ -4,6 +4,7 @@ from flask_accepts import responds, accepts
 from flask_login import login_required, current_user
 
 from app import api
+from ..pagination import InvalidPageException, page_args
 from ..utils import make_json_response
 
 from .exceptions import (
@@ -21,6 +22,8 @@ from .schema import (
     SavingValueCreateSchema,
     SavingsSummarySchema,
     SavingValueUpdateSchema,
+    SavingValuePageSchema,
+    SavingTypePageSchema,
 )
 
 
@@ -29,12 +32,20 @@ api = Namespace("Savings", description="Access to your savings")
 
 @api.route('/type')
 class SavingTypeResource(Resource):
-    @responds(schema=SavingTypeReturnSchema(many=True), api=api)
+    @accepts(*page_args(), api=api)
+    @responds(schema=SavingTypePageSchema, api=api)
     @api.response(200, "Saving types successfully retrieved.")
     @login_required
     def get(self):
         user_id = current_user.id
-        return SavingTypeService.get_all(user_id=user_id)
+        args = request.parsed_args
+        if args['all']:
+            saving_types = SavingTypeService.get_all(user_id=user_id)
+            return make_json_response(data=SavingTypeReturnSchema(many=True).dump(saving_types), code=200)
+        try:
+            return SavingTypeService.get_page(user_id=user_id, limit=args['limit'], cursor=args['cursor'])
+        except InvalidPageException:
+            return make_json_response(data={"code": 400, "message": "Invalid page"}, code=400)
 
     @accepts(schema=SavingTypeSchema, api=api)
     @responds(schema=SavingTypeReturnSchema, api=api)
@@ -84,17 +95,31 @@ class SavingTypeIdResource(Resource):
 
 @api.route('/')
 class SavingValueResource(Resource):
-    @responds(schema=SavingValueReturnSchema(many=True), api=api)
+    @accepts(*page_args(), api=api)
+    @responds(schema=SavingValuePageSchema, api=api)
     @api.response(200, "Saving values successfully retrieved.")
+    @login_required
     def get(self):
         user_id = current_user.id
-        return SavingValueService.get_all(user_id=user_id)
+        args = request.parsed_args
+        if args['all']:
+            saving_values = SavingValueService.get_all(user_id=user_id)
+            return make_json_response(data=SavingValueReturnSchema(many=True).dump(saving_values), code=200)
+        try:
+            return SavingValueService.get_page(user_id=user_id, limit=args['limit'], cursor=args['cursor'])
+        except InvalidPageException:
+            return make_json_response(data={"code": 400, "message": "Invalid page"}, code=400)
 
     @accepts(schema=SavingValueCreateSchema, api=api)
     @responds(schema=SavingValueReturnSchema, api=api)
     @api.response(201, "Saving value successfully created.")
+    @login_required
     def post(self):
-        new_saving_value = SavingValueService.create(request.parsed_obj)
+        user_id = current_user.id
+        try:
+            new_saving_value = SavingValueService.create(request.parsed_obj, user_id=user_id)
+        except SavingTypeNotFoundException:
+            return make_json_response(data={"code": 404, "message": "Saving Type not found"}, code=404)
         return make_json_response(data=SavingValueReturnSchema().dump(new_saving_value), code=201)
 
 
@@ -102,6 +127,7 @@ class SavingValueResource(Resource):
 class SavingValueIdResource(Resource):
     @responds(schema=SavingValueReturnSchema, api=api)
     @api.response(200, "Saving value successfully retrieved.")
+    @login_required
     def get(self, id):
         user_id = current_user.id
         try:
@@ -112,15 +138,19 @@ class SavingValueIdResource(Resource):
     @accepts(schema=SavingValueUpdateSchema, api=api)
     @responds(schema=SavingValueReturnSchema, api=api)
     @api.response(200, "Saving value successfully edited.")
+    @login_required
     def put(self, id):
         user_id = current_user.id
         try:
             return SavingValueService.update(id, request.parsed_obj, user_id=user_id)
-        except:
+        except SavingTypeNotFoundException:
+            return make_json_response(data={"code": 404, "message": "Saving Type not found"}, code=404)
+        except SavingValueNotFoundException:
            return make_json_response(data={"code": 404, "message": "Saving Value not found"}, code=404)
 
     @responds(status_code=204, api=api)
     @api.response(204, "Saving value successfully deleted.")
+    @login_required
     def delete(self, id):
         user_id = current_user.id
         try:
@@ -133,6 +163,7 @@ class SavingValueIdResource(Resource):
 class SavingSummaryResource(Resource):
     @responds(schema=SavingsSummarySchema(many=True), api=api)
     @api.response(200, "Savings summary successfully retrieved.")
+    @login_required
     def get(self, year, month):
         user_id = current_user.id
         return SavingValueService.get_savings_summary_list(year=year, month=month, user_id=user_id)
@@ -1,27 +1,45 @@
 from datetime import datetime
 
+from sqlalchemy.orm import validates
+
 from database import db
 
+from ..utils import period_default, sync_period
+
 
 class SavingType(db.Model):
+    __table_args__ = (
+        db.Index('ix_saving_type_user_id_active', 'user_id', 'active'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
     active = db.Column(db.Boolean, default=False)
     base_value = db.Column(db.Numeric(precision=10, scale=2))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
-    saving_values = db.relationship('SavingValue', backref='saving_type', cascade="all,delete", lazy=True)
+    saving_values = db.relationship('SavingValue', backref='saving_type', cascade="all,delete", passive_deletes=True, lazy=True)
     user = db.relationship('User', backref='saving_type')
 
 
 class SavingValue(db.Model):
+    __table_args__ = (
+        db.Index('ix_saving_value_type_id_period', 'type_id', 'period'),
+        db.Index('ix_saving_value_type_id_used_year_month', 'type_id', 'used', 'year', 'month'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.Numeric(precision=10, scale=2), nullable=False)
     month = db.Column(db.Integer, nullable=False, default=datetime.today().month)
     year = db.Column(db.Integer, nullable=False, default=datetime.today().year)
-    type_id = db.Column(db.Integer, db.ForeignKey('saving_type.id'), nullable=False)
+    period = db.Column(db.Integer, nullable=False, default=period_default)
+    type_id = db.Column(db.Integer, db.ForeignKey('saving_type.id', ondelete='CASCADE'), nullable=False)
     used = db.Column(db.Boolean, default=False)
 
+    @validates('year', 'month')
+    def _sync_period(self, key, value):
+        return sync_period(self, key, value)
+
     @property
     def type_name(self):
         return self.saving_type.name
@@ -33,3 +51,16 @@ class SavingValue(db.Model):
     @property
     def user(self):
         return self.saving_type.user
+
+
+class SavingBalanceSnapshot(db.Model):
+    """Running used and unused totals of a saving type up to and including
+    `period`, kept up to date by the saving value services. `month_unused` is
+    the period's own unused total."""
+    __tablename__ = 'saving_balance_snapshot'
+
+    type_id = db.Column(db.Integer, db.ForeignKey('saving_type.id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    period = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    used_total = db.Column(db.Numeric(precision=12, scale=2), nullable=False, default=0, server_default='0')
+    unused_total = db.Column(db.Numeric(precision=12, scale=2), nullable=False, default=0, server_default='0')
+    month_unused = db.Column(db.Numeric(precision=12, scale=2), nullable=False, default=0, server_default='0')
@@ -0,0 +1,172 @@
+from sqlalchemy.dialects import mysql
+
+from database import db
+
+from ..utils import to_period
+
+from .model import SavingBalanceSnapshot, SavingType, SavingValue
+
+
+SNAPSHOT_TOTALS = ('used_total', 'unused_total', 'month_unused')
+
+
+class SavingBalanceService:
+    """Maintains the `saving_balance_snapshot` prefix sums, so a type's balance
+    as of any month is the latest snapshot at or before it.
+
+    Like the summary read models, writes join the caller's transaction."""
+
+    @staticmethod
+    def value_delta(value, used, sign: int = 1):
+        value = sign * (value or 0)
+        return {
+            'used_total': value if used == True else 0,
+            'unused_total': value if used == False else 0
+        }
+
+    @staticmethod
+    def apply_delta(type_id: int, year: int, month: int, used_total=0, unused_total=0):
+        """Add the totals to the period's snapshot and to every later one.
+
+        The snapshot is created even for zero totals, as `rebuild` does for a
+        month whose values sum to zero."""
+        period = to_period(year, month)
+
+        # A new snapshot starts from the running totals of the previous one,
+        # locked so that a concurrent write cannot change them until we commit.
+        previous = db.session.query(
+            SavingBalanceSnapshot.used_total, SavingBalanceSnapshot.unused_total
+        ).filter(
+            SavingBalanceSnapshot.type_id == type_id,
+            SavingBalanceSnapshot.period < period
+        ).order_by(SavingBalanceSnapshot.period.desc()).with_for_update().first()
+        db.session.execute(mysql.insert(SavingBalanceSnapshot.__table__).prefix_with('IGNORE').values(
+            type_id=type_id,
+            period=period,
+            used_total=previous.used_total if previous else 0,
+            unused_total=previous.unused_total if previous else 0,
+            month_unused=0
+        ))
+        if not (used_total or unused_total):
+            return
+
+        SavingBalanceSnapshot.query.filter(
+            SavingBalanceSnapshot.type_id == type_id,
+            SavingBalanceSnapshot.period >= period
+        ).update({
+            'used_total': SavingBalanceSnapshot.used_total + used_total,
+            'unused_total': SavingBalanceSnapshot.unused_total + unused_total,
+            'month_unused': SavingBalanceSnapshot.month_unused + db.case(
+                (SavingBalanceSnapshot.period == period, unused_total), else_=0
+            )
+        }, synchronize_session=False)
+
+    @staticmethod
+    def latest_period_query(type_id, period: int):
+        """Scalar subquery of the latest snapshot period of `type_id` up to `period`."""
+        snapshot = db.aliased(SavingBalanceSnapshot)
+        return db.select(db.func.max(snapshot.period)).where(
+            snapshot.type_id == type_id,
+            snapshot.period <= period
+        ).scalar_subquery()
+
+    @staticmethod
+    def balance_columns(period: int):
+        """Balance (unused values before `period` minus used values up to it)
+        and current month value, read from the latest snapshot."""
+        current_value = db.case(
+            (SavingBalanceSnapshot.period == period, SavingBalanceSnapshot.month_unused), else_=0
+        )
+        balance = (
+            db.func.coalesce(SavingBalanceSnapshot.unused_total, 0)
+            - db.func.coalesce(SavingBalanceSnapshot.used_total, 0)
+            - current_value
+        )
+        return balance, current_value
+
+    @staticmethod
+    def get_balance(type_id: int, year: int, month: int):
+        period = to_period(year, month)
+        balance, _ = SavingBalanceService.balance_columns(period)
+        result = db.session.query(balance).filter(
+            SavingBalanceSnapshot.type_id == type_id,
+            SavingBalanceSnapshot.period <= period
+        ).order_by(SavingBalanceSnapshot.period.desc()).limit(1).scalar()
+        return result or 0
+
+    @staticmethod
+    def expected_query(user_id: int = None):
+        """The snapshots as computed from the saving values."""
+        used = db.func.sum(db.case((SavingValue.used == True, SavingValue.value), else_=0))
+        unused = db.func.sum(db.case((SavingValue.used == False, SavingValue.value), else_=0))
+        window = dict(partition_by=SavingValue.type_id, order_by=SavingValue.period)
+
+        query = db.session.query(
+            SavingValue.type_id.label('type_id'),
+            SavingValue.period.label('period'),
+            db.func.sum(used).over(**window).label('used_total'),
+            db.func.sum(unused).over(**window).label('unused_total'),
+            unused.label('month_unused'),
+        ).group_by(SavingValue.type_id, SavingValue.period)
+        if user_id is not None:
+            query = query.join(SavingType, SavingValue.type_id == SavingType.id).filter(
+                SavingType.user_id == user_id
+            )
+        return query
+
+    @staticmethod
+    def _stored_query(user_id: int = None):
+        query = SavingBalanceSnapshot.query
+        if user_id is not None:
+            query = query.join(SavingType, SavingBalanceSnapshot.type_id == SavingType.id).filter(
+                SavingType.user_id == user_id
+            )
+        return query
+
+    @staticmethod
+    def check(user_id: int = None):
+        """Keys of the stored snapshots that disagree with the saving values,
+        and of the ones that are missing."""
+        expected = {}
+        for row in SavingBalanceService.expected_query(user_id).all():
+            expected.setdefault(row.type_id, {})[row.period] = tuple(getattr(row, key) for key in SNAPSHOT_TOTALS)
+        stored = {
+            (row.type_id, row.period): tuple(getattr(row, key) for key in SNAPSHOT_TOTALS)
+            for row in SavingBalanceService._stored_query(user_id).all()
+        }
+
+        mismatches = [
+            (type_id, period)
+            for type_id, periods in expected.items()
+            for period, totals in periods.items()
+            if stored.get((type_id, period)) != totals
+        ]
+        for (type_id, period), totals in stored.items():
+            periods = expected.get(type_id, {})
+            if period in periods:
+                continue
+            # A snapshot whose values were all moved or deleted is still valid
+            # if it carries the running totals of the previous month with values.
+            previous = [key for key in periods if key < period]
+            used_total, unused_total, _ = periods[max(previous)] if previous else (0, 0, 0)
+            if totals != (used_total, unused_total, 0):
+                mismatches.append((type_id, period))
+        return sorted(mismatches)
+
+    @staticmethod
+    def rebuild(user_id: int = None):
+        """Recompute the snapshots from the saving values; returns their number."""
+        delete = SavingBalanceSnapshot.query
+        if user_id is not None:
+            delete = delete.filter(SavingBalanceSnapshot.type_id.in_(
+                db.select(SavingType.id).where(SavingType.user_id == user_id)
+            ))
+        delete.delete(synchronize_session=False)
+
+        subquery = SavingBalanceService.expected_query(user_id).subquery()
+        db.session.execute(SavingBalanceSnapshot.__table__.insert().from_select(
+            [column.name for column in subquery.c], db.select(*subquery.c)
+        ))
+        db.session.commit()
+
+        return SavingBalanceService._stored_query(user_id).count()
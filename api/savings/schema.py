@@ -17,6 +17,11 @@ class SavingValueReturnSchema(Schema):
     used = fields.Boolean(attribute="used")
 
 
+class SavingValuePageSchema(Schema):
+    items = fields.List(fields.Nested(SavingValueReturnSchema), attribute="items")
+    nextCursor = fields.String(attribute="next_cursor", allow_none=True)
+
+
 class SavingTypeReturnSchema(Schema):
     id = fields.Integer(attribute="id")
     name = fields.String(attribute="name")
@@ -25,6 +30,12 @@ class SavingTypeReturnSchema(Schema):
     savingValues = fields.List(fields.Nested(SavingValueReturnSchema), required=False, attribute="saving_values")
 
 
+class SavingTypePageSchema(Schema):
+    # Without the values: those are paged by the value list endpoint.
+    items = fields.List(fields.Nested(SavingTypeReturnSchema, exclude=('savingValues',)), attribute="items")
+    nextCursor = fields.String(attribute="next_cursor", allow_none=True)
+
+
 class SavingValueCreateSchema(Schema):
     typeId = fields.Integer(attribute="type_id")
     value = fields.Float(attribute="value")
@@ -1,9 +1,16 @@
 from database import db
 
+from ..pagination import paginate
+from ..summary import cache as summary_cache
+from ..summary.read_model import SAVING, LedgerService, MonthlySummaryService
+from ..utils import to_period
+
 from .model import (
+    SavingBalanceSnapshot,
     SavingValue, 
     SavingType
 )
+from .read_model import SavingBalanceService
 from .exceptions import (
     SavingTypeNotFoundException,
     SavingValueNotFoundException
@@ -18,7 +25,18 @@ from .interface import (
 class SavingTypeService:
     @staticmethod
     def get_all(user_id: int):
-        return SavingType.query.filter(SavingType.user_id == user_id).all()
+        return SavingType.query.options(db.selectinload(SavingType.saving_values)).filter(
+            SavingType.user_id == user_id
+        ).all()
+
+    @staticmethod
+    def get_page(user_id: int, limit: int = None, cursor: str = None):
+        return paginate(
+            SavingType.query.filter(SavingType.user_id == user_id),
+            (SavingType.id,),
+            limit=limit,
+            cursor=cursor
+        )
 
     @staticmethod
     def get_active(user_id: int):
@@ -54,7 +72,11 @@ class SavingTypeService:
             setattr(obj, key, value)
 
         db.session.add(obj)
+        if 'name' in data:
+            db.session.flush()
+            LedgerService.refresh_type(SAVING, id)
         db.session.commit()
+        summary_cache.invalidate_user(user_id)
 
         return obj
 
@@ -62,21 +84,42 @@ class SavingTypeService:
     def delete(id: int, user_id: int):
         obj = SavingTypeService.get_one(id, user_id=user_id)
 
+        MonthlySummaryService.apply_grouped_delta(
+            MonthlySummaryService.saving_totals_query().filter(SavingValue.type_id == id), sign=-1
+        )
+        LedgerService.remove_type(SAVING, id)
         db.session.delete(obj)
         db.session.commit()
+        summary_cache.invalidate_user(user_id)
 
 
 class SavingValueService:
     @staticmethod
     def get_all(user_id: int):
-        return db.session.query(SavingValue).join(SavingType).filter(SavingType.user_id == user_id).all()
+        return db.session.query(SavingValue).join(SavingType).options(
+            db.contains_eager(SavingValue.saving_type)
+        ).filter(SavingType.user_id == user_id).all()
 
     @staticmethod
-    def get_one(id: int, user_id: int):
-        saving_type =  db.session.query(SavingValue).join(SavingType).filter(
+    def get_page(user_id: int, limit: int = None, cursor: str = None):
+        return paginate(
+            db.session.query(SavingValue).join(SavingType).options(db.contains_eager(SavingValue.saving_type)).filter(
+                SavingType.user_id == user_id
+            ),
+            (SavingValue.period, SavingValue.id),
+            limit=limit,
+            cursor=cursor
+        )
+
+    @staticmethod
+    def get_one(id: int, user_id: int, for_update: bool = False):
+        query = db.session.query(SavingValue).join(SavingType).filter(
             SavingType.user_id == user_id,
             SavingValue.id == id
-        ).first()
+        )
+        if for_update:
+            query = query.with_for_update(of=SavingValue).populate_existing()
+        saving_type = query.first()
 
         if not saving_type:
             raise SavingValueNotFoundException()
@@ -84,33 +127,49 @@ class SavingValueService:
 
     @staticmethod
     def get_savings_summary_list(year: int, month: int, user_id: int):
-        savings_summary = []
-        saving_types = SavingTypeService.get_active(user_id=user_id)
-
-        for saving_type in saving_types:
-            balance = SavingValueService._get_balance_by_type_and_date(saving_type.id, year, month)
-            current_value = 0
-
-            current_month_savings = SavingValue.query.filter(
-                SavingValue.type_id == saving_type.id, 
-                SavingValue.year == year, 
-                SavingValue.month == month,
-                SavingValue.used == False
-            ).all()
-            current_value = sum(saving.value for saving in current_month_savings)
-
-            savings_summary.append({
-                'saving_type_id': saving_type.id,
-                'name': saving_type.name,
+        """Concurrent callers for the same user and period share one computation."""
+        return summary_cache.summary_flight.do(
+            (user_id, year, month, summary_cache.SAVINGS_SUMMARY),
+            lambda: SavingValueService._compute_savings_summary_list(year=year, month=month, user_id=user_id)
+        )
+
+    @staticmethod
+    def _compute_savings_summary_list(year: int, month: int, user_id: int):
+        """Balance and current month value of every active type, in one
+        statement reading each type's latest balance snapshot."""
+        period = to_period(year, month)
+        balance, current_value = SavingBalanceService.balance_columns(period)
+        rows = db.session.query(
+            SavingType.id,
+            SavingType.name,
+            balance,
+            current_value
+        ).outerjoin(
+            SavingBalanceSnapshot,
+            db.and_(
+                SavingBalanceSnapshot.type_id == SavingType.id,
+                SavingBalanceSnapshot.period == SavingBalanceService.latest_period_query(SavingType.id, period)
+            )
+        ).filter(
+            SavingType.active == True,
+            SavingType.user_id == user_id
+        ).order_by(SavingType.id).all()
+
+        return [
+            {
+                'saving_type_id': type_id,
+                'name': name,
                 'balance': balance,
                 'current_month_value': current_value
-            })
-
-        return savings_summary
+            }
+            for type_id, name, balance, current_value in rows
+        ]
 
     @staticmethod
     def get_all_by_date(year: int, month: int, user_id: int):
-        return db.session.query(SavingValue).join(SavingType).filter(
+        return db.session.query(SavingValue).join(SavingType).options(
+            db.contains_eager(SavingValue.saving_type)
+        ).filter(
             SavingType.user_id == user_id,
             SavingValue.year == year,
             SavingValue.month == month
@@ -118,7 +177,9 @@ class SavingValueService:
 
     @staticmethod
     def get_unused_by_date(year: int, month: int, user_id: int):
-        return db.session.query(SavingValue).join(SavingType).filter(
+        return db.session.query(SavingValue).join(SavingType).options(
+            db.contains_eager(SavingValue.saving_type)
+        ).filter(
             SavingValue.used == False,
             SavingValue.year == year,
             SavingValue.month == month,
@@ -126,68 +187,73 @@ class SavingValueService:
         ).all()
 
     @staticmethod
-    def create(data: SavingValueInterface):
+    def create(data: SavingValueInterface, user_id: int):
+        SavingTypeService.get_one(data['type_id'], user_id=user_id)
+
         obj = SavingValue(**data)
         db.session.add(obj)
+        db.session.flush()
+        MonthlySummaryService.apply_delta(
+            obj.user_id, obj.year, obj.month, **MonthlySummaryService.saving_delta(obj.value, obj.used)
+        )
+        LedgerService.record_saving(obj)
+        SavingBalanceService.apply_delta(
+            obj.type_id, obj.year, obj.month, **SavingBalanceService.value_delta(obj.value, obj.used)
+        )
         db.session.commit()
+        summary_cache.invalidate_period(obj.user_id, obj.year, obj.month)
 
         return obj
     
     @staticmethod
     def update(id: int, data: SavingValueUpdateInterface, user_id: int):
-        obj = SavingValueService.get_one(id, user_id=user_id)
+        obj = SavingValueService.get_one(id, user_id=user_id, for_update=True)
+        new_type = SavingTypeService.get_one(data['type_id'], user_id=user_id) if 'type_id' in data else None
+        previous_year, previous_month = obj.year, obj.month
+        MonthlySummaryService.apply_delta(
+            user_id, obj.year, obj.month, **MonthlySummaryService.saving_delta(obj.value, obj.used, sign=-1)
+        )
+        SavingBalanceService.apply_delta(
+            obj.type_id, obj.year, obj.month, **SavingBalanceService.value_delta(obj.value, obj.used, sign=-1)
+        )
 
         for key, value in data.items():
             setattr(obj, key, value)
-
+        if new_type is not None:
+            obj.saving_type = new_type
+
+        MonthlySummaryService.apply_delta(
+            user_id, obj.year, obj.month, **MonthlySummaryService.saving_delta(obj.value, obj.used)
+        )
+        if (previous_year, previous_month) != (obj.year, obj.month):
+            LedgerService.remove(SAVING, user_id, previous_year, previous_month, obj.id)
+        LedgerService.record_saving(obj)
+        SavingBalanceService.apply_delta(
+            obj.type_id, obj.year, obj.month, **SavingBalanceService.value_delta(obj.value, obj.used)
+        )
         db.session.add(obj)
         db.session.commit()
+        summary_cache.invalidate_period(user_id, previous_year, previous_month)
+        summary_cache.invalidate_period(user_id, obj.year, obj.month)
 
         return obj
 
     @staticmethod
     def delete(id: int, user_id: int):
-        obj = SavingValueService.get_one(id, user_id=user_id)
+        obj = SavingValueService.get_one(id, user_id=user_id, for_update=True)
+        year, month = obj.year, obj.month
+        MonthlySummaryService.apply_delta(
+            user_id, year, month, **MonthlySummaryService.saving_delta(obj.value, obj.used, sign=-1)
+        )
+        LedgerService.remove(SAVING, user_id, year, month, obj.id)
+        SavingBalanceService.apply_delta(
+            obj.type_id, year, month, **SavingBalanceService.value_delta(obj.value, obj.used, sign=-1)
+        )
 
         db.session.delete(obj)
         db.session.commit()
-
-    @staticmethod
-    def _get_unused_by_type_and_date(type_id: int, year: int, month: int):
-        selected_year = SavingValue.query.filter(
-            SavingValue.type_id == type_id,
-            SavingValue.used == False,
-            SavingValue.year == year,
-            SavingValue.month < month
-        ).all()
-        previous_year = SavingValue.query.filter(
-            SavingValue.type_id == type_id,
-            SavingValue.used == False,
-            SavingValue.year < year,
-        ).all()
-        return selected_year + previous_year
-
-    @staticmethod
-    def _get_used_by_type_and_date(type_id: int, year: int, month: int):
-        selected_year = SavingValue.query.filter(
-            SavingValue.type_id == type_id,
-            SavingValue.used == True,
-            SavingValue.year == year,
-            SavingValue.month <= month
-        ).all()
-        previous_year = SavingValue.query.filter(
-            SavingValue.type_id == type_id,
-            SavingValue.used == True,
-            SavingValue.year < year,
-        ).all()
-        return selected_year + previous_year
+        summary_cache.invalidate_period(user_id, year, month)
 
     @staticmethod
     def _get_balance_by_type_and_date(type_id: int, year: int, month: int):
-        used_savings = SavingValueService._get_used_by_type_and_date(type_id, year, month)
-        unused_savings = SavingValueService._get_unused_by_type_and_date(type_id, year, month)
-
-        used_value = sum(saving.value for saving in used_savings)
-        unused_value = sum(saving.value for saving in unused_savings)
-
-        return unused_value - used_value
+        return SavingBalanceService.get_balance(type_id, year, month)
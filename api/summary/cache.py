@@ -0,0 +1,106 @@
+import threading
+import time
+
+from datetime import date
+
+from sqlalchemy.dialects import mysql
+
+from database import db
+
+from ..cache import BackgroundRefresher, SingleFlight, TTLCache
+from ..utils import to_period
+
+from .model import SummaryCacheGeneration
+
+
+SUMMARY = 'summary'
+SUMMARY_LIST = 'list'
+SAVINGS_SUMMARY = 'savings'
+
+summary_cache = TTLCache()
+summary_flight = SingleFlight()
+summary_refresher = BackgroundRefresher()
+
+# Closed months rarely change, so they are kept much longer than the current
+# one. Writes made by other processes, like the CLI commands, bump the shared
+# generation instead, which `sync_generation` picks up.
+_ttls = {
+    'current': {'stale_after': 60, 'ttl': 300},
+    'past': {'stale_after': 3600, 'ttl': 86400},
+}
+_sync = {'interval': 5, 'checked': 0.0, 'generation': None}
+_sync_lock = threading.Lock()
+
+
+def configure(app):
+    summary_cache.configure(
+        maxsize=app.config.get('SUMMARY_CACHE_MAXSIZE', 4096),
+        ttl=app.config.get('SUMMARY_CACHE_TTL', 300),
+    )
+    _ttls['current'] = {
+        'stale_after': app.config.get('SUMMARY_CACHE_SOFT_TTL', 60),
+        'ttl': app.config.get('SUMMARY_CACHE_TTL', 300),
+    }
+    _ttls['past'] = {
+        'stale_after': app.config.get('SUMMARY_CACHE_PAST_SOFT_TTL', 3600),
+        'ttl': app.config.get('SUMMARY_CACHE_PAST_TTL', 86400),
+    }
+    _sync.update(
+        interval=app.config.get('SUMMARY_CACHE_SYNC_INTERVAL', 5), checked=time.monotonic(), generation=None
+    )
+
+
+def ttls_for(year: int, month: int):
+    today = date.today()
+    if to_period(year, month) < to_period(today.year, today.month):
+        return _ttls['past']
+    return _ttls['current']
+
+
+def max_staleness() -> float:
+    """Seconds a summary may still be served from the cache after a write
+    made outside this process and followed by `bump_generation`."""
+    return _sync['interval']
+
+
+def staleness_notice() -> str:
+    return f"Running API servers drop their cached summaries within {max_staleness():g} seconds."
+
+
+def bump_generation():
+    """Make every API server drop its cached summaries at its next sync, after
+    writing the read models outside of them."""
+    table = SummaryCacheGeneration.__table__
+    db.session.execute(mysql.insert(table).values(id=1, generation=1).on_duplicate_key_update(
+        generation=table.c.generation + 1
+    ))
+    db.session.commit()
+
+
+def sync_generation():
+    """Drop the cached summaries if the shared generation changed since the
+    last check, which is made at most once per sync interval. The first check
+    always drops them, as the generation they were cached under is unknown."""
+    now = time.monotonic()
+    with _sync_lock:
+        if now - _sync['checked'] < _sync['interval']:
+            return
+        _sync['checked'] = now
+
+    # On its own connection, so that the caller's transaction does not start here.
+    with db.engine.connect() as connection:
+        generation = connection.execute(db.select(SummaryCacheGeneration.generation)).scalar() or 0
+    with _sync_lock:
+        if generation == _sync['generation']:
+            return
+        _sync['generation'] = generation
+    summary_cache.invalidate_where(lambda key, value: True)
+
+
+def invalidate_period(user_id: int, year: int, month: int):
+    for kind in (SUMMARY, SUMMARY_LIST):
+        summary_cache.invalidate((user_id, year, month, kind))
+
+
+def invalidate_user(user_id: int):
+    summary_cache.invalidate_where(lambda key, value: key[0] == user_id)
@@ -0,0 +1,20 @@
+import click
+
+from flask.cli import AppGroup
+
+from .cache import bump_generation, staleness_notice
+from .read_model import LedgerService, MonthlySummaryService
+
+
+summary_cli = AppGroup('summary', help="Maintain the summary read models.")
+
+
+@summary_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help="Only rebuild this user's read models.")
+def rebuild(user_id):
+    """Recompute monthly_summary and ledger_entry from the expense, income and saving tables."""
+    months = MonthlySummaryService.rebuild(user_id=user_id)
+    entries = LedgerService.rebuild(user_id=user_id)
+    bump_generation()
+    click.echo(f"Rebuilt {months} monthly summaries and {entries} ledger entries.")
+    click.echo(staleness_notice())
@@ -1,11 +1,18 @@
 from flask import request
 from flask_restx import Resource, Namespace
-from flask_accepts import responds
+from flask_accepts import accepts, responds
 from flask_login import login_required, current_user
 
 from app import api
+from ..utils import make_json_response, parse_year_month
 
-from .schema import SummaryReturnSchema, SummaryListReturnSchema
+from .exceptions import InvalidSummaryRangeException
+from .schema import (
+    SummaryReturnSchema,
+    SummaryListReturnSchema,
+    SummaryRangeReturnSchema,
+    SummaryForecastReturnSchema
+)
 from .service import SummaryService
 
 
@@ -30,3 +37,46 @@ class SummaryListResource(Resource):
     def get(self, year, month):
         user_id = current_user.id
         return SummaryService.get_summary_list(year=year, month=month, user_id=user_id)
+
+
+@api.route('/range')
+class SummaryRangeResource(Resource):
+    @accepts(
+        dict(name='from', type=str, required=True, help="First month, as YYYY-MM"),
+        dict(name='to', type=str, required=True, help="Last month, as YYYY-MM"),
+        api=api
+    )
+    @responds(schema=SummaryRangeReturnSchema(many=True), api=api)
+    @api.response(200, "Summary range successfully retrieved.")
+    @login_required
+    def get(self):
+        user_id = current_user.id
+        try:
+            from_year, from_month = parse_year_month(request.parsed_args['from'])
+            to_year, to_month = parse_year_month(request.parsed_args['to'])
+            return SummaryService.get_summary_range(
+                from_year=from_year,
+                from_month=from_month,
+                to_year=to_year,
+                to_month=to_month,
+                user_id=user_id
+            )
+        except (ValueError, InvalidSummaryRangeException):
+            return make_json_response(data={"code": 400, "message": "Invalid summary range"}, code=400)
+
+
+@api.route('/forecast')
+class SummaryForecastResource(Resource):
+    @accepts(
+        dict(name='months', type=int, required=True, help="Number of months to forecast, from the current one"),
+        api=api
+    )
+    @responds(schema=SummaryForecastReturnSchema(many=True), api=api)
+    @api.response(200, "Summary forecast successfully retrieved.")
+    @login_required
+    def get(self):
+        user_id = current_user.id
+        try:
+            return SummaryService.get_forecast(months=request.parsed_args['months'], user_id=user_id)
+        except InvalidSummaryRangeException:
+            return make_json_response(data={"code": 400, "message": "Invalid forecast range"}, code=400)
@@ -0,0 +1,3 @@
+class InvalidSummaryRangeException(Exception):
+    def __init__(self, message="Invalid summary range"):
+        super().__init__(message)
@@ -19,3 +19,4 @@ class SummaryItem:
     status: bool
     model: SummaryItemModelEnum
     category_name: str
+    virtual: bool = False
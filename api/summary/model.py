@@ -0,0 +1,47 @@
+from database import db
+
+
+class MonthlySummary(db.Model):
+    """Running totals of a user's month, kept up to date by the services that
+    write expenses, incomes and savings. Virtual recurrent rows are not stored."""
+    __tablename__ = 'monthly_summary'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, autoincrement=False)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    expenses_total = db.Column(db.Numeric(precision=12, scale=2), nullable=False, default=0, server_default='0')
+    incomes_total = db.Column(db.Numeric(precision=12, scale=2), nullable=False, default=0, server_default='0')
+    savings_total = db.Column(db.Numeric(precision=12, scale=2), nullable=False, default=0, server_default='0')
+    paid_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    received_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+
+class LedgerEntry(db.Model):
+    """One row per expense, income and saving value, denormalized for the
+    summary list. The primary key clusters a user's month together."""
+    __tablename__ = 'ledger_entry'
+    __table_args__ = (
+        db.Index('ix_ledger_entry_model_type_id', 'model', 'type_id'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, autoincrement=False)
+    period = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    model = db.Column(db.String(10), primary_key=True)
+    item_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    type_id = db.Column(db.Integer, nullable=False)
+    type_name = db.Column(db.String(80), nullable=False)
+    category = db.Column(db.String(20), nullable=False)
+    value = db.Column(db.Numeric(precision=10, scale=2), nullable=False)
+    status = db.Column(db.Boolean, nullable=False, default=False)
+
+
+class SummaryCacheGeneration(db.Model):
+    """Single row counting the writes made to the read models outside the API,
+    like the CLI commands'. API servers drop their cached summaries when it
+    changes."""
+    __tablename__ = 'summary_cache_generation'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    generation = db.Column(db.Integer, nullable=False, default=0, server_default='0')
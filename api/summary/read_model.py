@@ -0,0 +1,335 @@
+from typing import List
+
+from sqlalchemy.dialects import mysql
+
+from database import db
+
+from ..expenses.model import Expense, ExpenseType
+from ..incomes.model import Income, IncomeType
+from ..savings.model import SavingType, SavingValue
+
+from ..utils import to_period
+
+from .interface import SummaryItemModelEnum
+from .model import LedgerEntry, MonthlySummary
+
+
+EXPENSE = SummaryItemModelEnum.EXPENSE.value
+INCOME = SummaryItemModelEnum.INCOME.value
+SAVING = SummaryItemModelEnum.SAVING.value
+
+SOURCES = {EXPENSE: Expense, INCOME: Income, SAVING: SavingValue}
+
+KEY = ('user_id', 'year', 'month')
+TOTALS = ('expenses_total', 'incomes_total', 'savings_total', 'paid_count', 'received_count')
+
+
+class MonthlySummaryService:
+    """Maintains the `monthly_summary` read model.
+
+    Deltas are executed on the caller's session and committed with the write
+    that caused them.
+    """
+
+    @staticmethod
+    def get(user_id: int, year: int, month: int):
+        return db.session.get(MonthlySummary, (user_id, year, month))
+
+    @staticmethod
+    def expense_delta(value, paid, sign: int = 1):
+        return {'expenses_total': sign * (value or 0), 'paid_count': sign * int(bool(paid))}
+
+    @staticmethod
+    def income_delta(value, received, sign: int = 1):
+        return {'incomes_total': sign * (value or 0), 'received_count': sign * int(bool(received))}
+
+    @staticmethod
+    def saving_delta(value, used, sign: int = 1):
+        return {'savings_total': 0 if used else sign * (value or 0)}
+
+    @staticmethod
+    def apply_delta(user_id: int, year: int, month: int, **delta):
+        MonthlySummaryService.apply_deltas([dict(user_id=user_id, year=year, month=month, **delta)])
+
+    @staticmethod
+    def apply_deltas(rows: List[dict]):
+        """Add each row's totals to its (user_id, year, month) summary in one upsert."""
+        rows = [row for row in rows if any(row.get(key) for key in TOTALS)]
+        if not rows:
+            return
+
+        # A multi-row VALUES list needs the same keys on every row.
+        keys = sorted({key for row in rows for key in row if key in TOTALS})
+        values = [
+            dict({key: row[key] for key in KEY}, **{key: row.get(key, 0) for key in keys})
+            for row in rows
+        ]
+
+        table = MonthlySummary.__table__
+        stmt = mysql.insert(table).values(values)
+        db.session.execute(stmt.on_duplicate_key_update(**{
+            key: table.c[key] + stmt.inserted[key] for key in keys
+        }))
+
+    @staticmethod
+    def apply_grouped_delta(query, sign: int = 1):
+        """Apply the per-month deltas selected by `query`, whose labelled columns
+        are user_id, year, month and summary totals.
+
+        The rows summed are locked, so they cannot change before the caller
+        writes them and applies the opposite delta."""
+        rows = [
+            {key: value if key in KEY else sign * (value or 0) for key, value in row._asdict().items()}
+            for row in query.with_for_update().all()
+        ]
+        MonthlySummaryService.apply_deltas(rows)
+
+    @staticmethod
+    def expense_totals_query(value=None):
+        """Per-month totals of the expenses, summing `value` (defaults to the expense's value)."""
+        return db.session.query(
+            ExpenseType.user_id.label('user_id'),
+            Expense.year.label('year'),
+            Expense.month.label('month'),
+            db.func.sum(Expense.value if value is None else value).label('expenses_total'),
+            db.func.sum(db.case((Expense.paid == True, 1), else_=0)).label('paid_count'),
+        ).join(ExpenseType, Expense.type_id == ExpenseType.id).group_by(
+            ExpenseType.user_id, Expense.year, Expense.month
+        )
+
+    @staticmethod
+    def income_totals_query(value=None):
+        """Per-month totals of the incomes, summing `value` (defaults to the income's value)."""
+        return db.session.query(
+            IncomeType.user_id.label('user_id'),
+            Income.year.label('year'),
+            Income.month.label('month'),
+            db.func.sum(Income.value if value is None else value).label('incomes_total'),
+            db.func.sum(db.case((Income.received == True, 1), else_=0)).label('received_count'),
+        ).join(IncomeType, Income.type_id == IncomeType.id).group_by(
+            IncomeType.user_id, Income.year, Income.month
+        )
+
+    @staticmethod
+    def saving_totals_query():
+        return db.session.query(
+            SavingType.user_id.label('user_id'),
+            SavingValue.year.label('year'),
+            SavingValue.month.label('month'),
+            db.func.sum(db.case((SavingValue.used == True, 0), else_=SavingValue.value)).label('savings_total'),
+        ).join(SavingType, SavingValue.type_id == SavingType.id).group_by(
+            SavingType.user_id, SavingValue.year, SavingValue.month
+        )
+
+    @staticmethod
+    def rebuild(user_id: int = None):
+        """Recompute the summaries from the source tables; returns the number of months."""
+        delete = MonthlySummary.query
+        queries = [
+            MonthlySummaryService.expense_totals_query(),
+            MonthlySummaryService.income_totals_query(),
+            MonthlySummaryService.saving_totals_query(),
+        ]
+        if user_id is not None:
+            delete = delete.filter(MonthlySummary.user_id == user_id)
+            queries = [
+                queries[0].filter(ExpenseType.user_id == user_id),
+                queries[1].filter(IncomeType.user_id == user_id),
+                queries[2].filter(SavingType.user_id == user_id),
+            ]
+
+        delete.delete(synchronize_session=False)
+        for query in queries:
+            MonthlySummaryService.apply_grouped_delta(query)
+        db.session.commit()
+
+        count = MonthlySummary.query
+        if user_id is not None:
+            count = count.filter(MonthlySummary.user_id == user_id)
+        return count.count()
+
+
+class LedgerService:
+    """Maintains the `ledger_entry` read model, one row per expense, income
+    and saving value. Like the summary deltas, writes join the caller's
+    transaction."""
+
+    @staticmethod
+    def get_month(user_id: int, year: int, month: int):
+        return LedgerEntry.query.filter(
+            LedgerEntry.user_id == user_id,
+            LedgerEntry.period == to_period(year, month)
+        ).all()
+
+    @staticmethod
+    def record_expense(expense: Expense):
+        LedgerService._record(EXPENSE, expense, expense.category, expense.paid)
+
+    @staticmethod
+    def record_income(income: Income):
+        LedgerService._record(INCOME, income, "INCOME", income.received)
+
+    @staticmethod
+    def record_saving(saving: SavingValue):
+        LedgerService._record(SAVING, saving, "SAVING", saving.used)
+
+    @staticmethod
+    def _record(model: str, item, category: str, status):
+        table = LedgerEntry.__table__
+        stmt = mysql.insert(table).values(
+            user_id=item.user_id,
+            period=to_period(item.year, item.month),
+            model=model,
+            item_id=item.id,
+            year=item.year,
+            month=item.month,
+            type_id=item.type_id,
+            type_name=item.type_name,
+            category=category,
+            value=item.value,
+            status=bool(status)
+        )
+        # The item may have moved to another type within its month.
+        db.session.execute(stmt.on_duplicate_key_update(**{
+            key: stmt.inserted[key] for key in ('type_id', 'type_name', 'category', 'value', 'status')
+        }))
+
+    @staticmethod
+    def remove(model: str, user_id: int, year: int, month: int, item_id: int):
+        LedgerEntry.query.filter(
+            LedgerEntry.user_id == user_id,
+            LedgerEntry.period == to_period(year, month),
+            LedgerEntry.model == model,
+            LedgerEntry.item_id == item_id
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def refresh_type(model: str, type_id: int):
+        """Copy the type's flushed name (and category) to its entries."""
+        type_model = {EXPENSE: ExpenseType, INCOME: IncomeType, SAVING: SavingType}[model]
+        values = {'type_name': type_model.name}
+        if model == EXPENSE:
+            values['category'] = db.func.lower(ExpenseType.category)
+
+        return LedgerEntry.query.filter(
+            LedgerEntry.model == model,
+            LedgerEntry.type_id == type_id,
+            type_model.id == type_id
+        ).update(values, synchronize_session=False)
+
+    @staticmethod
+    def update_values(model: str, type_id: int, value, *criteria):
+        """Set `value` on the type's entries whose source row matches `criteria`."""
+        source = SOURCES[model]
+        return LedgerEntry.query.filter(
+            LedgerEntry.model == model,
+            LedgerEntry.type_id == type_id,
+            LedgerEntry.item_id == source.id,
+            *criteria
+        ).update({'value': value}, synchronize_session=False)
+
+    @staticmethod
+    def remove_type(model: str, type_id: int):
+        return LedgerEntry.query.filter(
+            LedgerEntry.model == model,
+            LedgerEntry.type_id == type_id
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def insert_from(query):
+        """Insert the entries selected by `query` in one INSERT IGNORE ... SELECT,
+        skipping the ones already recorded."""
+        subquery = query.subquery()
+        columns = [column.name for column in subquery.c]
+        db.session.execute(
+            mysql.insert(LedgerEntry.__table__).prefix_with('IGNORE').from_select(
+                columns, db.select(*subquery.c)
+            )
+        )
+
+    @staticmethod
+    def replace_from(model: str, user_id: int, query):
+        """Re-record the `model` entries selected by `query`, one of the entries
+        queries below, whose source rows changed in bulk."""
+        item_ids = db.select(query.subquery().c.item_id)
+        LedgerEntry.query.filter(
+            LedgerEntry.user_id == user_id,
+            LedgerEntry.model == model,
+            LedgerEntry.item_id.in_(item_ids)
+        ).delete(synchronize_session=False)
+        LedgerService.insert_from(query)
+
+    @staticmethod
+    def expense_entries_query():
+        return db.session.query(
+            ExpenseType.user_id.label('user_id'),
+            Expense.period.label('period'),
+            db.literal(EXPENSE).label('model'),
+            Expense.id.label('item_id'),
+            Expense.year.label('year'),
+            Expense.month.label('month'),
+            Expense.type_id.label('type_id'),
+            ExpenseType.name.label('type_name'),
+            db.func.lower(ExpenseType.category).label('category'),
+            Expense.value.label('value'),
+            db.func.coalesce(Expense.paid, False).label('status'),
+        ).join(ExpenseType, Expense.type_id == ExpenseType.id)
+
+    @staticmethod
+    def income_entries_query():
+        return db.session.query(
+            IncomeType.user_id.label('user_id'),
+            Income.period.label('period'),
+            db.literal(INCOME).label('model'),
+            Income.id.label('item_id'),
+            Income.year.label('year'),
+            Income.month.label('month'),
+            Income.type_id.label('type_id'),
+            IncomeType.name.label('type_name'),
+            db.literal("INCOME").label('category'),
+            Income.value.label('value'),
+            db.func.coalesce(Income.received, False).label('status'),
+        ).join(IncomeType, Income.type_id == IncomeType.id)
+
+    @staticmethod
+    def saving_entries_query():
+        return db.session.query(
+            SavingType.user_id.label('user_id'),
+            SavingValue.period.label('period'),
+            db.literal(SAVING).label('model'),
+            SavingValue.id.label('item_id'),
+            SavingValue.year.label('year'),
+            SavingValue.month.label('month'),
+            SavingValue.type_id.label('type_id'),
+            SavingType.name.label('type_name'),
+            db.literal("SAVING").label('category'),
+            SavingValue.value.label('value'),
+            db.func.coalesce(SavingValue.used, False).label('status'),
+        ).join(SavingType, SavingValue.type_id == SavingType.id)
+
+    @staticmethod
+    def rebuild(user_id: int = None):
+        """Recompute the ledger from the source tables; returns the number of entries."""
+        delete = LedgerEntry.query
+        queries = [
+            LedgerService.expense_entries_query(),
+            LedgerService.income_entries_query(),
+            LedgerService.saving_entries_query(),
+        ]
+        if user_id is not None:
+            delete = delete.filter(LedgerEntry.user_id == user_id)
+            queries = [
+                queries[0].filter(ExpenseType.user_id == user_id),
+                queries[1].filter(IncomeType.user_id == user_id),
+                queries[2].filter(SavingType.user_id == user_id),
+            ]
+
+        delete.delete(synchronize_session=False)
+        for query in queries:
+            LedgerService.insert_from(query)
+        db.session.commit()
+
+        count = LedgerEntry.query
+        if user_id is not None:
+            count = count.filter(LedgerEntry.user_id == user_id)
+        return count.count()
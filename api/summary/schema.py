@@ -5,6 +5,23 @@ class SummaryReturnSchema(Schema):
     expensesTotal = fields.Float(attribute="expenses_total")
     incomesTotal = fields.Float(attribute="incomes_total")
     balance = fields.Float(attribute="balance")
+    paidCount = fields.Integer(attribute="paid_count")
+    receivedCount = fields.Integer(attribute="received_count")
+
+class SummaryRangeReturnSchema(Schema):
+    year = fields.Integer(attribute="year")
+    month = fields.Integer(attribute="month")
+    expensesTotal = fields.Float(attribute="expenses_total")
+    incomesTotal = fields.Float(attribute="incomes_total")
+    balance = fields.Float(attribute="balance")
+
+class SummaryForecastReturnSchema(Schema):
+    year = fields.Integer(attribute="year")
+    month = fields.Integer(attribute="month")
+    expensesTotal = fields.Float(attribute="expenses_total")
+    incomesTotal = fields.Float(attribute="incomes_total")
+    balance = fields.Float(attribute="balance")
+    runningBalance = fields.Float(attribute="running_balance")
 
 class SummaryListReturnSchema(Schema):
     id = fields.Integer(attribute="id")
@@ -16,3 +33,4 @@ class SummaryListReturnSchema(Schema):
     status = fields.Boolean(attribute="status")
     model = fields.String(attribute="model")
     categoryName = fields.String(attribute="category_name")
+    virtual = fields.Boolean(attribute="virtual")
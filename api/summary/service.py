@@ -1,75 +1,321 @@
+import itertools
+
+from datetime import date
 from typing import List
 
+from database import db
+
+from api.expenses.model import ExpenseType
 from api.expenses.service import ExpenseService
+from api.incomes.model import IncomeType
 from api.incomes.service import IncomeService
-from api.savings.service import SavingValueService
+from api.timing import run_timed
+from api.utils import to_period
 
+from .cache import (
+    SUMMARY, SUMMARY_LIST, summary_cache, summary_flight, summary_refresher, sync_generation, ttls_for
+)
+from .exceptions import InvalidSummaryRangeException
 from .interface import SummaryItem, SummaryItemModelEnum
+from .model import LedgerEntry, MonthlySummary
+from .read_model import EXPENSE, INCOME
+
+
+# Bounded by MySQL's default cte_max_recursion_depth (1000) with room to spare.
+SUMMARY_RANGE_MAX_MONTHS = 120
+SUMMARY_FORECAST_MAX_MONTHS = 120
 
 class SummaryService:
     @staticmethod
     def get_summary(year: int, month: int, user_id: int):
-        expenses = ExpenseService.get_expense_list(year=year, month=month, user_id=user_id)
-        savings = SavingValueService.get_unused_by_date(year=year, month=month, user_id=user_id)
-        incomes = IncomeService.get_incomes_list(year=year, month=month, user_id=user_id)
+        return SummaryService._cached(SUMMARY, year, month, user_id, SummaryService._compute_summary)
+
+    @staticmethod
+    def get_summary_list(year: int, month: int, user_id: int) -> List[SummaryItem]:
+        return SummaryService._cached(SUMMARY_LIST, year, month, user_id, SummaryService._compute_summary_list)
+
+    @staticmethod
+    def get_summary_range(from_year: int, from_month: int, to_year: int, to_month: int, user_id: int):
+        """Totals of every month in the window, in one statement.
+
+        A recursive CTE enumerates the months; each is joined to its monthly
+        summary row and to the grouped base values of the recurrent types that
+        have no row in it."""
+        start, end = to_period(from_year, from_month), to_period(to_year, to_month)
+        if end < start or end - start >= SUMMARY_RANGE_MAX_MONTHS:
+            raise InvalidSummaryRangeException()
+
+        months = db.select(
+            db.literal(start).label('period'),
+            db.literal(from_year).label('year'),
+            db.literal(from_month).label('month')
+        ).cte('months', recursive=True)
+        months = months.union_all(db.select(
+            months.c.period + 1,
+            months.c.year + db.case((months.c.month == 12, 1), else_=0),
+            db.case((months.c.month == 12, 1), else_=months.c.month + 1)
+        ).where(months.c.period < end))
+
+        expenses_projection = ExpenseService.get_projected_range_query(months, user_id).subquery()
+        incomes_projection = IncomeService.get_projected_range_query(months, user_id).subquery()
+
+        rows = db.session.query(
+            months.c.year,
+            months.c.month,
+            db.func.coalesce(MonthlySummary.expenses_total, 0) + db.func.coalesce(MonthlySummary.savings_total, 0),
+            db.func.coalesce(MonthlySummary.incomes_total, 0),
+            db.func.coalesce(expenses_projection.c.total, 0),
+            db.func.coalesce(incomes_projection.c.total, 0),
+        ).select_from(months).outerjoin(
+            MonthlySummary,
+            db.and_(
+                MonthlySummary.user_id == user_id,
+                MonthlySummary.year == months.c.year,
+                MonthlySummary.month == months.c.month
+            )
+        ).outerjoin(
+            expenses_projection, expenses_projection.c.period == months.c.period
+        ).outerjoin(
+            incomes_projection, incomes_projection.c.period == months.c.period
+        ).order_by(months.c.period).all()
+
+        result = []
+        for year, month, expenses, incomes, expenses_projected, incomes_projected in rows:
+            expenses_total = expenses + expenses_projected
+            incomes_total = incomes + incomes_projected
+            result.append({
+                'year': year,
+                'month': month,
+                'expenses_total': expenses_total,
+                'incomes_total': incomes_total,
+                'balance': incomes_total - expenses_total
+            })
+        return result
+
+    @staticmethod
+    def get_forecast(months: int, user_id: int, year: int = None, month: int = None):
+        """Totals and running balance of the `months` months starting at
+        `year`/`month` (defaults to the current month). Nothing is persisted.
+
+        The recurrent types are expanded into an in-memory timeline and the
+        months' materialized rows are laid over it, so the three reads are
+        the same whatever the window size. They run one after another on the
+        request's session so they all see the same snapshot."""
+        if not 0 < months <= SUMMARY_FORECAST_MAX_MONTHS:
+            raise InvalidSummaryRangeException()
+        if year is None or month is None:
+            today = date.today()
+            year, month = today.year, today.month
+        start = to_period(year, month)
+        end = start + months - 1
+
+        def recurrent_types():
+            expense_types = db.session.query(
+                ExpenseType.id, ExpenseType.base_value, ExpenseType.end_date
+            ).filter(ExpenseType.user_id == user_id, ExpenseType.recurrent == True).all()
+            income_types = db.session.query(
+                IncomeType.id, IncomeType.base_value
+            ).filter(IncomeType.user_id == user_id, IncomeType.recurrent == True).all()
+            return expense_types, income_types
 
-        expenses_total = sum(expense['value'] for expense in expenses)
-        savings_total = sum(saving.value for saving in savings)
-        incomes_total = sum(income['value'] for income in incomes)
-        balance = incomes_total - (expenses_total + savings_total)
+        def summaries():
+            period = MonthlySummary.year * 12 + MonthlySummary.month
+            return db.session.query(
+                period,
+                MonthlySummary.expenses_total + MonthlySummary.savings_total,
+                MonthlySummary.incomes_total
+            ).filter(MonthlySummary.user_id == user_id, period.between(start, end)).all()
+
+        def overrides():
+            return db.session.query(
+                LedgerEntry.period, LedgerEntry.model, LedgerEntry.type_id
+            ).filter(
+                LedgerEntry.user_id == user_id,
+                LedgerEntry.period.between(start, end),
+                LedgerEntry.model.in_((EXPENSE, INCOME))
+            ).all()
+
+        results = run_timed({
+            'recurrent_types': recurrent_types, 'summaries': summaries, 'overrides': overrides
+        })
+        expense_types, income_types = results['recurrent_types']
+
+        # Each type adds its base value from the first month up to its last
+        # one; a running sum of these steps gives the projection of every month.
+        expenses, incomes = [0] * (months + 1), [0] * (months + 1)
+        projected = {}
+        for type_id, base_value, end_date in expense_types:
+            last = end if end_date is None else min(end, to_period(end_date.year, end_date.month))
+            if last >= start:
+                expenses[0] += base_value or 0
+                expenses[last - start + 1] -= base_value or 0
+                projected[(EXPENSE, type_id)] = (base_value or 0, last)
+        for type_id, base_value in income_types:
+            incomes[0] += base_value or 0
+            incomes[months] -= base_value or 0
+            projected[(INCOME, type_id)] = (base_value or 0, end)
+        expenses = list(itertools.accumulate(expenses[:months]))
+        incomes = list(itertools.accumulate(incomes[:months]))
+
+        # A materialized row replaces its type's projection and is counted
+        # through the month's summary instead.
+        for period, model, type_id in results['overrides']:
+            base_value, last = projected.get((model, type_id), (0, start - 1))
+            if period <= last:
+                totals = expenses if model == EXPENSE else incomes
+                totals[period - start] -= base_value
+        for period, expenses_total, incomes_total in results['summaries']:
+            expenses[period - start] += expenses_total
+            incomes[period - start] += incomes_total
+
+        balances = [income - expense for income, expense in zip(incomes, expenses)]
+        result = []
+        for index, running_balance in enumerate(itertools.accumulate(balances)):
+            period_year, period_month = divmod(start + index - 1, 12)
+            result.append({
+                'year': period_year,
+                'month': period_month + 1,
+                'expenses_total': expenses[index],
+                'incomes_total': incomes[index],
+                'balance': balances[index],
+                'running_balance': running_balance
+            })
+        return result
+
+    @staticmethod
+    def _cached(kind: str, year: int, month: int, user_id: int, compute):
+        """Serve `compute` through the summary cache.
+
+        Concurrent callers for the same key share one computation. An entry
+        past its soft TTL is served as is while a background worker recomputes it."""
+        sync_generation()
+        key = (user_id, year, month, kind)
+        result, stale = summary_cache.lookup(key)
+        if result is None:
+            result = summary_flight.do(key, lambda: SummaryService._load(key, compute))
+        elif stale:
+            summary_refresher.submit(
+                key, lambda: summary_flight.do(key, lambda: SummaryService._refresh(key, compute))
+            )
+        return result
+
+    @staticmethod
+    def _load(key, compute):
+        # Another flight may have filled the cache between our miss and this call.
+        result = summary_cache.peek(key)
+        if result is None:
+            result = SummaryService._refresh(key, compute)
+        return result
+
+    @staticmethod
+    def _refresh(key, compute):
+        user_id, year, month, _ = key
+        # A write invalidating the key while we compute makes the result
+        # stale: serve it to this caller but do not cache it.
+        generation = summary_cache.generation(key)
+        result = compute(year=year, month=month, user_id=user_id)
+        summary_cache.set(key, result, generation=generation, **ttls_for(year, month))
+        return result
+
+    @staticmethod
+    def _compute_summary(year: int, month: int, user_id: int):
+        """One statement: a primary-key lookup of the month's running totals,
+        plus the base value of the recurrent types only projected into the
+        month. The summary is outer joined to a one-row table, so a month
+        without one still gets its projections."""
+        expenses_projection, incomes_projection, expenses, incomes, paid_count, received_count = db.session.query(
+            ExpenseService.get_month_projection_query(year=year, month=month, user_id=user_id),
+            IncomeService.get_month_projection_query(year=year, month=month, user_id=user_id),
+            db.func.coalesce(MonthlySummary.expenses_total + MonthlySummary.savings_total, 0),
+            db.func.coalesce(MonthlySummary.incomes_total, 0),
+            db.func.coalesce(MonthlySummary.paid_count, 0),
+            db.func.coalesce(MonthlySummary.received_count, 0)
+        ).select_from(
+            db.select(db.literal(1).label('one')).subquery()
+        ).outerjoin(
+            MonthlySummary,
+            db.and_(
+                MonthlySummary.user_id == user_id,
+                MonthlySummary.year == year,
+                MonthlySummary.month == month
+            )
+        ).one()
+
+        expenses_total = expenses_projection + expenses
+        incomes_total = incomes_projection + incomes
 
         data = {
-            'expenses_total': expenses_total + savings_total,
+            'expenses_total': expenses_total,
             'incomes_total': incomes_total,
-            'balance': balance
+            'balance': incomes_total - expenses_total,
+            'paid_count': paid_count,
+            'received_count': received_count
         }
         return data
 
     @staticmethod
-    def get_summary_list(year: int, month: int, user_id: int) -> List[SummaryItem]:
-        result = []
+    def _compute_summary_list(year: int, month: int, user_id: int) -> List[SummaryItem]:
+        """One statement: the month's ledger entries, read along the ledger's
+        primary key, plus the recurrent types only projected into the month."""
+        ledger = db.session.query(
+            LedgerEntry.item_id.label('id'),
+            LedgerEntry.value.label('value'),
+            LedgerEntry.type_name.label('type_name'),
+            LedgerEntry.type_id.label('type_id'),
+            LedgerEntry.status.label('status'),
+            LedgerEntry.model.label('model'),
+            LedgerEntry.category.label('category_name'),
+            db.false().label('virtual'),
+            db.case(
+                (LedgerEntry.model == SummaryItemModelEnum.EXPENSE.value, 0),
+                (LedgerEntry.model == SummaryItemModelEnum.INCOME.value, 1),
+                else_=2
+            ).label('rank')
+        ).filter(
+            LedgerEntry.user_id == user_id,
+            LedgerEntry.period == to_period(year, month)
+        )
+        projected_expenses = ExpenseService.get_projected_types_query(
+            year, month, user_id,
+            db.null().label('id'),
+            db.func.coalesce(ExpenseType.base_value, 0).label('value'),
+            ExpenseType.name.label('type_name'),
+            ExpenseType.id.label('type_id'),
+            db.false().label('status'),
+            db.literal(SummaryItemModelEnum.EXPENSE.value).label('model'),
+            db.func.lower(ExpenseType.category).label('category_name'),
+            db.true().label('virtual'),
+            db.literal(0).label('rank')
+        )
+        projected_incomes = IncomeService.get_projected_types_query(
+            year, month, user_id,
+            db.null().label('id'),
+            db.func.coalesce(IncomeType.base_value, 0).label('value'),
+            IncomeType.name.label('type_name'),
+            IncomeType.id.label('type_id'),
+            db.false().label('status'),
+            db.literal(SummaryItemModelEnum.INCOME.value).label('model'),
+            db.literal("INCOME").label('category_name'),
+            db.true().label('virtual'),
+            db.literal(1).label('rank')
+        )
+
+        statement = db.union_all(
+            ledger.statement, projected_expenses.statement, projected_incomes.statement
+        ).order_by('rank', 'type_id', 'id')
 
-        expenses = ExpenseService.get_expense_list(year=year, month=month, user_id=user_id)
-        savings = SavingValueService.get_all_by_date(year=year, month=month, user_id=user_id)
-        incomes = IncomeService.get_incomes_list(year=year, month=month, user_id=user_id)
-
-        for expense in expenses:
-            result.append(SummaryItem(
-                id=expense['id'],
-                value=expense['value'],
-                type_name=expense['type_name'],
-                type_id=expense['type_id'],
-                month=expense['month'],
-                year=expense['year'],
-                status=expense['paid'],
-                model=SummaryItemModelEnum.EXPENSE.value,
-                category_name=expense['category']
-            ))
-        
-        for income in incomes:
-            result.append(SummaryItem(
-                id=income['id'],
-                value=income['value'],
-                type_name=income['type_name'],
-                type_id=income['type_id'],
-                month=income['month'],
-                year=income['year'],
-                status=income['received'],
-                model=SummaryItemModelEnum.INCOME.value,
-                category_name="INCOME"
-            ))
-
-        for saving in savings:
-            result.append(SummaryItem(
-                id=saving.id,
-                value=saving.value,
-                type_name=saving.type_name,
-                type_id=saving.type_id,
-                month=saving.month,
-                year=saving.year,
-                status=saving.used,
-                model=SummaryItemModelEnum.SAVING.value,
-                category_name="SAVING"
-            ))
-
-        return result
\ No newline at end of file
+        return [
+            SummaryItem(
+                id=row.id,
+                value=row.value,
+                type_name=row.type_name,
+                type_id=row.type_id,
+                month=month,
+                year=year,
+                status=bool(row.status),
+                model=row.model,
+                category_name=row.category_name,
+                virtual=bool(row.virtual)
+            )
+            for row in db.session.execute(statement)
+        ]
@@ -0,0 +1,33 @@
+import time
+
+from flask import g, has_app_context
+
+
+def run_timed(branches: dict) -> dict:
+    """Call every `name: fn` of `branches` in turn on the caller's session;
+    returns `{name: result}` and records each duration for the Server-Timing
+    header."""
+    results, timings = {}, {}
+    try:
+        for name, fn in branches.items():
+            start = time.perf_counter()
+            results[name] = fn()
+            timings[name] = time.perf_counter() - start
+    finally:
+        record_timings(timings)
+    return results
+
+
+def record_timings(timings: dict):
+    if has_app_context():
+        g.setdefault('server_timings', {}).update(timings)
+
+
+def server_timing_header(response):
+    """after_request hook exposing the recorded branch timings."""
+    timings = g.get('server_timings')
+    if timings:
+        response.headers['Server-Timing'] = ', '.join(
+            f"{name};dur={duration * 1000:.1f}" for name, duration in timings.items()
+        )
+    return response
@@ -6,3 +6,30 @@ def make_json_response(data, code):
     resp.status_code = code
 
     return resp
+
+
+def to_period(year: int, month: int):
+    """Comparable integer key of a month, so month ranges become integer ranges."""
+    return year * 12 + month
+
+
+def parse_year_month(value: str):
+    """Parse a `YYYY-MM` string into `(year, month)`; raises ValueError."""
+    year, month = (int(part) for part in value.split('-'))
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid month: {value}")
+    return year, month
+
+
+def period_default(context):
+    params = context.get_current_parameters()
+    return to_period(params['year'], params['month'])
+
+
+def sync_period(obj, key: str, value: int):
+    """Validator keeping `period` in line with the `year`/`month` being set."""
+    year = value if key == 'year' else obj.year
+    month = value if key == 'month' else obj.month
+    if year is not None and month is not None:
+        obj.period = to_period(year, month)
+    return value
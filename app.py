@@ -6,10 +6,17 @@ from flask_restx import Api
 from flask_migrate import Migrate
 
 from auth import login_manager, CustomSessionInterface
+from api.auth.cache import identity_cache
+from api.timing import server_timing_header
+from api.summary.cache import configure as configure_summary_cache
+from api.imports.commands import imports_cli
+from api.savings.commands import savings_cli
+from api.summary.commands import summary_cli
 from database import db
 from api.expenses.model import *
 from api.incomes.model import *
 from api.savings.model import *
+from api.summary.model import *
 from api.auth.model import *
 
 
@@ -35,6 +42,15 @@ def create_app(test_config=None):
         app.config.from_mapping(test_config)
 
     db.init_app(app)
+    identity_cache.configure(
+        maxsize=app.config.get('IDENTITY_CACHE_MAXSIZE', 1024),
+        ttl=app.config.get('IDENTITY_CACHE_TTL', 300),
+    )
+    configure_summary_cache(app)
+    app.cli.add_command(summary_cli)
+    app.cli.add_command(savings_cli)
+    app.cli.add_command(imports_cli)
+    app.after_request(server_timing_header)
 
     # ensure the instance folder exists
     try:
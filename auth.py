@@ -8,23 +8,32 @@ login_manager = LoginManager()
 
 @login_manager.user_loader
 def load_user(user_id):
+    from database import db
+    from api.auth.cache import get_user
     from api.auth.model import User
 
-    return User.get(user_id)
+    user_id = int(user_id)
+    return _active(get_user(('id', user_id), lambda: db.session.get(User, user_id)))
 
 @login_manager.request_loader
 def load_user_from_request(request):
+    from api.auth.cache import get_user
     from api.auth.model import User
+    from api.auth.service import AuthService
 
     api_key = request.headers.get('X-Api-Key')
     if api_key:
-        user = User.query.filter(User.token==api_key).first()
-        if user:
-            return user
+        token_hash = User.hash_token(api_key)
+        return _active(get_user(('token', token_hash), lambda: AuthService.get_by_token_hash(token_hash)))
 
     return None
 
 
+def _active(user):
+    # Deactivated users keep their tokens but no longer authenticate.
+    return user if user is not None and user.is_active else None
+
+
 @user_loaded_from_request.connect
 def user_loaded_from_request(app, user=None):
     g.login_via_request = True
@@ -0,0 +1,100 @@
+"""initial schema
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=25), nullable=False),
+    sa.Column('_password_hash', sa.String(length=255), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('token', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('first_name', sa.String(length=25), nullable=True),
+    sa.Column('last_name', sa.String(length=25), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('expense_type',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('category', sa.Enum('PERSONAL', 'COMPANY', 'HOUSE', 'CARD', 'SALON', 'HEALTH', name='expensecategoryenum'), nullable=False),
+    sa.Column('recurrent', sa.Boolean(), nullable=True),
+    sa.Column('base_value', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('income_type',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('recurrent', sa.Boolean(), nullable=True),
+    sa.Column('base_value', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('saving_type',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.Column('base_value', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('expense',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('paid', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['type_id'], ['expense_type.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('income',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('received', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['type_id'], ['income_type.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('saving_value',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('used', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['type_id'], ['saving_type.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('saving_value')
+    op.drop_table('income')
+    op.drop_table('expense')
+    op.drop_table('saving_type')
+    op.drop_table('income_type')
+    op.drop_table('expense_type')
+    op.drop_table('user')
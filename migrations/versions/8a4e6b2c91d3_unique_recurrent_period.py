@@ -0,0 +1,94 @@
+"""unique (type_id, year, month) on expense and income
+
+Revision ID: 8a4e6b2c91d3
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+import itertools
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6b2c91d3'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+DUPLICATES = (
+    ('expense', 'expense_type', 'paid'),
+    ('income', 'income_type', 'received'),
+)
+
+
+def _row_to_keep(rows):
+    """The row a group of duplicates collapses into, or None when it is
+    ambiguous. Rows still holding their type's base value, unpaid, are what
+    racing materializations left behind and carry nothing; the group can
+    only collapse if every other row has the same value and status."""
+    edited = [row for row in rows if row.value != row.base_value or row.status]
+    if len({(row.value, bool(row.status)) for row in edited}) > 1:
+        return None
+    return (edited or rows)[0]
+
+
+def upgrade():
+    # Merge the duplicates a unique index would reject. Nothing is deleted
+    # unless every group can be collapsed without losing a paid/received
+    # flag or an edited value; otherwise the conflicts are listed for
+    # manual resolution and the migration stops.
+    bind = op.get_bind()
+    extra_ids = {}
+    conflicts = []
+    for table, type_table, status in DUPLICATES:
+        rows = bind.execute(sa.text(
+            f"SELECT v.id, v.type_id, v.year, v.month, v.value, v.{status} AS status, t.base_value "
+            f"FROM {table} v "
+            f"JOIN {type_table} t ON t.id = v.type_id "
+            f"JOIN (SELECT type_id, year, month FROM {table} "
+            f"GROUP BY type_id, year, month HAVING COUNT(*) > 1) d "
+            f"ON d.type_id = v.type_id AND d.year = v.year AND d.month = v.month "
+            f"ORDER BY v.type_id, v.year, v.month, v.id"
+        )).fetchall()
+
+        extra_ids[table] = []
+        for key, group in itertools.groupby(rows, key=lambda row: (row.type_id, row.year, row.month)):
+            group = list(group)
+            kept = _row_to_keep(group)
+            if kept is None:
+                conflicts.append(
+                    f"{table} type_id={key[0]} {key[1]}-{key[2]:02d}: "
+                    + ", ".join(f"id={row.id} value={row.value} {status}={row.status}" for row in group)
+                )
+            else:
+                extra_ids[table].extend(row.id for row in group if row.id != kept.id)
+
+    if conflicts:
+        for conflict in conflicts:
+            print(f"Conflicting duplicates: {conflict}")
+        raise RuntimeError(
+            f"{len(conflicts)} (type_id, year, month) groups have conflicting duplicates; "
+            f"keep one row of each and run the migration again."
+        )
+
+    for table, ids in extra_ids.items():
+        if ids:
+            bind.execute(
+                sa.text(f"DELETE FROM {table} WHERE id IN :ids").bindparams(sa.bindparam('ids', expanding=True)),
+                {'ids': ids}
+            )
+
+    op.create_index('uq_expense_type_id_year_month', 'expense', ['type_id', 'year', 'month'], unique=True)
+    op.create_index('uq_income_type_id_year_month', 'income', ['type_id', 'year', 'month'], unique=True)
+
+
+def downgrade():
+    # The foreign keys on type_id need an index of their own once the
+    # composite ones are gone.
+    op.create_index('ix_income_type_id', 'income', ['type_id'])
+    op.create_index('ix_expense_type_id', 'expense', ['type_id'])
+    op.drop_index('uq_income_type_id_year_month', table_name='income')
+    op.drop_index('uq_expense_type_id_year_month', table_name='expense')
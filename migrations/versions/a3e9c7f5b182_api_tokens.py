@@ -0,0 +1,50 @@
+"""api_token table, for one token per logged in client
+
+Revision ID: a3e9c7f5b182
+Revises: f8c3d5a1e947
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e9c7f5b182'
+down_revision = 'f8c3d5a1e947'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('api_token',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token_hash')
+    )
+    op.create_index('ix_api_token_user_id', 'api_token', ['user_id'], unique=False)
+    op.execute(
+        "INSERT INTO api_token (user_id, token_hash, created_at) "
+        "SELECT id, token_hash, UTC_TIMESTAMP() FROM user"
+    )
+    op.drop_index('ix_user_token_hash', table_name='user')
+    op.drop_column('user', 'token_hash')
+
+
+def downgrade():
+    # One token per user again: the newest one is kept, and users without
+    # any get an unusable digest until they log in.
+    op.add_column('user', sa.Column('token_hash', sa.String(length=64), nullable=True))
+    op.execute(
+        "UPDATE user SET token_hash = COALESCE("
+        "(SELECT token_hash FROM api_token WHERE api_token.user_id = user.id ORDER BY id DESC LIMIT 1), "
+        "SHA2(UUID(), 256))"
+    )
+    op.alter_column('user', 'token_hash', existing_type=sa.String(length=64), nullable=False)
+    op.create_index('ix_user_token_hash', 'user', ['token_hash'], unique=True)
+    op.drop_index('ix_api_token_user_id', table_name='api_token')
+    op.drop_table('api_token')
@@ -0,0 +1,65 @@
+"""monthly_summary read model
+
+Revision ID: a7c3e9f1b254
+Revises: f41a9c6d2e85
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f1b254'
+down_revision = 'f41a9c6d2e85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('monthly_summary',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('month', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('expenses_total', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('incomes_total', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('savings_total', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('paid_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('received_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'month')
+    )
+
+    # Backfill; `flask summary rebuild` recomputes the same totals later on.
+    op.execute("""
+        INSERT INTO monthly_summary (user_id, year, month, expenses_total, paid_count)
+        SELECT expense_type.user_id, expense.year, expense.month,
+               SUM(expense.value), SUM(expense.paid = 1)
+        FROM expense JOIN expense_type ON expense_type.id = expense.type_id
+        GROUP BY expense_type.user_id, expense.year, expense.month
+    """)
+    op.execute("""
+        INSERT INTO monthly_summary (user_id, year, month, incomes_total, received_count)
+        SELECT * FROM (
+            SELECT income_type.user_id, income.year, income.month,
+                   SUM(income.value) AS incomes_total, SUM(income.received = 1) AS received_count
+            FROM income JOIN income_type ON income_type.id = income.type_id
+            GROUP BY income_type.user_id, income.year, income.month
+        ) AS delta
+        ON DUPLICATE KEY UPDATE
+            incomes_total = delta.incomes_total, received_count = delta.received_count
+    """)
+    op.execute("""
+        INSERT INTO monthly_summary (user_id, year, month, savings_total)
+        SELECT * FROM (
+            SELECT saving_type.user_id, saving_value.year, saving_value.month,
+                   SUM(CASE WHEN saving_value.used = 1 THEN 0 ELSE saving_value.value END) AS savings_total
+            FROM saving_value JOIN saving_type ON saving_type.id = saving_value.type_id
+            GROUP BY saving_type.user_id, saving_value.year, saving_value.month
+        ) AS delta
+        ON DUPLICATE KEY UPDATE savings_total = delta.savings_total
+    """)
+
+
+def downgrade():
+    op.drop_table('monthly_summary')
@@ -0,0 +1,28 @@
+"""summary_cache_generation, bumped by the CLI commands
+
+Revision ID: b4f7d2e9a615
+Revises: c1e6a8d4f279
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f7d2e9a615'
+down_revision = 'c1e6a8d4f279'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('summary_cache_generation',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('generation', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('summary_cache_generation')
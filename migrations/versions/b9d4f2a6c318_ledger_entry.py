@@ -0,0 +1,61 @@
+"""ledger_entry read model
+
+Revision ID: b9d4f2a6c318
+Revises: a7c3e9f1b254
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d4f2a6c318'
+down_revision = 'a7c3e9f1b254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ledger_entry',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('period', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('model', sa.String(length=10), nullable=False),
+    sa.Column('item_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('type_name', sa.String(length=80), nullable=False),
+    sa.Column('category', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('status', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'period', 'model', 'item_id')
+    )
+    op.create_index('ix_ledger_entry_model_type_id', 'ledger_entry', ['model', 'type_id'], unique=False)
+
+    op.execute("""
+        INSERT INTO ledger_entry
+        SELECT expense_type.user_id, expense.period, 'expense', expense.id, expense.year, expense.month,
+               expense.type_id, expense_type.name, LOWER(expense_type.category), expense.value,
+               COALESCE(expense.paid, 0)
+        FROM expense JOIN expense_type ON expense_type.id = expense.type_id
+    """)
+    op.execute("""
+        INSERT INTO ledger_entry
+        SELECT income_type.user_id, income.period, 'income', income.id, income.year, income.month,
+               income.type_id, income_type.name, 'INCOME', income.value, COALESCE(income.received, 0)
+        FROM income JOIN income_type ON income_type.id = income.type_id
+    """)
+    op.execute("""
+        INSERT INTO ledger_entry
+        SELECT saving_type.user_id, saving_value.period, 'saving', saving_value.id, saving_value.year,
+               saving_value.month, saving_value.type_id, saving_type.name, 'SAVING', saving_value.value,
+               COALESCE(saving_value.used, 0)
+        FROM saving_value JOIN saving_type ON saving_type.id = saving_value.type_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_ledger_entry_model_type_id', table_name='ledger_entry')
+    op.drop_table('ledger_entry')
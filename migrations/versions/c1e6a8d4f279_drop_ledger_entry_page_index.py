@@ -0,0 +1,26 @@
+"""drop the ledger_entry page index, the value lists page their source tables
+
+Revision ID: c1e6a8d4f279
+Revises: a3e9c7f5b182
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1e6a8d4f279'
+down_revision = 'a3e9c7f5b182'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_ledger_entry_user_id_model_period', table_name='ledger_entry')
+
+
+def downgrade():
+    op.create_index(
+        'ix_ledger_entry_user_id_model_period', 'ledger_entry', ['user_id', 'model', 'period', 'item_id'], unique=False
+    )
@@ -0,0 +1,33 @@
+"""period key on expense, income and saving_value
+
+Revision ID: c5d7e1f04a62
+Revises: 8a4e6b2c91d3
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d7e1f04a62'
+down_revision = '8a4e6b2c91d3'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('expense', 'income', 'saving_value')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('period', sa.Integer(), nullable=True))
+        op.execute(f"UPDATE {table} SET period = year * 12 + month")
+        op.alter_column(table, 'period', existing_type=sa.Integer(), nullable=False)
+        op.create_index(f'ix_{table}_type_id_period', table, ['type_id', 'period'], unique=False)
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_type_id_period', table_name=table)
+        op.drop_column(table, 'period')
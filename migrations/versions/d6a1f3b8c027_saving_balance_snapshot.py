@@ -0,0 +1,43 @@
+"""saving_balance_snapshot read model
+
+Revision ID: d6a1f3b8c027
+Revises: b9d4f2a6c318
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a1f3b8c027'
+down_revision = 'b9d4f2a6c318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('saving_balance_snapshot',
+    sa.Column('type_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('period', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('used_total', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('unused_total', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('month_unused', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['type_id'], ['saving_type.id'], ),
+    sa.PrimaryKeyConstraint('type_id', 'period')
+    )
+
+    # Backfill; `flask savings check-snapshots --rebuild` recomputes the same totals later on.
+    op.execute("""
+        INSERT INTO saving_balance_snapshot (type_id, period, used_total, unused_total, month_unused)
+        SELECT type_id, period,
+               SUM(SUM(CASE WHEN used = 1 THEN value ELSE 0 END)) OVER (PARTITION BY type_id ORDER BY period),
+               SUM(SUM(CASE WHEN used = 0 THEN value ELSE 0 END)) OVER (PARTITION BY type_id ORDER BY period),
+               SUM(CASE WHEN used = 0 THEN value ELSE 0 END)
+        FROM saving_value
+        GROUP BY type_id, period
+    """)
+
+
+def downgrade():
+    op.drop_table('saving_balance_snapshot')
@@ -0,0 +1,37 @@
+"""composite indexes for the hot filter paths
+
+Revision ID: e2b8f5a3c7d4
+Revises: c5d7e1f04a62
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b8f5a3c7d4'
+down_revision = 'c5d7e1f04a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_expense_type_user_id_category', 'expense_type', ['user_id', 'category'], unique=False)
+    op.create_index('ix_income_type_user_id_recurrent', 'income_type', ['user_id', 'recurrent'], unique=False)
+    op.create_index('ix_saving_type_user_id_active', 'saving_type', ['user_id', 'active'], unique=False)
+    op.create_index('ix_saving_value_type_id_used_year_month', 'saving_value', ['type_id', 'used', 'year', 'month'], unique=False)
+    op.create_index('ix_user_token', 'user', ['token'], unique=False)
+
+
+def downgrade():
+    # The foreign keys on user_id need an index of their own once the
+    # composite ones are gone.
+    op.drop_index('ix_user_token', table_name='user')
+    op.drop_index('ix_saving_value_type_id_used_year_month', table_name='saving_value')
+    op.create_index('ix_saving_type_user_id', 'saving_type', ['user_id'], unique=False)
+    op.drop_index('ix_saving_type_user_id_active', table_name='saving_type')
+    op.create_index('ix_income_type_user_id', 'income_type', ['user_id'], unique=False)
+    op.drop_index('ix_income_type_user_id_recurrent', table_name='income_type')
+    op.create_index('ix_expense_type_user_id', 'expense_type', ['user_id'], unique=False)
+    op.drop_index('ix_expense_type_user_id_category', table_name='expense_type')
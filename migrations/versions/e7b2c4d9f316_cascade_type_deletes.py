@@ -0,0 +1,37 @@
+"""cascade type deletes to their values
+
+Revision ID: e7b2c4d9f316
+Revises: d6a1f3b8c027
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2c4d9f316'
+down_revision = 'd6a1f3b8c027'
+branch_labels = None
+depends_on = None
+
+
+# The constraints were created unnamed, so they carry MySQL's generated names.
+FOREIGN_KEYS = [
+    ('expense_ibfk_1', 'expense', 'expense_type'),
+    ('income_ibfk_1', 'income', 'income_type'),
+    ('saving_value_ibfk_1', 'saving_value', 'saving_type'),
+    ('saving_balance_snapshot_ibfk_1', 'saving_balance_snapshot', 'saving_type'),
+]
+
+
+def upgrade():
+    for name, table, referent in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referent, ['type_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    for name, table, referent in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referent, ['type_id'], ['id'])
@@ -0,0 +1,36 @@
+"""store api tokens as sha-256 digests
+
+Revision ID: f41a9c6d2e85
+Revises: e2b8f5a3c7d4
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f41a9c6d2e85'
+down_revision = 'e2b8f5a3c7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('token_hash', sa.String(length=64), nullable=True))
+    op.execute("UPDATE user SET token_hash = SHA2(token, 256)")
+    op.alter_column('user', 'token_hash', existing_type=sa.String(length=64), nullable=False)
+    op.create_index('ix_user_token_hash', 'user', ['token_hash'], unique=True)
+    op.drop_index('ix_user_token', table_name='user')
+    op.drop_column('user', 'token')
+
+
+def downgrade():
+    # Plain tokens cannot be recovered: the digests become the tokens, so
+    # every client has to log in again.
+    op.add_column('user', sa.Column('token', sa.String(length=255), nullable=True))
+    op.execute("UPDATE user SET token = token_hash")
+    op.alter_column('user', 'token', existing_type=sa.String(length=255), nullable=False)
+    op.create_index('ix_user_token', 'user', ['token'], unique=False)
+    op.drop_index('ix_user_token_hash', table_name='user')
+    op.drop_column('user', 'token_hash')
@@ -0,0 +1,26 @@
+"""ledger_entry index serving the paginated value lists
+
+Revision ID: f8c3d5a1e947
+Revises: e7b2c4d9f316
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8c3d5a1e947'
+down_revision = 'e7b2c4d9f316'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_ledger_entry_user_id_model_period', 'ledger_entry', ['user_id', 'model', 'period', 'item_id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_ledger_entry_user_id_model_period', table_name='ledger_entry')
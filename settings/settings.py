@@ -7,3 +7,15 @@ DATABASE_HOST = 'jmoney_db:3306'
 DATABASE_NAME = 'jmoney'
 SQLALCHEMY_DATABASE_URI = f"mysql://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}/{DATABASE_NAME}"
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# CACHE CONFIG
+IDENTITY_CACHE_MAXSIZE = 1024
+IDENTITY_CACHE_TTL = 300
+SUMMARY_CACHE_MAXSIZE = 4096
+SUMMARY_CACHE_TTL = 300
+SUMMARY_CACHE_SOFT_TTL = 60
+SUMMARY_CACHE_PAST_TTL = 86400
+SUMMARY_CACHE_PAST_SOFT_TTL = 3600
+# How often API servers check whether the CLI commands changed the read
+# models, which bounds how long they serve the summaries those changed.
+SUMMARY_CACHE_SYNC_INTERVAL = 5
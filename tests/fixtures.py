@@ -1,8 +1,9 @@
 import pytest
-import uuid
 
 from datetime import datetime
 
+from sqlalchemy import event
+
 from database import db
 
 from api.expenses.model import (
@@ -21,6 +22,43 @@ from api.savings.model import (
 from api.auth.model import (
     User
 )
+from api.savings.read_model import SavingBalanceService
+from api.summary.read_model import LedgerService, MonthlySummaryService
+
+
+# QUERY COUNTER
+
+class QueryCounter(object):
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.count = 0
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+@pytest.fixture(scope="function")
+def query_counter(app):
+    return QueryCounter(db.engine)
+
+
+def explain(statement, parameters):
+    result = db.session.connection().exec_driver_sql(f'EXPLAIN {statement}', parameters)
+    return result.mappings().all()
+
+@pytest.fixture(scope="function")
+def query_plan(app):
+    return explain
 
 
 # EXPENSES FACTORIES
@@ -35,13 +73,20 @@ class UserFactory(object):
 
         user = User(username=data['username'])
         user.password_hash = data['password']
-        user.token = uuid.uuid4().hex
+        user.issue_token()
 
         db.session.add(user)
         db.session.commit()
 
+        # The returned instance holds its plain token as `user.token`.
         return user
 
+    def issue_token(self, user):
+        """Issue another API token for `user`, returning it."""
+        token = user.issue_token()
+        db.session.commit()
+        return token
+
 @pytest.fixture(scope="function")
 def user_factory(request):
     return UserFactory()
@@ -86,6 +131,14 @@ class ExpenseFactory(object):
         expense = Expense(**data)
         db.session.add(expense)
         db.session.commit()
+
+        # Keep the read models in line, as the services do.
+        MonthlySummaryService.apply_delta(
+            expense.user_id, expense.year, expense.month,
+            **MonthlySummaryService.expense_delta(expense.value, expense.paid)
+        )
+        LedgerService.record_expense(expense)
+        db.session.commit()
         return expense
 
 @pytest.fixture(scope="function")
@@ -131,6 +184,13 @@ class IncomeFactory(object):
         income = Income(**data)
         db.session.add(income)
         db.session.commit()
+
+        MonthlySummaryService.apply_delta(
+            income.user_id, income.year, income.month,
+            **MonthlySummaryService.income_delta(income.value, income.received)
+        )
+        LedgerService.record_income(income)
+        db.session.commit()
         return income
 
 @pytest.fixture(scope="function")
@@ -179,6 +239,17 @@ class SavingValueFactory(object):
         saving_value = SavingValue(**data)
         db.session.add(saving_value)
         db.session.commit()
+
+        MonthlySummaryService.apply_delta(
+            saving_value.user_id, saving_value.year, saving_value.month,
+            **MonthlySummaryService.saving_delta(saving_value.value, saving_value.used)
+        )
+        LedgerService.record_saving(saving_value)
+        SavingBalanceService.apply_delta(
+            saving_value.type_id, saving_value.year, saving_value.month,
+            **SavingBalanceService.value_delta(saving_value.value, saving_value.used)
+        )
+        db.session.commit()
         return saving_value
 
 @pytest.fixture(scope="function")
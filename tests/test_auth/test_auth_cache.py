@@ -0,0 +1,57 @@
+from flask import request
+
+from auth import load_user, load_user_from_request
+from api.auth.cache import identity_cache
+from api.auth.service import AuthService
+
+
+class TestIdentityCache:
+    def _load(self, app, token):
+        with app.test_request_context(headers={'X-Api-Key': token}):
+            return load_user_from_request(request)
+
+    def test_second_request_skips_database(self, app, user_factory, query_counter):
+        user = user_factory.create()
+        self._load(app, user.token)
+
+        with query_counter as counter:
+            result = self._load(app, user.token)
+
+        assert result.id == user.id
+        assert counter.count == 0
+        assert identity_cache.stats()['hits'] == 1
+        assert identity_cache.stats()['misses'] == 1
+
+    def test_load_user_by_id_after_token(self, app, user_factory, query_counter):
+        user = user_factory.create()
+        self._load(app, user.token)
+
+        with query_counter as counter:
+            result = load_user(str(user.id))
+
+        assert result.id == user.id
+        assert counter.count == 0
+
+    def test_unknown_token_is_not_cached(self, app, user_factory):
+        user_factory.create()
+
+        assert self._load(app, 'unknown') is None
+        assert identity_cache.stats()['entries'] == 0
+
+    def test_update_profile_invalidates(self, app, user_factory):
+        user = user_factory.create()
+        self._load(app, user.token)
+
+        AuthService.update_profile({'username': 'new name'}, user_id=user.id)
+
+        assert identity_cache.stats()['entries'] == 0
+        assert self._load(app, user.token).username == 'new name'
+
+    def test_deactivate_invalidates(self, app, user_factory):
+        user = user_factory.create()
+        self._load(app, user.token)
+
+        AuthService.deactivate(user.id)
+
+        assert identity_cache.stats()['entries'] == 0
+        assert self._load(app, user.token) is None
@@ -22,6 +22,26 @@ class TestUserResource:
         assert response.status_code == 200
         assert response.get_json()['username'] == 'ferrarijessie'
 
+    def test_delete_deactivates(self, app, client, user_factory):
+        user = user_factory.create()
+
+        response = client.delete(url_for(UserResource.endpoint), headers={'x-api-key': user.token})
+
+        assert response.status_code == 204
+
+        response = app.test_client().put(
+            url_for(UserResource.endpoint),
+            json={'username': 'ferrarijessie'},
+            headers={'x-api-key': user.token}
+        )
+        assert response.status_code == 401
+
+        response = app.test_client().post(
+            url_for(UserLoginResource.endpoint),
+            json={'username': user.username, 'password': 'password123'}
+        )
+        assert response.status_code == 401
+
 
 class TestLoginResource:
     def test_post_wrong_password(self, client, user_factory):
@@ -39,6 +59,35 @@ class TestLoginResource:
 
         assert response.status_code == 401
 
+    def test_post_token_authenticates_requests(self, app, client, user_factory):
+        user = user_factory.create()
+
+        response = client.post(
+            url_for(UserLoginResource.endpoint),
+            json={'username': user.username, 'password': 'password123'}
+        )
+        token = response.get_json()['token']
+
+        # A fresh client, so only the API key identifies the user.
+        response = app.test_client().put(
+            url_for(UserResource.endpoint),
+            json={'username': 'ferrarijessie'},
+            headers={'x-api-key': token}
+        )
+
+        assert response.status_code == 200
+
+    def test_request_with_unknown_token(self, client, user_factory):
+        user_factory.create()
+
+        response = client.put(
+            url_for(UserResource.endpoint),
+            json={'username': 'ferrarijessie'},
+            headers={'x-api-key': 'unknown'}
+        )
+
+        assert response.status_code == 401
+
 
 class TestSignupResource:
     def test_post_success(self, client):
@@ -1,7 +1,7 @@
 import pytest
 
-from api.auth.model import User
-from api.auth.service import AuthService
+from api.auth.model import ApiToken, User
+from api.auth.service import AuthService, MAX_API_TOKENS
 from api.auth.exception import (
     UsernameAlreadyExistsException, 
     LoginException, 
@@ -44,6 +44,51 @@ class TestAuthService:
         })
         assert result == user
 
+    def test_login_unknown_username(self, client):
+        with pytest.raises(LoginException):
+            AuthService.login({
+                'username': 'unknown',
+                'password': 'password123'
+            })
+
+    def test_login_issues_hashed_token(self, client, user_factory):
+        user = user_factory.create()
+
+        result = AuthService.login({
+            'username': user.username,
+            'password': 'password123'
+        })
+
+        token_hashes = [api_token.token_hash for api_token in result.api_tokens]
+        assert token_hashes[-1] == User.hash_token(result.token)
+        assert result.token not in token_hashes
+
+    def test_login_keeps_other_clients_tokens(self, client, user_factory):
+        user = user_factory.create()
+        first_token = user.token
+
+        result = AuthService.login({
+            'username': user.username,
+            'password': 'password123'
+        })
+
+        assert result.token != first_token
+        assert AuthService.get_by_token_hash(User.hash_token(first_token)).id == user.id
+        assert AuthService.get_by_token_hash(User.hash_token(result.token)).id == user.id
+
+    def test_login_revokes_oldest_tokens(self, client, user_factory):
+        user = user_factory.create()
+        first_token = user.token
+
+        for _ in range(MAX_API_TOKENS):
+            AuthService.login({
+                'username': user.username,
+                'password': 'password123'
+            })
+
+        assert ApiToken.query.filter(ApiToken.user_id == user.id).count() == MAX_API_TOKENS
+        assert AuthService.get_by_token_hash(User.hash_token(first_token)) is None
+
     def test_update_profile_wrong_user(self, client, user_factory):
         user = user_factory.create()
 
@@ -0,0 +1,38 @@
+import pytest
+
+from flask import Flask, g
+
+from api.timing import run_timed, server_timing_header
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+
+class TestRunTimed:
+    def test_run(self, app):
+        calls = []
+
+        result = run_timed({'a': lambda: calls.append('a') or 1, 'b': lambda: calls.append('b') or 2})
+
+        assert result == {'a': 1, 'b': 2}
+        assert calls == ['a', 'b']
+        assert set(g.server_timings) == {'a', 'b'}
+
+    def test_errors_keep_the_finished_timings(self, app):
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            run_timed({'a': lambda: 1, 'b': fail})
+
+        assert set(g.server_timings) == {'a'}
+
+    def test_server_timing_header(self, app):
+        g.server_timings = {'a': 0.0125}
+        response = app.response_class()
+
+        assert server_timing_header(response).headers['Server-Timing'] == 'a;dur=12.5'
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from api.cache import SingleFlight, TTLCache
+
+
+class TestTTLCache:
+    def test_get_missing(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+
+        assert cache.get('key') is None
+        assert cache.stats()['misses'] == 1
+
+    def test_get_hit(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('key', 'value')
+
+        assert cache.get('key') == 'value'
+        assert cache.stats()['hits'] == 1
+
+    def test_expired_entry(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('key', 'value', ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get('key') is None
+        assert cache.stats()['entries'] == 0
+
+    def test_peek_leaves_the_counters_alone(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('key', 'value')
+
+        assert cache.peek('key') == 'value'
+        assert cache.peek('missing') is None
+        assert cache.stats()['hits'] == 0
+        assert cache.stats()['misses'] == 0
+
+    def test_lookup_reports_stale_entries(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('fresh', 1, stale_after=60)
+        cache.set('stale', 2, stale_after=0)
+
+        assert cache.lookup('fresh') == (1, False)
+        assert cache.lookup('stale') == (2, True)
+        assert cache.lookup('missing') == (None, False)
+        assert cache.stats()['stale_hits'] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_invalidate_where(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set((1, 'a'), 1)
+        cache.set((1, 'b'), 2)
+        cache.set((2, 'a'), 3)
+
+        result = cache.invalidate_where(lambda key, value: key[0] == 1)
+
+        assert result == 2
+        assert cache.get((2, 'a')) == 3
+        assert cache.stats()['entries'] == 1
+
+    def test_set_skips_values_invalidated_since_generation(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        generation = cache.generation('key')
+        other = cache.generation('other')
+        cache.invalidate('key')
+
+        assert cache.set('key', 'stale', generation=generation) is False
+        assert cache.set('other', 'value', generation=other) is True
+        assert cache.get('key') is None
+        assert cache.get('other') == 'value'
+        assert cache.set('key', 'fresh', generation=cache.generation('key')) is True
+
+    def test_invalidate_where_bumps_keys_not_cached_yet(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        generation = cache.generation((1, 'a'))
+        cache.invalidate_where(lambda key, value: key[0] == 1)
+
+        assert cache.set((1, 'a'), 'stale', generation=generation) is False
+        assert cache.get((1, 'a')) is None
+
+
+class TestSingleFlight:
+    def test_coalesces_concurrent_calls(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(1)
+            return 'value'
+
+        leader = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+        leader.start()
+        started.wait(1)
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+            for _ in range(3)
+        ]
+        for follower in followers:
+            follower.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(1)
+
+        assert len(calls) == 1
+        assert results == ['value'] * 4
+        assert not flight.in_flight('key')
+
+    def test_shares_errors(self):
+        flight = SingleFlight()
+
+        with pytest.raises(ValueError):
+            flight.do('key', lambda: int('nan'))
+
+        assert flight.do('key', lambda: 1) == 1
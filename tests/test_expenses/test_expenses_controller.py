@@ -1,5 +1,7 @@
 from flask import url_for
 
+from database import db
+
 from api.expenses.controller import (
     ExpenseResource,
     ExpenseIdResource,
@@ -9,13 +11,15 @@ from api.expenses.controller import (
     ExpenseTypeIdResource,
 )
 from api.expenses.model import ExpenseCategoryEnum
+from api.summary.model import LedgerEntry
+from api.summary.read_model import LedgerService
 
 class TestExpenseResource:
     def test_get_empty_result(self, client, user_factory):
         user = user_factory.create()
 
         response = client.get(
-            url_for(ExpenseResource.endpoint),
+            url_for(ExpenseResource.endpoint, all='true'),
             headers={'x-api-key': user.token}
         )
 
@@ -23,12 +27,12 @@ class TestExpenseResource:
         assert response.get_json() == []
 
     
-    def test_get_with_result(self, client, expense_factory):
+    def test_get_with_result(self, client, expense_factory, user_factory):
         expense = expense_factory.create()
 
         response = client.get(
-            url_for(ExpenseResource.endpoint),
-            headers={'x-api-key': expense.user.token}
+            url_for(ExpenseResource.endpoint, all='true'),
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
         )
         response_json = response.get_json()
 
@@ -36,7 +40,57 @@ class TestExpenseResource:
         assert len(response_json) == 1
         assert response_json[0]["id"] == expense.id
 
-    def test_post(self, client, expense_type_factory):
+    def test_get_pages(self, client, expense_type_factory, expense_factory, user_factory):
+        user = user_factory.create()
+        expenses = []
+        for i in range(2):
+            expense_type = expense_type_factory.create(user_id=user.id)
+            for month in (3, 1, 2):
+                expenses.append(expense_factory.create(type_id=expense_type.id, year=2024, month=month))
+        expected = [expense.id for expense in sorted(expenses, key=lambda e: (e.year, e.month, e.id))]
+
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {'limit': 4, 'cursor': cursor} if cursor else {'limit': 4}
+            response = client.get(
+                url_for(ExpenseResource.endpoint, **params),
+                headers={'x-api-key': user.token}
+            )
+            response_json = response.get_json()
+            assert response.status_code == 200
+            ids += [item['id'] for item in response_json['items']]
+            pages += 1
+            cursor = response_json['nextCursor']
+            if cursor is None:
+                break
+
+        assert pages == 2
+        assert ids == expected
+
+    def test_get_page_reads_the_expense_table(self, client, expense_factory, user_factory):
+        expense = expense_factory.create()
+        LedgerEntry.query.delete()
+        db.session.commit()
+
+        response = client.get(
+            url_for(ExpenseResource.endpoint, limit=10),
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
+        )
+
+        assert response.status_code == 200
+        assert [item['id'] for item in response.get_json()['items']] == [expense.id]
+
+    def test_get_invalid_cursor(self, client, user_factory):
+        user = user_factory.create()
+
+        response = client.get(
+            url_for(ExpenseResource.endpoint, cursor='not-a-cursor'),
+            headers={'x-api-key': user.token}
+        )
+
+        assert response.status_code == 400
+
+    def test_post(self, client, expense_type_factory, user_factory):
         expense_type = expense_type_factory.create()
         payload = {
             'value': 100,
@@ -48,7 +102,7 @@ class TestExpenseResource:
         response = client.post(
             url_for(ExpenseResource.endpoint), 
             json=payload,
-            headers={'x-api-key': expense_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense_type.user)}
         )
         response_json = response.get_json()
 
@@ -60,6 +114,26 @@ class TestExpenseResource:
         assert response_json["typeId"] == expense_type.id
         assert response_json["paid"] == False
 
+    def test_post_other_users_type(self, client, expense_factory, user_factory):
+        expense = expense_factory.create(value=100)
+        payload = {
+            'value': 1,
+            'month': expense.month,
+            'year': expense.year,
+            'typeId': expense.type_id,
+        }
+
+        response = client.post(
+            url_for(ExpenseResource.endpoint),
+            json=payload,
+            headers={'x-api-key': user_factory.create().token}
+        )
+
+        assert response.status_code == 404
+        assert response.get_json() == {"code": 404, "message": "Expense Type not found"}
+        db.session.refresh(expense)
+        assert expense.value == 100
+
 
 class TestExpenseIdResource:
     def test_get_empty_result(self, client, user_factory):
@@ -73,12 +147,12 @@ class TestExpenseIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Expense not found'}
 
-    def test_get_with_result(self, client, expense_factory):
+    def test_get_with_result(self, client, expense_factory, user_factory):
         expense = expense_factory.create()
 
         response = client.get(
             url_for(ExpenseIdResource.endpoint, expenseId=expense.id),
-            headers={'x-api-key': expense.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
         )
         response_json = response.get_json()
 
@@ -107,7 +181,7 @@ class TestExpenseIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Expense not found'}
 
-    def test_put_success(self, client, expense_factory):
+    def test_put_success(self, client, expense_factory, user_factory):
         expense = expense_factory.create()
         payload = {
             "value": 123,
@@ -117,7 +191,7 @@ class TestExpenseIdResource:
         response = client.put(
             url_for(ExpenseIdResource.endpoint, expenseId=expense.id),
             json=payload,
-            headers={'x-api-key': expense.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
         )
         response_json = response.get_json()
 
@@ -125,6 +199,59 @@ class TestExpenseIdResource:
         assert response_json["value"] == 123
         assert response_json["paid"] == True
 
+    def test_put_other_users_type(self, client, expense_factory, expense_type_factory, user_factory):
+        expense = expense_factory.create()
+        other_type = expense_type_factory.create()
+
+        response = client.put(
+            url_for(ExpenseIdResource.endpoint, expenseId=expense.id),
+            json={"typeId": other_type.id},
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
+        )
+
+        assert response.status_code == 404
+        assert response.get_json() == {"code": 404, "message": "Expense Type not found"}
+        db.session.refresh(expense)
+        assert expense.type_id != other_type.id
+
+    def test_put_type_change_moves_the_ledger_entry(self, client, expense_factory, expense_type_factory, user_factory):
+        expense = expense_factory.create(month=9, year=2024)
+        previous_type_id, user_id = expense.type_id, expense.user_id
+        new_type = expense_type_factory.create(name='New Type', user_id=user_id)
+        headers = {'x-api-key': user_factory.issue_token(expense.user)}
+
+        response = client.put(
+            url_for(ExpenseIdResource.endpoint, expenseId=expense.id),
+            json={"typeId": new_type.id},
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.get_json()["typeName"] == 'New Type'
+
+        client.put(url_for(ExpenseTypeIdResource.endpoint, typeId=new_type.id), json={'name': 'Renamed'}, headers=headers)
+        client.delete(url_for(ExpenseTypeIdResource.endpoint, typeId=previous_type_id), headers=headers)
+
+        entries = LedgerService.get_month(user_id, 2024, 9)
+        assert [(entry.item_id, entry.type_id, entry.type_name) for entry in entries] == [
+            (expense.id, new_type.id, 'Renamed')
+        ]
+
+    def test_put_onto_occupied_month(self, client, expense_factory, user_factory):
+        expense = expense_factory.create(month=9, year=2024)
+        occupied = expense_factory.create(type_id=expense.type_id, month=10, year=2024)
+
+        response = client.put(
+            url_for(ExpenseIdResource.endpoint, expenseId=expense.id),
+            json={"month": 10},
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
+        )
+
+        assert response.status_code == 409
+        assert response.get_json() == {'code': 409, 'message': 'Expense already exists'}
+        db.session.refresh(expense)
+        db.session.refresh(occupied)
+        assert (expense.month, occupied.month) == (9, 10)
+
     def test_delete_non_existent(self, client, user_factory):
         user = user_factory.create()
 
@@ -136,12 +263,12 @@ class TestExpenseIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Expense not found'}
 
-    def test_delete_non_existent(self, client, expense_factory):
+    def test_delete_non_existent(self, client, expense_factory, user_factory):
         expense = expense_factory.create()
 
         response = client.delete(
             url_for(ExpenseIdResource.endpoint, expenseId=expense.id),
-            headers={'x-api-key': expense.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
         )
 
         assert response.status_code == 204
@@ -160,12 +287,12 @@ class TestExpenseByCategoryResource:
         assert response.get_json() == []
 
     
-    def test_get_with_result(self, client, expense_factory):
+    def test_get_with_result(self, client, expense_factory, user_factory):
         expense = expense_factory.create()
 
         response = client.get(
             url_for(ExpenseByCategoryResource.endpoint, category=expense.expense_type.category.value),
-            headers={'x-api-key': expense.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
         )
         response_json = response.get_json()[0]
 
@@ -218,25 +345,38 @@ class TestExpenseTypeResource:
         user = user_factory.create()
 
         response = client.get(
-            url_for(ExpenseTypeResource.endpoint),
+            url_for(ExpenseTypeResource.endpoint, all='true'),
             headers={'x-api-key': user.token}
         )
 
         assert response.status_code == 200
         assert response.get_json() == []
 
-    def test_get_with_result(self, client, expense_type_factory):
+    def test_get_with_result(self, client, expense_type_factory, user_factory):
         expense_type = expense_type_factory.create()
 
         response = client.get(
-            url_for(ExpenseTypeResource.endpoint),
-            headers={'x-api-key': expense_type.user.token}
+            url_for(ExpenseTypeResource.endpoint, all='true'),
+            headers={'x-api-key': user_factory.issue_token(expense_type.user)}
         )
         response_json = response.get_json()
 
         assert response.status_code == 200
         assert response_json[0]["expenseTypeId"] == expense_type.id
 
+    def test_get_page_leaves_the_values_out(self, client, expense_factory, user_factory):
+        expense = expense_factory.create()
+
+        response = client.get(
+            url_for(ExpenseTypeResource.endpoint, limit=10),
+            headers={'x-api-key': user_factory.issue_token(expense.user)}
+        )
+        response_json = response.get_json()
+
+        assert response.status_code == 200
+        assert response_json['items'][0]['id'] == expense.type_id
+        assert 'expenseValues' not in response_json['items'][0]
+
     def test_post_success(self, client, user_factory):
         user = user_factory.create()
 
@@ -272,12 +412,12 @@ class TestExpenseTypeIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Expense Type not found'}
 
-    def test_get_success(self, client, expense_type_factory):
+    def test_get_success(self, client, expense_type_factory, user_factory):
         expense_type = expense_type_factory.create()
 
         response = client.get(
             url_for(ExpenseTypeIdResource.endpoint, typeId=expense_type.id),
-            headers={'x-api-key': expense_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense_type.user)}
         )
         response_json = response.get_json()
 
@@ -302,7 +442,7 @@ class TestExpenseTypeIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Expense Type not found'}
 
-    def test_put_success(self, client, expense_type_factory):
+    def test_put_success(self, client, expense_type_factory, user_factory):
         expense_type = expense_type_factory.create()
         payload = {
             "name": "New Type",
@@ -313,7 +453,7 @@ class TestExpenseTypeIdResource:
         response = client.put(
             url_for(ExpenseTypeIdResource.endpoint, typeId=expense_type.id),
             json=payload,
-            headers={'x-api-key': expense_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense_type.user)}
         )
         response_json = response.get_json()
 
@@ -334,12 +474,12 @@ class TestExpenseTypeIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Expense Type not found'}
 
-    def test_delete_success(self, client, expense_type_factory):
+    def test_delete_success(self, client, expense_type_factory, user_factory):
         expense_type = expense_type_factory.create()
 
         response = client.delete(
             url_for(ExpenseTypeIdResource.endpoint, typeId=expense_type.id),
-            headers={'x-api-key': expense_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(expense_type.user)}
         )
 
         assert response.status_code == 204
@@ -1,5 +1,9 @@
 import pytest
 
+from sqlalchemy.exc import OperationalError
+
+from database import db
+
 from datetime import datetime
 
 from api.expenses.service import (
@@ -11,6 +15,7 @@ from api.expenses.model import (
     ExpenseCategoryEnum,
     Expense
 )
+from api.expenses.schema import ExpenseReturnSchema
 from api.expenses.exceptions import (
     ExpenseNotFoundException,
     ExpenseTypeNotFoundException,
@@ -125,6 +130,51 @@ class TestExpenseTypeService:
         assert result.base_value == 200
         assert expense.value == 200
 
+    def test_update_future_values_in_bulk(
+        self, 
+        client, 
+        expense_type_factory, 
+        expense_factory, 
+        user_factory
+    ):
+        user = user_factory.create()
+        today = datetime.today()
+        expense_type = expense_type_factory.create(
+            recurrent=True,
+            name='Type 1',
+            base_value=100,
+            user_id=user.id
+        )
+        current = expense_factory.create(type_id=expense_type.id, month=today.month, year=today.year)
+        next_january = expense_factory.create(type_id=expense_type.id, month=1, year=today.year + 1)
+        paid = expense_factory.create(type_id=expense_type.id, month=2, year=today.year + 1, paid=True)
+        past = expense_factory.create(type_id=expense_type.id, month=12, year=today.year - 1)
+
+        result = ExpenseTypeService.update(expense_type.id, {'base_value': 200}, user_id=user.id)
+
+        assert result.updated_values == 2
+        assert ExpenseService.get_one(current.id, user_id=user.id).value == 200
+        assert ExpenseService.get_one(next_january.id, user_id=user.id).value == 200
+        assert ExpenseService.get_one(paid.id, user_id=user.id).value == 100
+        assert ExpenseService.get_one(past.id, user_id=user.id).value == 100
+
+    def test_update_without_base_value_keeps_values(self, client, expense_type_factory, expense_factory):
+        expense_type = expense_type_factory.create(recurrent=True, base_value=100)
+        expense = expense_factory.create(
+            type_id=expense_type.id,
+            month=datetime.today().month,
+            year=datetime.today().year
+        )
+
+        result = ExpenseTypeService.update(
+            expense_type.id,
+            {'name': 'Renamed'},
+            user_id=expense_type.user_id
+        )
+
+        assert result.updated_values == 0
+        assert ExpenseService.get_one(expense.id, user_id=expense_type.user_id).value == 100
+
     def test_create_with_end_date(self, client, user_factory):
         user = user_factory.create()
         today = datetime.today()
@@ -198,6 +248,21 @@ class TestExpenseTypeService:
         with pytest.raises(ExpenseTypeNotFoundException):
             ExpenseTypeService.get_one(id, user_id=expense_type.user_id)
 
+    def test_delete_cascades_in_the_database(self, client, expense_type_factory, expense_factory, query_counter):
+        counts = []
+        for history in (1, 30):
+            expense_type = expense_type_factory.create()
+            for i in range(history):
+                expense_factory.create(type_id=expense_type.id, year=2000 + i // 12, month=i % 12 + 1)
+            id, user_id = expense_type.id, expense_type.user_id
+
+            with query_counter as counter:
+                ExpenseTypeService.delete(id, user_id=user_id)
+            counts.append(counter.count)
+
+            assert Expense.query.filter(Expense.type_id == id).count() == 0
+        assert counts[0] == counts[1]
+
 
 class TestExpenseService:
     def test_get_all_empty_result(self, client, expense_factory):
@@ -212,6 +277,29 @@ class TestExpenseService:
 
         assert expense in result
 
+    def test_lists_load_their_types_eagerly(self, client, expense_type_factory, user_factory, query_counter):
+        user = user_factory.create()
+        for i in range(10):
+            expense_type = expense_type_factory.create(
+                name=f'Type {i}', category=ExpenseCategoryEnum.CARD, user_id=user.id
+            )
+            db.session.add_all(
+                Expense(type_id=expense_type.id, value=10, year=2000 + month // 12, month=month % 12 + 1)
+                for month in range(100)
+            )
+        db.session.commit()
+        db.session.expunge_all()
+        user_id = user.id
+        schema = ExpenseReturnSchema(many=True)
+
+        with query_counter as counter:
+            by_user = schema.dump(ExpenseService.get_all(user_id=user_id))
+            by_category = schema.dump(ExpenseService.get_by_category(ExpenseCategoryEnum.CARD, user_id=user_id))
+
+        assert counter.count == 2
+        assert len(by_user) == len(by_category) == 1000
+        assert {item['typeName'] for item in by_user} == {f'Type {i}' for i in range(10)}
+
     def test_get_one_empty_result(self, client, expense_factory):
         expense = expense_factory.create()
         with pytest.raises(ExpenseNotFoundException) as e:
@@ -243,7 +331,7 @@ class TestExpenseService:
             'year': 2024,
             'type_id': expense_type.id,
             'paid': False
-        })
+        }, user_id=expense_type.user_id)
         
         assert isinstance(result, Expense)
         assert result.value == 100
@@ -302,6 +390,14 @@ class TestExpenseService:
         assert result.value == 135
         assert result.paid == True
 
+    def test_update_keeps_period_in_sync(self, client, expense_factory):
+        expense = expense_factory.create(month=12, year=2024)
+        assert expense.period == 2024 * 12 + 12
+
+        result = ExpenseService.update(expense.id, {'month': 1, 'year': 2025}, user_id=expense.user_id)
+
+        assert result.period == 2025 * 12 + 1
+
     def test_delete_non_existent(self, client, expense_factory):
         expense = expense_factory.create()
         with pytest.raises(ExpenseNotFoundException) as e:
@@ -385,36 +481,91 @@ class TestExpenseService:
         assert result_2['year'] == expense_2.year
         assert result_2['paid'] == expense_2.paid
 
-    def test__get_or_create_non_existent_no_base_value(self, client, expense_factory):
-        expense = expense_factory.create()
-        result = ExpenseService._get_or_create(type=expense.expense_type, year=expense.year+1, month=expense.month+1)
+    def test_get_expense_list_query_count_is_constant(
+        self, 
+        client, 
+        expense_type_factory, 
+        expense_factory,
+        user_factory,
+        query_counter
+    ):
+        counts = []
+        for types_count in (1, 20):
+            user = user_factory.create()
+            for i in range(types_count):
+                expense_type = expense_type_factory.create(
+                    recurrent=bool(i % 2),
+                    name=f'Type {i}',
+                    base_value=100,
+                    user_id=user.id
+                )
+                expense_factory.create(type_id=expense_type.id, month=9, year=2024)
+
+            with query_counter as counter:
+                result = ExpenseService.get_expense_list(month=9, year=2024, user_id=user.id)
+
+            assert len(result) == types_count
+            counts.append(counter.count)
+
+        assert counts == [1, 1]
+
+    def test_get_expense_list_projects_virtual_rows(
+        self, 
+        client, 
+        expense_type_factory, 
+        user_factory
+    ):
+        user = user_factory.create()
+        expense_type = expense_type_factory.create(
+            recurrent=True,
+            name='Type 1',
+            base_value=100,
+            user_id=user.id
+        )
+        expenses_count = Expense.query.count()
 
-        assert isinstance(result, Expense)
-        assert result.type_id == expense.type_id
-        assert result.month == expense.month+1
-        assert result.year == expense.year+1
-        assert result.value == 0
-        assert result.paid == False
+        result = ExpenseService.get_expense_list(month=9, year=9999, user_id=user.id)
+
+        assert Expense.query.count() == expenses_count
+        assert len(result) == 1
+        assert result[0]['id'] is None
+        assert result[0]['virtual'] == True
+        assert result[0]['type_id'] == expense_type.id
+        assert result[0]['value'] == 100
 
-    def test__get_or_create_non_existent_with_base_value(self, client, expense_factory, expense_type_factory):
+    def test_create_persists_virtual_row_once(self, client, expense_type_factory):
         expense_type = expense_type_factory.create(recurrent=True, base_value=100)
-        expense = expense_factory.create(type_id=expense_type.id)
-        result = ExpenseService._get_or_create(type=expense.expense_type, year=expense.year+1, month=expense.month+1)
+        data = {'type_id': expense_type.id, 'month': 9, 'year': 2024, 'value': 100, 'paid': False}
 
-        assert isinstance(result, Expense)
-        assert result.type_id == expense.type_id
-        assert result.month == expense.month+1
-        assert result.year == expense.year+1
-        assert result.value == expense_type.base_value
-        assert result.paid == False
+        first = ExpenseService.create(data, user_id=expense_type.user_id)
+        second = ExpenseService.create({**data, 'value': 150, 'paid': True}, user_id=expense_type.user_id)
 
-    def test__get_or_create_existent(self, client, expense_factory):
-        expense = expense_factory.create(**{'paid': True})
-        result = ExpenseService._get_or_create(type=expense.expense_type, year=expense.year, month=expense.month)
+        assert first.id == second.id
+        assert second.value == 150
+        assert second.paid == True
 
-        assert isinstance(result, Expense)
-        assert result.type_id == expense.type_id
-        assert result.month == expense.month
-        assert result.year == expense.year
-        assert result.value == expense.value
-        assert result.paid == expense.paid
+    def test_create_locks_the_month_before_reading_it(self, client, expense_type_factory, query_counter):
+        expense_type = expense_type_factory.create()
+        data = {'type_id': expense_type.id, 'month': 9, 'year': 2024, 'value': 100, 'paid': False}
+        user_id = expense_type.user_id
+
+        with query_counter as counter:
+            ExpenseService.create(data, user_id=user_id)
+
+        statements = [statement for statement, _ in counter.statements]
+        upsert = next(i for i, statement in enumerate(statements) if statement.startswith('INSERT INTO expense '))
+        assert any(
+            'FROM expense' in statement and statement.endswith('FOR UPDATE') for statement in statements[:upsert]
+        )
+
+    def test_get_one_for_update_locks_the_expense(self, client, expense_factory):
+        expense = expense_factory.create()
+
+        ExpenseService.get_one(expense.id, user_id=expense.user_id, for_update=True)
+
+        with db.engine.connect() as other:
+            with pytest.raises(OperationalError):
+                other.execute(
+                    db.text('SELECT id FROM expense WHERE id = :id FOR UPDATE NOWAIT'), {'id': expense.id}
+                )
+        db.session.rollback()
@@ -0,0 +1,83 @@
+import json
+
+from flask import url_for
+
+from api.export.controller import ExportResource
+
+
+class TestExportResource:
+    def test_get_ndjson(
+        self,
+        client,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        income_factory,
+        saving_type_factory,
+        saving_value_factory,
+        user_factory
+    ):
+        user = user_factory.create()
+        expense_type = expense_type_factory.create(name='Rent', user_id=user.id)
+        expense = expense_factory.create(type_id=expense_type.id, year=2024, month=9, value=100, paid=True)
+        income_type = income_type_factory.create(name='Salary', user_id=user.id)
+        income = income_factory.create(type_id=income_type.id, year=2024, month=10, value=500)
+        saving_type = saving_type_factory.create(user_id=user.id)
+        saving = saving_value_factory.create(type_id=saving_type.id, year=2024, month=8, value=50)
+
+        result = client.get(url_for(ExportResource.endpoint), headers={'x-api-key': user.token})
+        rows = [json.loads(line) for line in result.get_data(as_text=True).splitlines()]
+
+        assert result.status_code == 200
+        assert result.mimetype == 'application/x-ndjson'
+        assert [(row['model'], row['id']) for row in rows] == [
+            ('SAVING', saving.id), ('EXPENSE', expense.id), ('INCOME', income.id)
+        ]
+        assert rows[1]['typeName'] == 'Rent'
+        assert rows[1]['value'] == 100
+        assert rows[1]['status'] is True
+
+    def test_get_csv_range(self, client, expense_type_factory, expense_factory, user_factory):
+        user = user_factory.create()
+        expense_type = expense_type_factory.create(user_id=user.id)
+        for month in (10, 11, 12):
+            expense_factory.create(type_id=expense_type.id, year=2024, month=month, value=month)
+
+        result = client.get(
+            url_for(ExportResource.endpoint, format='csv', **{'from': '2024-11', 'to': '2024-12'}),
+            headers={'x-api-key': user.token}
+        )
+        lines = result.get_data(as_text=True).splitlines()
+
+        assert result.status_code == 200
+        assert result.mimetype == 'text/csv'
+        assert lines[0] == 'model,id,year,month,typeId,typeName,category,value,status'
+        assert [line.split(',')[3] for line in lines[1:]] == ['11', '12']
+
+    def test_get_other_user(self, client, expense_type_factory, expense_factory, user_factory):
+        user = user_factory.create()
+        other_user = user_factory.create()
+        expense_type = expense_type_factory.create(user_id=other_user.id)
+        expense_factory.create(type_id=expense_type.id, year=2024, month=9)
+
+        result = client.get(url_for(ExportResource.endpoint), headers={'x-api-key': user.token})
+
+        assert result.status_code == 200
+        assert result.get_data(as_text=True) == ''
+
+    def test_get_invalid_format(self, client, user_factory):
+        user = user_factory.create()
+
+        result = client.get(url_for(ExportResource.endpoint, format='xml'), headers={'x-api-key': user.token})
+
+        assert result.status_code == 400
+
+    def test_get_invalid_month(self, client, user_factory):
+        user = user_factory.create()
+
+        result = client.get(
+            url_for(ExportResource.endpoint, **{'from': '2024-13'}),
+            headers={'x-api-key': user.token}
+        )
+
+        assert result.status_code == 400
@@ -0,0 +1,35 @@
+import io
+
+from flask import url_for
+
+from api.imports.controller import ImportResource
+
+
+class TestImportResource:
+    def test_post(self, client, user_factory):
+        user = user_factory.create()
+
+        result = client.post(
+            url_for(ImportResource.endpoint),
+            data={'file': (io.BytesIO(b"date,type,amount\n2024-09-01,Rent,-1000\nbad,Rent,-1\n"), 'statement.csv')},
+            content_type='multipart/form-data',
+            headers={'x-api-key': user.token}
+        )
+        result_json = result.get_json()
+
+        assert result.status_code == 200
+        assert result_json['imported'] == 1
+        assert result_json['createdTypes'] == 1
+        assert result_json['errors'] == [{'line': 3, 'message': "Invalid date"}]
+
+    def test_post_invalid_file(self, client, user_factory):
+        user = user_factory.create()
+
+        result = client.post(
+            url_for(ImportResource.endpoint),
+            data={'file': (io.BytesIO(b"foo,bar\n1,2\n"), 'statement.csv')},
+            content_type='multipart/form-data',
+            headers={'x-api-key': user.token}
+        )
+
+        assert result.status_code == 400
@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+from mock import patch
+
+from database import db
+
+from api.expenses.model import Expense, ExpenseCategoryEnum, ExpenseType
+from api.imports.exceptions import InvalidImportFileException
+from api.imports.service import ImportService
+from api.incomes.model import Income, IncomeType
+from api.summary.read_model import EXPENSE, LedgerService, MonthlySummaryService
+
+
+class TestImportService:
+    def test_import_statement(self, client, user_factory):
+        user = user_factory.create()
+        statement = io.StringIO(
+            "Date,Type,Amount,Category\n"
+            "2024-09-03,Rent,-1000,house\n"
+            "2024-09-05,Salary,2500,\n"
+            "2024-09-20,Groceries,-30.50,\n"
+            "2024-09-27,Groceries,-19.50,\n"
+        )
+
+        report = ImportService.import_statement(user_id=user.id, lines=statement)
+
+        assert report == {'imported': 4, 'created_types': 3, 'errors': []}
+
+        rent = ExpenseType.query.filter(ExpenseType.user_id == user.id, ExpenseType.name == 'Rent').one()
+        assert rent.category == ExpenseCategoryEnum.HOUSE
+        assert IncomeType.query.filter(IncomeType.user_id == user.id).count() == 1
+
+        groceries = Expense.query.join(ExpenseType).filter(ExpenseType.name == 'Groceries').one()
+        assert groceries.value == 50
+        assert groceries.paid is True
+        income = Income.query.join(IncomeType).filter(IncomeType.user_id == user.id).one()
+        assert (income.value, income.received) == (2500, True)
+
+        summary = MonthlySummaryService.get(user.id, 2024, 9)
+        assert summary.expenses_total == 1050
+        assert summary.incomes_total == 2500
+        assert summary.paid_count == 2
+        assert summary.received_count == 1
+        assert sorted(entry.value for entry in LedgerService.get_month(user.id, 2024, 9)) == [50, 1000, 2500]
+
+    def test_import_statement_existing_value(self, client, expense_type_factory, expense_factory, user_factory):
+        user = user_factory.create()
+        expense_type = expense_type_factory.create(name='Groceries', user_id=user.id)
+        expense = expense_factory.create(type_id=expense_type.id, year=2024, month=9, value=100, paid=False)
+
+        report = ImportService.import_statement(
+            user_id=user.id,
+            lines=io.StringIO("date,type,amount,status\n2024-09,groceries,-25,false\n")
+        )
+
+        assert report == {'imported': 1, 'created_types': 0, 'errors': []}
+        assert db.session.get(Expense, expense.id).value == 125
+        assert MonthlySummaryService.get(user.id, 2024, 9).expenses_total == 125
+        assert [(entry.model, entry.value) for entry in LedgerService.get_month(user.id, 2024, 9)] == [(EXPENSE, 125)]
+
+    def test_import_statement_invalid_lines(self, client, user_factory):
+        user = user_factory.create()
+        statement = io.StringIO(
+            "date,type,amount\n"
+            "2024-13-01,Rent,-1000\n"
+            "2024-09-01,,-1000\n"
+            "2024-09-01,Rent,abc\n"
+            "2024-09-01,Rent,0\n"
+            "2024-09-01,Rent,-1000\n"
+        )
+
+        report = ImportService.import_statement(user_id=user.id, lines=statement)
+
+        assert report['imported'] == 1
+        assert report['errors'] == [
+            {'line': 2, 'message': "Invalid date"},
+            {'line': 3, 'message': "Invalid type"},
+            {'line': 4, 'message': "Invalid amount"},
+            {'line': 5, 'message': "Invalid amount"},
+        ]
+
+    def test_import_statement_chunks(self, client, user_factory):
+        user = user_factory.create()
+        statement = io.StringIO("date,type,amount\n" + "".join(
+            f"2024-{month:02d}-01,Rent,-100\n" for month in range(1, 6)
+        ))
+
+        with patch('api.imports.service.IMPORT_CHUNK_SIZE', 2):
+            report = ImportService.import_statement(user_id=user.id, lines=statement)
+
+        assert report == {'imported': 5, 'created_types': 1, 'errors': []}
+        assert ExpenseType.query.filter(ExpenseType.user_id == user.id).count() == 1
+        assert Expense.query.join(ExpenseType).filter(ExpenseType.user_id == user.id).count() == 5
+
+    def test_import_statement_invalid_header(self, client, user_factory):
+        user = user_factory.create()
+
+        with pytest.raises(InvalidImportFileException):
+            ImportService.import_statement(user_id=user.id, lines=io.StringIO("date,description\n"))
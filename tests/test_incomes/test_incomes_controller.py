@@ -1,5 +1,7 @@
 from flask import url_for
 
+from database import db
+
 from api.incomes.controller import (
     IncomeTypeResource,
     IncomeTypeIdResource,
@@ -14,19 +16,19 @@ class TestIncomeTypeResource:
         user = user_factory.create()
 
         result = client.get(
-            url_for(IncomeTypeResource.endpoint),
+            url_for(IncomeTypeResource.endpoint, all='true'),
             headers={'x-api-key': user.token}
         )
 
         assert result.status_code == 200
         assert result.get_json() == []
 
-    def test_get_with_result(self, client, income_type_factory):
+    def test_get_with_result(self, client, income_type_factory, user_factory):
         income_type = income_type_factory.create()
 
         result = client.get(
-            url_for(IncomeTypeResource.endpoint),
-            headers={'x-api-key': income_type.user.token}
+            url_for(IncomeTypeResource.endpoint, all='true'),
+            headers={'x-api-key': user_factory.issue_token(income_type.user)}
         )
 
         assert result.status_code == 200
@@ -65,12 +67,12 @@ class  TestIncomeTypeIdResource:
         assert result.status_code == 404
         assert result.get_json() == {"code": 404, "message": "Income Type not found"}
 
-    def test_get_with_result(self, client, income_type_factory):
+    def test_get_with_result(self, client, income_type_factory, user_factory):
         income_type = income_type_factory.create()
 
         result = client.get(
             url_for(IncomeTypeIdResource.endpoint, typeId=income_type.id),
-            headers={'x-api-key': income_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(income_type.user)}
         )
 
         assert result.status_code == 200
@@ -93,7 +95,7 @@ class  TestIncomeTypeIdResource:
         assert result.status_code == 404
         assert result.get_json() == {"code": 404, "message": "Income Type not found"}
 
-    def test_put_success(self, client, income_type_factory):
+    def test_put_success(self, client, income_type_factory, user_factory):
         income_type = income_type_factory.create()
         payload = {
             'name': 'Edited Income Type',
@@ -103,7 +105,7 @@ class  TestIncomeTypeIdResource:
         result = client.put(
             url_for(IncomeTypeIdResource.endpoint, typeId=income_type.id),
             json=payload,
-            headers={'x-api-key': income_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(income_type.user)}
         )
 
         assert result.status_code == 200
@@ -122,12 +124,12 @@ class  TestIncomeTypeIdResource:
         assert result.status_code == 404
         assert result.get_json() == {"code": 404, "message": "Income Type not found"}
 
-    def test_delete_success(self, client, income_type_factory):
+    def test_delete_success(self, client, income_type_factory, user_factory):
         income_type = income_type_factory.create()
 
         result = client.delete(
             url_for(IncomeTypeIdResource.endpoint, typeId=income_type.id),
-            headers={'x-api-key': income_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(income_type.user)}
         )
 
         assert result.status_code == 204
@@ -138,25 +140,25 @@ class TestIncomeResource:
         user = user_factory.create()
 
         result = client.get(
-            url_for(IncomeResource.endpoint),
+            url_for(IncomeResource.endpoint, all='true'),
             headers={'x-api-key': user.token}
         )
 
         assert result.status_code == 200
         assert result.get_json() == []
 
-    def test_get_with_result(self, client, income_factory):
+    def test_get_with_result(self, client, income_factory, user_factory):
         income = income_factory.create()
 
         result = client.get(
-            url_for(IncomeResource.endpoint),
-            headers={'x-api-key': income.user.token}
+            url_for(IncomeResource.endpoint, all='true'),
+            headers={'x-api-key': user_factory.issue_token(income.user)}
         )
 
         assert result.status_code == 200
         assert result.get_json()[0]['id'] == income.id
 
-    def test_post_success(self, client, income_type_factory):
+    def test_post_success(self, client, income_type_factory, user_factory):
         income_type = income_type_factory.create()
 
         payload = {
@@ -169,7 +171,7 @@ class TestIncomeResource:
         result = client.post(
             url_for(IncomeResource.endpoint),
             json=payload,
-            headers={'x-api-key': income_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(income_type.user)}
         )
         result_json = result.get_json()
 
@@ -181,6 +183,26 @@ class TestIncomeResource:
         assert result_json['year'] == 2024
         assert result_json['received'] == False
 
+    def test_post_other_users_type(self, client, income_factory, user_factory):
+        income = income_factory.create(value=100)
+        payload = {
+            'typeId': income.type_id,
+            'value': 1,
+            'month': income.month,
+            'year': income.year
+        }
+
+        result = client.post(
+            url_for(IncomeResource.endpoint),
+            json=payload,
+            headers={'x-api-key': user_factory.create().token}
+        )
+
+        assert result.status_code == 404
+        assert result.get_json() == {"code": 404, "message": "Income Type not found"}
+        db.session.refresh(income)
+        assert income.value == 100
+
 
 class  TestIncomeIdResource:
     def test_get_empty_result(self, client, user_factory):
@@ -194,12 +216,12 @@ class  TestIncomeIdResource:
         assert result.status_code == 404
         assert result.get_json() == {"code": 404, "message": "Income not found"}
 
-    def test_get_with_result(self, client, income_factory):
+    def test_get_with_result(self, client, income_factory, user_factory):
         income = income_factory.create()
 
         result = client.get(
             url_for(IncomeIdResource.endpoint, incomeId=income.id),
-            headers={'x-api-key': income.user.token}
+            headers={'x-api-key': user_factory.issue_token(income.user)}
         )
 
         assert result.status_code == 200
@@ -222,7 +244,7 @@ class  TestIncomeIdResource:
         assert result.status_code == 404
         assert result.get_json() == {"code": 404, "message": "Income not found"}
 
-    def test_put_success(self, client, income_factory):
+    def test_put_success(self, client, income_factory, user_factory):
         income = income_factory.create()
         payload = {
             'value': 321,
@@ -232,7 +254,7 @@ class  TestIncomeIdResource:
         result = client.put(
             url_for(IncomeIdResource.endpoint, incomeId=income.id),
             json=payload,
-            headers={'x-api-key': income.user.token}
+            headers={'x-api-key': user_factory.issue_token(income.user)}
         )
         result_json = result.get_json()
 
@@ -241,6 +263,19 @@ class  TestIncomeIdResource:
         assert result_json['value'] == 321
         assert result_json['received'] == True
 
+    def test_put_onto_occupied_month(self, client, income_factory, user_factory):
+        income = income_factory.create(month=9, year=2024)
+        income_factory.create(type_id=income.type_id, month=10, year=2024)
+
+        result = client.put(
+            url_for(IncomeIdResource.endpoint, incomeId=income.id),
+            json={'month': 10},
+            headers={'x-api-key': user_factory.issue_token(income.user)}
+        )
+
+        assert result.status_code == 409
+        assert result.get_json() == {"code": 409, "message": "Income already exists"}
+
     def test_delete_non_existent(self, client, user_factory):
         user = user_factory.create()
 
@@ -252,12 +287,12 @@ class  TestIncomeIdResource:
         assert result.status_code == 404
         assert result.get_json() == {"code": 404, "message": "Income not found"}
 
-    def test_delete_success(self, client, income_factory):
+    def test_delete_success(self, client, income_factory, user_factory):
         income = income_factory.create()
 
         result = client.delete(
             url_for(IncomeIdResource.endpoint, incomeId=income.id),
-            headers={'x-api-key': income.user.token}
+            headers={'x-api-key': user_factory.issue_token(income.user)}
         )
 
         assert result.status_code == 204
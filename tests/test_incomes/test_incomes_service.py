@@ -1,11 +1,15 @@
 import pytest
 
+from database import db
+
 from datetime import datetime
 
 from api.incomes.exceptions import (
     IncomeTypeNotFoundException,
     IncomeNotFoundException
 )
+from api.incomes.model import Income
+from api.incomes.schema import IncomeReturnSchema
 from api.incomes.service import (
     IncomeTypeService,
     IncomeService
@@ -113,6 +117,32 @@ class TestIncomeTypeService:
         assert result.base_value == 200
         assert income.value == 200
 
+    def test_update_future_values_in_bulk(
+        self, 
+        client, 
+        income_type_factory, 
+        income_factory, 
+        user_factory
+    ):
+        user = user_factory.create()
+        today = datetime.today()
+        income_type = income_type_factory.create(
+            recurrent=True,
+            name='Type 1',
+            base_value=100,
+            user_id=user.id
+        )
+        next_january = income_factory.create(type_id=income_type.id, value=100, month=1, year=today.year + 1)
+        received = income_factory.create(
+            type_id=income_type.id, value=100, month=2, year=today.year + 1, received=True
+        )
+
+        result = IncomeTypeService.update(income_type.id, {'base_value': 200}, user_id=user.id)
+
+        assert result.updated_values == 1
+        assert IncomeService.get_one(next_january.id, user_id=user.id).value == 200
+        assert IncomeService.get_one(received.id, user_id=user.id).value == 100
+
     def test_delete_non_existen(self, client, income_type_factory):
         income_type = income_type_factory.create()
 
@@ -146,6 +176,25 @@ class TestIncomeService:
 
         assert income in result
 
+    def test_get_all_loads_the_types_eagerly(self, client, income_type_factory, user_factory, query_counter):
+        user = user_factory.create()
+        for i in range(10):
+            income_type = income_type_factory.create(name=f'Income {i}', user_id=user.id)
+            db.session.add_all(
+                Income(type_id=income_type.id, value=10, year=2000 + month // 12, month=month % 12 + 1)
+                for month in range(100)
+            )
+        db.session.commit()
+        db.session.expunge_all()
+        user_id = user.id
+
+        with query_counter as counter:
+            result = IncomeReturnSchema(many=True).dump(IncomeService.get_all(user_id=user_id))
+
+        assert counter.count == 1
+        assert len(result) == 1000
+        assert {item['typeName'] for item in result} == {f'Income {i}' for i in range(10)}
+
     def test_get_one_non_existent(self, client, income_factory):
         income = income_factory.create()
 
@@ -169,7 +218,7 @@ class TestIncomeService:
             'type_id': income_type.id,
             'received': False
         }
-        result = IncomeService.create(data)
+        result = IncomeService.create(data, user_id=income_type.user_id)
 
         assert result.id > 0
         assert result.value == 100
@@ -230,3 +279,16 @@ class TestIncomeService:
 
         assert len(result) == 2
 
+
+    def test_get_incomes_list_projects_virtual_rows(self, client, income_type_factory, user_factory):
+        user = user_factory.create()
+        income_type_factory.create(name='Salary', recurrent=True, base_value=1000, user_id=user.id)
+        income_type_factory.create(name='Bonus', recurrent=False, user_id=user.id)
+
+        result = IncomeService.get_incomes_list(year=2024, month=9, user_id=user.id)
+
+        assert len(result) == 1
+        assert result[0]['id'] is None
+        assert result[0]['virtual'] == True
+        assert result[0]['value'] == 1000
+        assert IncomeService.get_all(user_id=user.id) == []
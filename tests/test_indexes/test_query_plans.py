@@ -0,0 +1,209 @@
+import uuid
+
+from database import db
+
+from api.auth.model import ApiToken, User
+from api.auth.service import AuthService
+from api.expenses.model import Expense, ExpenseCategoryEnum, ExpenseType
+from api.expenses.service import ExpenseService, ExpenseTypeService
+from api.incomes.model import Income, IncomeType
+from api.incomes.service import IncomeService
+from api.savings.model import SavingType, SavingValue
+from api.savings.read_model import SavingBalanceService
+from api.savings.service import SavingValueService
+from api.summary.read_model import LedgerService, MonthlySummaryService
+from api.summary.service import SummaryService
+from api.utils import to_period
+
+
+TABLES = (
+    'user', 'api_token', 'expense_type', 'expense', 'income_type', 'income', 'saving_type', 'saving_value',
+    'monthly_summary', 'ledger_entry', 'saving_balance_snapshot',
+)
+
+
+def seed_other_users(users=40, types=6, years=(2023, 2024)):
+    """Give the tables the shape of a shared database, where each user owns
+    a small slice of every table, and refresh their statistics: on a few
+    rows MySQL scans whatever the indexes."""
+    db.session.execute(db.insert(User), [
+        {'username': f'seed{i}', '_password_hash': ''}
+        for i in range(users)
+    ])
+    user_ids = [id for id, in db.session.query(User.id).filter(User.username.like('seed%'))]
+    db.session.execute(db.insert(ApiToken), [
+        {'user_id': user_id, 'token_hash': User.hash_token(uuid.uuid4().hex)} for user_id in user_ids
+    ])
+
+    months = [(year, month) for year in years for month in range(1, 13)]
+    for type_model, value_model, status, extra in (
+        (ExpenseType, Expense, 'paid', {'recurrent': True, 'category': ExpenseCategoryEnum.CARD}),
+        (IncomeType, Income, 'received', {'recurrent': True}),
+        (SavingType, SavingValue, 'used', {'active': True}),
+    ):
+        db.session.execute(db.insert(type_model), [
+            dict(user_id=user_id, name=f'Seed {i}', base_value=100, **extra)
+            for user_id in user_ids for i in range(types)
+        ])
+        type_ids = [id for id, in db.session.query(type_model.id).filter(type_model.user_id.in_(user_ids))]
+        db.session.execute(db.insert(value_model), [
+            {'type_id': type_id, 'year': year, 'month': month, 'period': to_period(year, month),
+             'value': 100, status: month % 2 == 0}
+            for type_id in type_ids for year, month in months
+        ])
+    db.session.commit()
+
+    MonthlySummaryService.rebuild()
+    LedgerService.rebuild()
+    SavingBalanceService.rebuild()
+    db.session.execute(db.text(f"ANALYZE TABLE {', '.join(f'`{table}`' for table in TABLES)}"))
+
+
+def assert_uses_indexes(query_plan, statements):
+    for statement, parameters in statements:
+        if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            continue
+        for row in query_plan(statement, parameters):
+            # Derived tables and materialized subqueries are temporary: their
+            # source tables have rows of their own in the plan.
+            if row['table'] is None or row['table'].startswith('<'):
+                continue
+            assert row['type'] != 'ALL', f"Full scan of {row['table']} in: {statement}"
+            assert row['key'] is not None, f"No index used on {row['table']} in: {statement}"
+            assert row['key'] in (row['possible_keys'] or '').split(','), statement
+
+
+class TestQueryPlans:
+    def _populate(
+        self,
+        user,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        income_factory,
+        saving_type_factory,
+        saving_value_factory
+    ):
+        for month in range(1, 13):
+            expense_type = expense_type_factory.create(
+                recurrent=True,
+                category=ExpenseCategoryEnum.CARD,
+                base_value=100,
+                user_id=user.id
+            )
+            expense_factory.create(type_id=expense_type.id, month=month, year=2024)
+
+            income_type = income_type_factory.create(recurrent=True, user_id=user.id)
+            income_factory.create(type_id=income_type.id, month=month, year=2024)
+
+            saving_type = saving_type_factory.create(user_id=user.id)
+            saving_value_factory.create(type_id=saving_type.id, month=month, year=2024)
+
+    def test_service_queries_use_indexes(
+        self,
+        client,
+        user_factory,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        income_factory,
+        saving_type_factory,
+        saving_value_factory,
+        query_counter,
+        query_plan
+    ):
+        user = user_factory.create()
+        self._populate(
+            user,
+            expense_type_factory,
+            expense_factory,
+            income_type_factory,
+            income_factory,
+            saving_type_factory,
+            saving_value_factory
+        )
+        seed_other_users()
+        expense_type = expense_type_factory.create(recurrent=True, base_value=100, user_id=user.id)
+
+        with query_counter as counter:
+            ExpenseService.get_expense_list(month=9, year=2024, user_id=user.id)
+            ExpenseService.get_expense_list(month=9, year=2024, user_id=user.id, category='card')
+            ExpenseTypeService.update(expense_type.id, {'base_value': 200}, user_id=user.id)
+            IncomeService.get_incomes_list(year=2024, month=9, user_id=user.id)
+            SavingValueService.get_savings_summary_list(year=2024, month=9, user_id=user.id)
+            SavingValueService.get_unused_by_date(year=2024, month=9, user_id=user.id)
+            SavingValueService.get_all_by_date(year=2024, month=9, user_id=user.id)
+            ExpenseService.get_page(user_id=user.id, limit=2)
+            SavingValueService.get_page(user_id=user.id, limit=2)
+            AuthService.get_by_token_hash(User.hash_token(user.token))
+
+        assert_uses_indexes(query_plan, counter.statements)
+
+    def test_summary_queries_use_indexes(
+        self,
+        client,
+        user_factory,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        income_factory,
+        saving_type_factory,
+        saving_value_factory,
+        query_counter,
+        query_plan
+    ):
+        user = user_factory.create()
+        self._populate(
+            user,
+            expense_type_factory,
+            expense_factory,
+            income_type_factory,
+            income_factory,
+            saving_type_factory,
+            saving_value_factory
+        )
+        seed_other_users()
+
+        with query_counter as counter:
+            SummaryService.get_summary(year=2024, month=9, user_id=user.id)
+            SummaryService.get_summary_list(year=2024, month=9, user_id=user.id)
+            SummaryService.get_summary_range(
+                from_year=2024, from_month=1, to_year=2024, to_month=12, user_id=user.id
+            )
+            SummaryService.get_forecast(months=12, user_id=user.id, year=2024, month=6)
+            SavingValueService.get_savings_summary_list(year=2024, month=9, user_id=user.id)
+
+        assert counter.statements
+        assert_uses_indexes(query_plan, counter.statements)
+
+    def test_ledger_month_reads_the_primary_key(
+        self,
+        client,
+        user_factory,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        income_factory,
+        saving_type_factory,
+        saving_value_factory,
+        query_counter,
+        query_plan
+    ):
+        user = user_factory.create()
+        self._populate(
+            user,
+            expense_type_factory,
+            expense_factory,
+            income_type_factory,
+            income_factory,
+            saving_type_factory,
+            saving_value_factory
+        )
+        seed_other_users()
+
+        with query_counter as counter:
+            LedgerService.get_month(user.id, 2024, 9)
+
+        (statement, parameters), = counter.statements
+        (row,) = query_plan(statement, parameters)
+        assert row['key'] == 'PRIMARY'
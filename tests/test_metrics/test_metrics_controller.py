@@ -0,0 +1,28 @@
+from flask import url_for
+
+from api.metrics.controller import CacheMetricsResource
+from api.summary.controller import SummaryResource
+
+
+class TestCacheMetricsResource:
+    def test_get(self, client, user_factory):
+        user = user_factory.create()
+        for _ in range(2):
+            client.get(
+                url_for(SummaryResource.endpoint, year=2024, month=9),
+                headers={'x-api-key': user.token}
+            )
+
+        result = client.get(url_for(CacheMetricsResource.endpoint), headers={'x-api-key': user.token})
+        result_json = result.get_json()
+
+        assert result.status_code == 200
+        assert result_json['summary']['hits'] == 1
+        assert result_json['summary']['misses'] == 1
+        assert result_json['identity']['hits'] >= 2
+        assert set(result_json['identity']) == {'hits', 'misses', 'hitRatio', 'staleHits', 'evictions', 'entries'}
+
+    def test_get_unauthenticated(self, client):
+        result = client.get(url_for(CacheMetricsResource.endpoint))
+
+        assert result.status_code == 401
@@ -7,6 +7,7 @@ from api.savings.controller import (
     SavingValueIdResource,
     SavingSummaryResource
 )
+from api.savings.model import SavingValue
 
 
 class TestSavingTypeResource:
@@ -14,7 +15,7 @@ class TestSavingTypeResource:
         user = user_factory.create()
 
         response = client.get(
-            url_for(SavingTypeResource.endpoint),
+            url_for(SavingTypeResource.endpoint, all='true'),
             headers={'x-api-key': user.token}
         )
 
@@ -22,12 +23,12 @@ class TestSavingTypeResource:
         assert response.get_json() == []
 
     
-    def test_get_with_result(self, client, saving_type_factory):
+    def test_get_with_result(self, client, saving_type_factory, user_factory):
         saving_type = saving_type_factory.create()
 
         response = client.get(
-            url_for(SavingTypeResource.endpoint),
-            headers={'x-api-key': saving_type.user.token}
+            url_for(SavingTypeResource.endpoint, all='true'),
+            headers={'x-api-key': user_factory.issue_token(saving_type.user)}
         )
         response_json = response.get_json()
 
@@ -35,6 +36,22 @@ class TestSavingTypeResource:
         assert len(response_json) == 1
         assert response_json[0]["id"] == saving_type.id
 
+    def test_get_pages(self, client, saving_type_factory, user_factory):
+        user = user_factory.create()
+        saving_types = [saving_type_factory.create(user_id=user.id) for _ in range(3)]
+
+        first = client.get(
+            url_for(SavingTypeResource.endpoint, limit=2),
+            headers={'x-api-key': user.token}
+        ).get_json()
+        second = client.get(
+            url_for(SavingTypeResource.endpoint, limit=2, cursor=first['nextCursor']),
+            headers={'x-api-key': user.token}
+        ).get_json()
+
+        assert [item['id'] for item in first['items'] + second['items']] == [t.id for t in saving_types]
+        assert second['nextCursor'] is None
+
     def test_post(self, client, user_factory):
         user = user_factory.create()
 
@@ -67,12 +84,12 @@ class TestSavingTypeIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Saving Type not found'}
 
-    def test_get_with_result(self, client, saving_type_factory):
+    def test_get_with_result(self, client, saving_type_factory, user_factory):
         saving_type = saving_type_factory.create()
 
         response = client.get(
             url_for(SavingTypeIdResource.endpoint, typeId=saving_type.id),
-            headers={'x-api-key': saving_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(saving_type.user)}
         )
         response_json = response.get_json()
 
@@ -98,7 +115,7 @@ class TestSavingTypeIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Saving Type not found'}
 
-    def test_put_success(self, client, saving_type_factory):
+    def test_put_success(self, client, saving_type_factory, user_factory):
         saving_type = saving_type_factory.create()
         payload = {
             "name": 'Edited Saving Type',
@@ -108,7 +125,7 @@ class TestSavingTypeIdResource:
         response = client.put(
             url_for(SavingTypeIdResource.endpoint, typeId=saving_type.id),
             json=payload,
-            headers={'x-api-key': saving_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(saving_type.user)}
         )
         response_json = response.get_json()
 
@@ -127,12 +144,12 @@ class TestSavingTypeIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Saving Type not found'}
 
-    def test_delete_non_existent(self, client, saving_type_factory):
+    def test_delete_non_existent(self, client, saving_type_factory, user_factory):
         saving_type = saving_type_factory.create()
 
         response = client.delete(
             url_for(SavingTypeIdResource.endpoint, typeId=saving_type.id),
-            headers={'x-api-key': saving_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(saving_type.user)}
         )
 
         assert response.status_code == 204
@@ -143,7 +160,7 @@ class TestSavingValueResource:
         user = user_factory.create()
 
         response = client.get(
-            url_for(SavingValueResource.endpoint),
+            url_for(SavingValueResource.endpoint, all='true'),
             headers={'x-api-key': user.token}
         )
 
@@ -151,12 +168,12 @@ class TestSavingValueResource:
         assert response.get_json() == []
 
     
-    def test_get_with_result(self, client, saving_value_factory):
+    def test_get_with_result(self, client, saving_value_factory, user_factory):
         saving_value = saving_value_factory.create()
 
         response = client.get(
-            url_for(SavingValueResource.endpoint),
-            headers={'x-api-key': saving_value.user.token}
+            url_for(SavingValueResource.endpoint, all='true'),
+            headers={'x-api-key': user_factory.issue_token(saving_value.user)}
         )
         response_json = response.get_json()
 
@@ -164,7 +181,7 @@ class TestSavingValueResource:
         assert len(response_json) == 1
         assert response_json[0]["id"] == saving_value.id
 
-    def test_post(self, client, saving_type_factory):
+    def test_post(self, client, saving_type_factory, user_factory):
         saving_type = saving_type_factory.create()
         payload = {
             'value': 100,
@@ -177,7 +194,7 @@ class TestSavingValueResource:
         response = client.post(
             url_for(SavingValueResource.endpoint), 
             json=payload,
-            headers={'x-api-key': saving_type.user.token}
+            headers={'x-api-key': user_factory.issue_token(saving_type.user)}
         )
         response_json = response.get_json()
 
@@ -189,6 +206,26 @@ class TestSavingValueResource:
         assert response_json["typeId"] == saving_type.id
         assert response_json["used"] == False
 
+    def test_post_other_users_type(self, client, saving_type_factory, user_factory):
+        saving_type = saving_type_factory.create()
+        payload = {
+            'value': 100,
+            'month': 9,
+            'year': 2024,
+            'typeId': saving_type.id,
+            'used': False
+        }
+
+        response = client.post(
+            url_for(SavingValueResource.endpoint),
+            json=payload,
+            headers={'x-api-key': user_factory.create().token}
+        )
+
+        assert response.status_code == 404
+        assert response.get_json() == {"code": 404, "message": "Saving Type not found"}
+        assert SavingValue.query.filter_by(type_id=saving_type.id).count() == 0
+
 
 class TestSavingValueIdResource:
     def test_get_empty_result(self, client, user_factory):
@@ -202,12 +239,17 @@ class TestSavingValueIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Saving Value not found'}
 
-    def test_get_with_result(self, client, saving_value_factory):
+    def test_get_unauthenticated(self, client):
+        response = client.get(url_for(SavingValueIdResource.endpoint, id=1))
+
+        assert response.status_code == 401
+
+    def test_get_with_result(self, client, saving_value_factory, user_factory):
         saving_value = saving_value_factory.create()
 
         response = client.get(
             url_for(SavingValueIdResource.endpoint, id=saving_value.id),
-            headers={'x-api-key': saving_value.user.token}
+            headers={'x-api-key': user_factory.issue_token(saving_value.user)}
         )
         response_json = response.get_json()
 
@@ -236,7 +278,7 @@ class TestSavingValueIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Saving Value not found'}
 
-    def test_put_success(self, client, saving_value_factory):
+    def test_put_success(self, client, saving_value_factory, user_factory):
         saving_value = saving_value_factory.create()
         payload = {
             "value": 500,
@@ -246,7 +288,7 @@ class TestSavingValueIdResource:
         response = client.put(
             url_for(SavingValueIdResource.endpoint, id=saving_value.id),
             json=payload,
-            headers={'x-api-key': saving_value.user.token}
+            headers={'x-api-key': user_factory.issue_token(saving_value.user)}
         )
         response_json = response.get_json()
 
@@ -265,18 +307,23 @@ class TestSavingValueIdResource:
         assert response.status_code == 404
         assert response.get_json() == {'code': 404, 'message': 'Saving Value not found'}
 
-    def test_delete_non_existent(self, client, saving_value_factory):
+    def test_delete_non_existent(self, client, saving_value_factory, user_factory):
         saving_value = saving_value_factory.create()
 
         response = client.delete(
             url_for(SavingValueIdResource.endpoint, id=saving_value.id),
-            headers={'x-api-key': saving_value.user.token}
+            headers={'x-api-key': user_factory.issue_token(saving_value.user)}
         )
 
         assert response.status_code == 204
 
 
 class TestSavingSummaryResource:
+    def test_get_unauthenticated(self, client):
+        response = client.get(url_for(SavingSummaryResource.endpoint, year=2024, month=9))
+
+        assert response.status_code == 401
+
     def test_get_empty_result(self, client, user_factory):
         user = user_factory.create()
 
@@ -0,0 +1,102 @@
+import pytest
+
+from sqlalchemy.exc import OperationalError
+
+from database import db
+
+from api.savings.model import SavingBalanceSnapshot
+from api.savings.read_model import SavingBalanceService
+from api.savings.service import SavingValueService
+from api.summary.cache import staleness_notice
+
+
+def snapshots(type_id):
+    return [
+        (snapshot.period, float(snapshot.used_total), float(snapshot.unused_total), float(snapshot.month_unused))
+        for snapshot in SavingBalanceSnapshot.query.filter(
+            SavingBalanceSnapshot.type_id == type_id
+        ).order_by(SavingBalanceSnapshot.period)
+    ]
+
+
+class TestSavingBalanceService:
+    def test_writes_keep_snapshots_up_to_date(self, client, saving_type_factory, user_factory):
+        user = user_factory.create()
+        saving_type = saving_type_factory.create(user_id=user.id)
+        data = {'type_id': saving_type.id, 'year': 2024, 'used': False}
+
+        SavingValueService.create({**data, 'month': 10, 'value': 1000}, user_id=user.id)
+        saving = SavingValueService.create({**data, 'month': 8, 'value': 300}, user_id=user.id)
+        SavingValueService.create({**data, 'month': 9, 'value': 100, 'used': True}, user_id=user.id)
+        assert snapshots(saving_type.id) == [
+            (24296, 0, 300, 300),
+            (24297, 100, 300, 0),
+            (24298, 100, 1300, 1000),
+        ]
+
+        SavingValueService.update(saving.id, {'value': 200}, user_id=user.id)
+        assert SavingBalanceService.get_balance(saving_type.id, 2024, 9) == 100
+        assert SavingBalanceService.get_balance(saving_type.id, 2024, 12) == 1100
+
+        SavingValueService.delete(saving.id, user_id=user.id)
+        assert SavingBalanceService.get_balance(saving_type.id, 2024, 12) == 900
+        assert SavingBalanceService.check() == []
+
+    def test_zero_values_get_a_snapshot(self, client, saving_type_factory, user_factory):
+        user = user_factory.create()
+        saving_type = saving_type_factory.create(user_id=user.id)
+        data = {'type_id': saving_type.id, 'year': 2024, 'used': False}
+
+        SavingValueService.create({**data, 'month': 8, 'value': 300}, user_id=user.id)
+        SavingValueService.create({**data, 'month': 9, 'value': 0}, user_id=user.id)
+
+        assert snapshots(saving_type.id) == [(24296, 0, 300, 300), (24297, 0, 300, 0)]
+        assert SavingBalanceService.check() == []
+
+    def test_apply_delta_locks_the_previous_snapshot(self, client, saving_value_factory):
+        saving_value = saving_value_factory.create(value=100, used=False, year=2024, month=9)
+        type_id = saving_value.type_id
+
+        SavingBalanceService.apply_delta(type_id, 2024, 10, unused_total=50)
+
+        # The September snapshot is only read, to start October's from.
+        with db.engine.connect() as other:
+            with pytest.raises(OperationalError):
+                other.execute(
+                    db.text(
+                        'SELECT type_id FROM saving_balance_snapshot'
+                        ' WHERE type_id = :type_id AND period = :period FOR UPDATE NOWAIT'
+                    ),
+                    {'type_id': type_id, 'period': 24297}
+                )
+        db.session.rollback()
+
+    def test_get_balance_is_one_statement(
+        self, client, saving_type_factory, saving_value_factory, query_counter
+    ):
+        saving_type = saving_type_factory.create()
+        for month in range(1, 13):
+            saving_value_factory.create(value=100, used=False, type_id=saving_type.id, year=2024, month=month)
+
+        with query_counter as counter:
+            result = SavingBalanceService.get_balance(saving_type.id, 2025, 1)
+
+        assert counter.count == 1
+        assert result == 1200
+
+    def test_check_snapshots(self, client, saving_value_factory, runner):
+        saving_value = saving_value_factory.create(value=100, used=False, year=2024, month=9)
+        SavingBalanceSnapshot.query.update({'unused_total': 50})
+        db.session.commit()
+
+        result = runner.invoke(args=['savings', 'check-snapshots'])
+
+        assert result.exit_code == 1
+        assert '1 inconsistent saving balance snapshots.' in result.output
+
+        result = runner.invoke(args=['savings', 'check-snapshots', '--rebuild'])
+
+        assert result.exit_code == 0
+        assert 'Rebuilt 1 saving balance snapshots.' in result.output
+        assert staleness_notice() in result.output
+        assert snapshots(saving_value.type_id) == [(24297, 0, 100, 100)]
@@ -1,13 +1,19 @@
 import pytest
 
+from sqlalchemy.exc import OperationalError
+
+from database import db
+
 from api.savings.service import (
     SavingTypeService,
     SavingValueService
 )
 from api.savings.model import (
+    SavingBalanceSnapshot,
     SavingType,
     SavingValue
 )
+from api.savings.schema import SavingValueReturnSchema
 from api.savings.exceptions import (
     SavingTypeNotFoundException,
     SavingValueNotFoundException
@@ -107,6 +113,17 @@ class TestSavingTypeService:
         with pytest.raises(SavingTypeNotFoundException):
             SavingTypeService.get_one(saving_type.id, user_id=saving_type.user_id)
 
+    def test_delete_cascades_to_values_and_snapshots(self, client, saving_type_factory, saving_value_factory):
+        saving_type = saving_type_factory.create()
+        for month in range(1, 13):
+            saving_value_factory.create(type_id=saving_type.id, year=2024, month=month)
+        id = saving_type.id
+
+        SavingTypeService.delete(id, user_id=saving_type.user_id)
+
+        assert SavingValue.query.filter(SavingValue.type_id == id).count() == 0
+        assert SavingBalanceSnapshot.query.filter(SavingBalanceSnapshot.type_id == id).count() == 0
+
 
 class TestSavingValueService:
     def test_get_all_empty_result(self, client, user_factory):
@@ -123,6 +140,29 @@ class TestSavingValueService:
 
         assert saving_value in result
     
+    def test_lists_load_their_types_eagerly(self, client, saving_type_factory, user_factory, query_counter):
+        user = user_factory.create()
+        for i in range(10):
+            saving_type = saving_type_factory.create(name=f'Saving {i}', user_id=user.id)
+            db.session.add_all(
+                SavingValue(type_id=saving_type.id, value=10, year=2024, month=9, used=bool(j % 2))
+                for j in range(100)
+            )
+        db.session.commit()
+        db.session.expunge_all()
+        user_id = user.id
+        schema = SavingValueReturnSchema(many=True)
+
+        with query_counter as counter:
+            all_values = schema.dump(SavingValueService.get_all(user_id=user_id))
+            by_date = schema.dump(SavingValueService.get_all_by_date(year=2024, month=9, user_id=user_id))
+            unused = schema.dump(SavingValueService.get_unused_by_date(year=2024, month=9, user_id=user_id))
+
+        assert counter.count == 3
+        assert len(all_values) == len(by_date) == 1000
+        assert len(unused) == 500
+        assert {item['typeName'] for item in all_values} == {f'Saving {i}' for i in range(10)}
+
     def test_get_one_non_existent(self, client, saving_value_factory):
         saving_value = saving_value_factory.create()
 
@@ -146,7 +186,7 @@ class TestSavingValueService:
             'used': False
         }
 
-        result = SavingValueService.create(data)
+        result = SavingValueService.create(data, user_id=saving_type.user_id)
 
         assert isinstance(result, SavingValue)
     
@@ -172,6 +212,18 @@ class TestSavingValueService:
 
         assert result.value == 500
         assert result.used == True
+
+    def test_get_one_for_update_locks_the_value(self, client, saving_value_factory):
+        saving_value = saving_value_factory.create()
+
+        SavingValueService.get_one(saving_value.id, user_id=saving_value.user_id, for_update=True)
+
+        with db.engine.connect() as other:
+            with pytest.raises(OperationalError):
+                other.execute(
+                    db.text('SELECT id FROM saving_value WHERE id = :id FOR UPDATE NOWAIT'), {'id': saving_value.id}
+                )
+        db.session.rollback()
     
     def test_delete_non_existent(self, client, saving_value_factory):
         saving_value = saving_value_factory.create()
@@ -190,51 +242,6 @@ class TestSavingValueService:
         with pytest.raises(SavingValueNotFoundException):
             SavingValueService.get_one(saving_value.id, user_id=saving_value.user_id)
 
-    def test__get_unused_by_type_and_date(self, client, saving_type_factory, saving_value_factory):
-        saving_type = saving_type_factory.create()
-        used_saving_value = saving_value_factory.create(
-            value=100, used=True, type_id=saving_type.id, year=2024, month=9
-        )    
-        used_saving_value_different_month = saving_value_factory.create(
-            value=100, used=True, type_id=saving_type.id, year=2024, month=10
-        )  
-        unused_saving_value = saving_value_factory.create(
-            value=200, used=False, type_id=saving_type.id, year=2024, month=9
-        )    
-          
-        unused_saving_value_different_month = saving_value_factory.create(
-            value=200, used=False, type_id=saving_type.id, year=2024, month=10
-        )     
-
-        result = SavingValueService._get_unused_by_type_and_date(type_id=saving_type.id, year=2024, month=10)
-
-        assert used_saving_value not in result
-        assert unused_saving_value in result
-        assert unused_saving_value_different_month not in result
-        assert used_saving_value_different_month not in result
-
-    def test__get_used_by_type_and_date(self, client, saving_type_factory, saving_value_factory):
-        saving_type = saving_type_factory.create()
-        used_saving_value = saving_value_factory.create(
-            value=100, used=True, type_id=saving_type.id, year=2024, month=9
-        )    
-        used_saving_value_different_month = saving_value_factory.create(
-            value=100, used=True, type_id=saving_type.id, year=2024, month=10
-        )  
-        unused_saving_value = saving_value_factory.create(
-            value=200, used=False, type_id=saving_type.id, year=2024, month=9
-        )    
-          
-        unused_saving_value_different_month = saving_value_factory.create(
-            value=200, used=False, type_id=saving_type.id, year=2024, month=10
-        )     
-        result = SavingValueService._get_used_by_type_and_date(type_id=saving_type.id, year=2024, month=10)
-
-        assert unused_saving_value not in result
-        assert used_saving_value in result
-        assert unused_saving_value_different_month not in result
-        assert used_saving_value_different_month in result
-
     def test__get_balance_by_type_and_date(self, client, saving_type_factory, saving_value_factory):
         saving_type = saving_type_factory.create()
         saving_value_factory.create(value=100, used=True, type_id=saving_type.id, year=2024, month=9)    
@@ -259,6 +266,29 @@ class TestSavingValueService:
         assert result[0]['name'] == saving_type.name
         assert result[0]['balance'] == 100
 
+    def test_get_savings_summary_list_is_one_statement(
+        self, client, saving_type_factory, saving_value_factory, user_factory, query_counter
+    ):
+        user = user_factory.create()
+        for i in range(5):
+            saving_type = saving_type_factory.create(user_id=user.id, name=f'Saving {i}')
+            saving_value_factory.create(value=100, used=True, type_id=saving_type.id, year=2024, month=9)
+            saving_value_factory.create(value=300, used=False, type_id=saving_type.id, year=2024, month=8)
+            saving_value_factory.create(value=50, used=False, type_id=saving_type.id, year=2024, month=9)
+            saving_value_factory.create(value=999, used=False, type_id=saving_type.id, year=2024, month=10)
+        empty = saving_type_factory.create(user_id=user.id, name='Empty')
+        user_id = user.id
+
+        with query_counter as counter:
+            result = SavingValueService.get_savings_summary_list(year=2024, month=9, user_id=user_id)
+
+        assert counter.count == 1
+        assert len(result) == 6
+        assert [item['balance'] for item in result[:5]] == [200] * 5
+        assert [item['current_month_value'] for item in result[:5]] == [50] * 5
+        assert result[5]['saving_type_id'] == empty.id
+        assert result[5]['balance'] == 0
+
     def test_get_unused_by_date(self, client, saving_value_factory):
         saving_value = saving_value_factory.create(year=2024, month=9, used=False)
 
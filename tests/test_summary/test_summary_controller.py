@@ -3,7 +3,9 @@ from flask import url_for
 from api.expenses.model import ExpenseCategoryEnum
 from api.summary.controller import (
     SummaryResource,
-    SummaryListResource
+    SummaryListResource,
+    SummaryRangeResource,
+    SummaryForecastResource
 )
 
 class TestSummaryResource:
@@ -146,3 +148,59 @@ class TestSummaryListResource:
 
         assert result.status_code == 200
         assert len(result_json) == 4
+
+
+class TestSummaryRangeResource:
+    def test_get(self, client, expense_type_factory, expense_factory, user_factory):
+        user = user_factory.create()
+        expense_type = expense_type_factory.create(recurrent=True, base_value=100, user_id=user.id)
+        expense_factory.create(type_id=expense_type.id, month=12, year=2024, value=150)
+
+        result = client.get(
+            url_for(SummaryRangeResource.endpoint, **{'from': '2024-11', 'to': '2025-02'}),
+            headers={'x-api-key': user.token}
+        )
+        result_json = result.get_json()
+
+        assert result.status_code == 200
+        assert [(item['year'], item['month']) for item in result_json] == [
+            (2024, 11), (2024, 12), (2025, 1), (2025, 2)
+        ]
+        assert [item['expensesTotal'] for item in result_json] == [100, 150, 100, 100]
+
+    def test_get_invalid_range(self, client, user_factory):
+        user = user_factory.create()
+
+        result = client.get(
+            url_for(SummaryRangeResource.endpoint, **{'from': '2025-02', 'to': '2024-11'}),
+            headers={'x-api-key': user.token}
+        )
+
+        assert result.status_code == 400
+
+
+class TestSummaryForecastResource:
+    def test_get(self, client, expense_type_factory, income_type_factory, user_factory):
+        user = user_factory.create()
+        expense_type_factory.create(recurrent=True, base_value=100, user_id=user.id)
+        income_type_factory.create(recurrent=True, base_value=250, user_id=user.id)
+
+        result = client.get(
+            url_for(SummaryForecastResource.endpoint, months=3),
+            headers={'x-api-key': user.token}
+        )
+        result_json = result.get_json()
+
+        assert result.status_code == 200
+        assert [item['balance'] for item in result_json] == [150] * 3
+        assert [item['runningBalance'] for item in result_json] == [150, 300, 450]
+
+    def test_get_invalid_months(self, client, user_factory):
+        user = user_factory.create()
+
+        result = client.get(
+            url_for(SummaryForecastResource.endpoint, months=0),
+            headers={'x-api-key': user.token}
+        )
+
+        assert result.status_code == 400
@@ -0,0 +1,134 @@
+from database import db
+
+from api.expenses.service import ExpenseService, ExpenseTypeService
+from api.incomes.service import IncomeService
+from api.savings.service import SavingValueService
+from api.summary.cache import staleness_notice
+from api.summary.model import MonthlySummary, SummaryCacheGeneration
+from api.summary.read_model import LedgerService, MonthlySummaryService
+from api.summary.service import SummaryService
+
+
+def totals(user_id, year, month):
+    summary = MonthlySummaryService.get(user_id, year, month)
+    values = (
+        summary.expenses_total, summary.incomes_total, summary.savings_total,
+        summary.paid_count, summary.received_count
+    )
+    return tuple(float(value) for value in values)
+
+
+class TestMonthlySummaryService:
+    def test_expense_writes_keep_summary_up_to_date(self, client, expense_type_factory):
+        expense_type = expense_type_factory.create(recurrent=True, base_value=100)
+        user_id = expense_type.user_id
+        data = {'type_id': expense_type.id, 'month': 9, 'year': 2024, 'value': 100, 'paid': False}
+
+        expense = ExpenseService.create(data, user_id=user_id)
+        assert totals(user_id, 2024, 9) == (100, 0, 0, 0, 0)
+
+        ExpenseService.create({**data, 'value': 150, 'paid': True}, user_id=user_id)
+        assert totals(user_id, 2024, 9) == (150, 0, 0, 1, 0)
+
+        ExpenseService.update(expense.id, {'value': 80, 'paid': False}, user_id=user_id)
+        assert totals(user_id, 2024, 9) == (80, 0, 0, 0, 0)
+
+        ExpenseService.delete(expense.id, user_id=user_id)
+        assert totals(user_id, 2024, 9) == (0, 0, 0, 0, 0)
+
+    def test_income_and_saving_writes_keep_summary_up_to_date(
+        self,
+        client,
+        income_type_factory,
+        saving_type_factory,
+        user_factory
+    ):
+        user = user_factory.create()
+        income_type = income_type_factory.create(user_id=user.id)
+        saving_type = saving_type_factory.create(user_id=user.id)
+
+        income = IncomeService.create({'type_id': income_type.id, 'month': 9, 'year': 2024, 'value': 1000, 'received': True}, user_id=user.id)
+        saving = SavingValueService.create({'type_id': saving_type.id, 'month': 9, 'year': 2024, 'value': 300, 'used': False}, user_id=user.id)
+        assert totals(user.id, 2024, 9) == (0, 1000, 300, 0, 1)
+
+        SavingValueService.update(saving.id, {'used': True}, user_id=user.id)
+        IncomeService.update(income.id, {'received': False}, user_id=user.id)
+        assert totals(user.id, 2024, 9) == (0, 1000, 0, 0, 0)
+
+    def test_type_writes_apply_grouped_deltas(self, client, expense_type_factory, expense_factory):
+        expense_type = expense_type_factory.create(recurrent=True, base_value=100)
+        user_id = expense_type.user_id
+        expense_factory.create(type_id=expense_type.id, month=1, year=2999, value=100)
+        expense_factory.create(type_id=expense_type.id, month=2, year=2999, value=100, paid=True)
+
+        ExpenseTypeService.update(expense_type.id, {'base_value': 250}, user_id=user_id)
+        assert totals(user_id, 2999, 1) == (250, 0, 0, 0, 0)
+        assert totals(user_id, 2999, 2) == (100, 0, 0, 1, 0)
+
+        ExpenseTypeService.delete(expense_type.id, user_id=user_id)
+        assert totals(user_id, 2999, 1) == (0, 0, 0, 0, 0)
+        assert totals(user_id, 2999, 2) == (0, 0, 0, 0, 0)
+
+    def test_rebuild(self, client, expense_factory, income_factory, runner):
+        expense = expense_factory.create(month=9, year=2024, value=100, paid=True)
+        income_factory.create(month=9, year=2024, value=1000)
+        MonthlySummary.query.delete()
+        db.session.commit()
+
+        result = runner.invoke(args=['summary', 'rebuild'])
+
+        assert result.exit_code == 0
+        assert 'Rebuilt 2 monthly summaries and 2 ledger entries.' in result.output
+        assert staleness_notice() in result.output
+        assert SummaryCacheGeneration.query.one().generation == 1
+        assert totals(expense.user_id, 2024, 9) == (100, 0, 0, 1, 0)
+
+
+class TestLedgerService:
+    def test_writes_keep_ledger_up_to_date(self, client, expense_type_factory):
+        expense_type = expense_type_factory.create(recurrent=True, base_value=100)
+        user_id = expense_type.user_id
+        expense = ExpenseService.create(
+            {'type_id': expense_type.id, 'month': 9, 'year': 2024, 'value': 100, 'paid': False},
+            user_id=user_id
+        )
+
+        ExpenseService.update(expense.id, {'paid': True}, user_id=user_id)
+        ExpenseTypeService.update(expense_type.id, {'name': 'Renamed'}, user_id=user_id)
+
+        entries = LedgerService.get_month(user_id, 2024, 9)
+        assert len(entries) == 1
+        assert entries[0].item_id == expense.id
+        assert entries[0].type_name == 'Renamed'
+        assert entries[0].status == True
+
+        ExpenseService.delete(expense.id, user_id=user_id)
+        assert LedgerService.get_month(user_id, 2024, 9) == []
+
+    def test_summary_list_is_one_statement(
+        self,
+        client,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        saving_type_factory,
+        saving_value_factory,
+        user_factory,
+        query_counter
+    ):
+        user = user_factory.create()
+        for i in range(10):
+            expense_type = expense_type_factory.create(recurrent=True, name=f'Type {i}', base_value=10, user_id=user.id)
+            if i % 2:
+                expense_factory.create(type_id=expense_type.id, month=9, year=2024, value=20)
+            income_type_factory.create(recurrent=True, name=f'Income {i}', base_value=100, user_id=user.id)
+        saving_type = saving_type_factory.create(user_id=user.id)
+        saving_value_factory.create(value=50, used=False, month=9, year=2024, type_id=saving_type.id)
+        user_id = user.id
+
+        with query_counter as counter:
+            result = SummaryService.get_summary_list(year=2024, month=9, user_id=user_id)
+
+        assert counter.count == 1
+        assert [item.model for item in result] == ['expense'] * 10 + ['income'] * 10 + ['saving']
+        assert sum(item.virtual for item in result) == 15
@@ -1,8 +1,18 @@
+import pytest
+import time
+
+from datetime import datetime
+from flask import g
 from mock import patch, Mock
 
-from api.expenses.model import ExpenseCategoryEnum
+from api.expenses.model import Expense, ExpenseCategoryEnum
 
+from api.expenses.service import ExpenseService, ExpenseTypeService
+from api.summary.cache import SUMMARY_LIST, bump_generation, max_staleness, summary_cache, ttls_for
+from api.summary.exceptions import InvalidSummaryRangeException
+from api.summary.read_model import MonthlySummaryService
 from api.summary.service import (
+    SUMMARY_FORECAST_MAX_MONTHS,
     SummaryService
 )
 
@@ -135,3 +145,226 @@ class TestSummaryService:
         result = SummaryService.get_summary_list(year=2024, month=9, user_id=user.id)
 
         assert len(result) == 4
+
+    def test_get_summary_single_statement(
+        self, 
+        client, 
+        expense_type_factory, 
+        income_type_factory,
+        saving_value_factory,
+        saving_type_factory,
+        user_factory,
+        query_counter
+    ):
+        user = user_factory.create()
+        for i in range(10):
+            expense_type_factory.create(recurrent=True, name=f'Type {i}', base_value=10, user_id=user.id)
+            income_type_factory.create(recurrent=True, name=f'Income {i}', base_value=100, user_id=user.id)
+        saving_type = saving_type_factory.create(user_id=user.id)
+        saving_value_factory.create(value=50, used=False, month=9, year=2024, type_id=saving_type.id)
+        user_id = user.id
+
+        with query_counter as counter:
+            result = SummaryService.get_summary(year=2024, month=9, user_id=user_id)
+
+        assert counter.count == 1
+        assert result['expenses_total'] == 150
+        assert result['incomes_total'] == 1000
+        assert result['balance'] == 850
+
+    def test_get_forecast_times_its_reads(self, client, expense_factory, income_factory, income_type_factory):
+        expense = expense_factory.create(month=9, year=2024, value=100, paid=True)
+        user = expense.user_id
+        income_type = income_type_factory.create(user_id=user)
+        income_factory.create(month=9, year=2024, value=1000, type_id=income_type.id)
+
+        result = SummaryService.get_forecast(months=1, user_id=user, year=2024, month=9)
+
+        assert result[0]['expenses_total'] == 100
+        assert result[0]['incomes_total'] == 1000
+        assert set(g.server_timings) == {'recurrent_types', 'summaries', 'overrides'}
+
+    def test_get_summary_is_cached(self, client, expense_factory, query_counter):
+        expense = expense_factory.create(month=9, year=2024, value=100)
+        user_id = expense.user_id
+        SummaryService.get_summary(year=2024, month=9, user_id=user_id)
+
+        with query_counter as counter:
+            result = SummaryService.get_summary(year=2024, month=9, user_id=user_id)
+
+        assert counter.count == 0
+        assert result['expenses_total'] == 100
+        assert summary_cache.stats()['hits'] == 1
+
+    def test_expense_update_invalidates_its_period(self, client, expense_factory):
+        expense = expense_factory.create(month=9, year=2024, value=100)
+        user_id = expense.user_id
+        SummaryService.get_summary(year=2024, month=9, user_id=user_id)
+        SummaryService.get_summary_list(year=2024, month=9, user_id=user_id)
+        SummaryService.get_summary(year=2024, month=10, user_id=user_id)
+
+        ExpenseService.update(expense.id, {'value': 150}, user_id=user_id)
+
+        assert summary_cache.stats()['entries'] == 1
+        assert SummaryService.get_summary(year=2024, month=9, user_id=user_id)['expenses_total'] == 150
+
+    def test_summary_computed_during_a_write_is_not_cached(self, client, expense_factory):
+        expense = expense_factory.create(month=9, year=2024, value=100)
+        user_id = expense.user_id
+        compute = SummaryService._compute_summary
+
+        def compute_then_write(**kwargs):
+            result = compute(**kwargs)
+            ExpenseService.update(expense.id, {'value': 150}, user_id=user_id)
+            return result
+
+        with patch.object(SummaryService, '_compute_summary', compute_then_write):
+            result = SummaryService.get_summary(year=2024, month=9, user_id=user_id)
+
+        assert result['expenses_total'] == 100
+        assert summary_cache.stats()['entries'] == 0
+        assert SummaryService.get_summary(year=2024, month=9, user_id=user_id)['expenses_total'] == 150
+
+    def test_type_update_invalidates_every_period(self, client, expense_type_factory):
+        expense_type = expense_type_factory.create(recurrent=True, base_value=100)
+        user_id = expense_type.user_id
+        SummaryService.get_summary(year=2024, month=9, user_id=user_id)
+        SummaryService.get_summary(year=2030, month=1, user_id=user_id)
+
+        ExpenseTypeService.update(expense_type.id, {'base_value': 200}, user_id=user_id)
+
+        assert summary_cache.stats()['entries'] == 0
+        assert SummaryService.get_summary(year=2030, month=1, user_id=user_id)['expenses_total'] == 200
+
+    def test_stale_summary_list_is_served_and_refreshed(self, client, expense_factory):
+        expense = expense_factory.create(month=9, year=2024, value=100)
+        user_id = expense.user_id
+        key = (user_id, 2024, 9, SUMMARY_LIST)
+        cached = SummaryService.get_summary_list(year=2024, month=9, user_id=user_id)
+        summary_cache.set(key, cached, stale_after=0)
+
+        result = SummaryService.get_summary_list(year=2024, month=9, user_id=user_id)
+
+        assert result is cached
+        for _ in range(100):
+            value, stale = summary_cache.lookup(key)
+            if not stale:
+                break
+            time.sleep(0.01)
+        assert not stale
+        assert value is not cached
+
+    def test_past_months_are_kept_longer(self, app):
+        past = ttls_for(2000, 1)
+        current = ttls_for(2999, 1)
+
+        assert past['stale_after'] == app.config['SUMMARY_CACHE_PAST_SOFT_TTL']
+        assert past['ttl'] == app.config['SUMMARY_CACHE_PAST_TTL']
+        assert current['stale_after'] == app.config['SUMMARY_CACHE_SOFT_TTL']
+        assert current['ttl'] == app.config['SUMMARY_CACHE_TTL']
+
+    def test_max_staleness_is_the_sync_interval(self, app):
+        assert max_staleness() == app.config['SUMMARY_CACHE_SYNC_INTERVAL']
+        assert ttls_for(2000, 1)['ttl'] > max_staleness()
+
+    def test_writes_from_other_processes_show_within_max_staleness(self, client, expense_factory):
+        expense = expense_factory.create(month=9, year=2024, value=100)
+        user_id = expense.user_id
+        SummaryService.get_summary(year=2024, month=9, user_id=user_id)
+
+        with patch.dict('api.summary.cache._sync', {'interval': 0.1}):
+            # As `flask summary rebuild` would, leaving this process' cache alone.
+            Expense.query.filter_by(id=expense.id).update({'value': 150})
+            MonthlySummaryService.rebuild(user_id=user_id)
+            bump_generation()
+
+            time.sleep(max_staleness())
+            assert SummaryService.get_summary(year=2024, month=9, user_id=user_id)['expenses_total'] == 150
+            # Until the generation changes again, the cache is kept.
+            Expense.query.filter_by(id=expense.id).update({'value': 200})
+            MonthlySummaryService.rebuild(user_id=user_id)
+            time.sleep(max_staleness())
+            assert SummaryService.get_summary(year=2024, month=9, user_id=user_id)['expenses_total'] == 150
+
+    def test_get_summary_range(
+        self,
+        client,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        saving_type_factory,
+        saving_value_factory,
+        user_factory,
+        query_counter
+    ):
+        user = user_factory.create()
+        ended = expense_type_factory.create(
+            recurrent=True, base_value=10, end_date=datetime(2024, 2, 15).date(), user_id=user.id
+        )
+        expense_factory.create(type_id=ended.id, month=1, year=2024, value=30)
+        income_type_factory.create(recurrent=True, base_value=100, user_id=user.id)
+        saving_type = saving_type_factory.create(user_id=user.id)
+        saving_value_factory.create(value=5, used=False, month=3, year=2024, type_id=saving_type.id)
+        user_id = user.id
+
+        with query_counter as counter:
+            result = SummaryService.get_summary_range(
+                from_year=2023, from_month=12, to_year=2024, to_month=3, user_id=user_id
+            )
+
+        assert counter.count == 1
+        assert [(item['year'], item['month']) for item in result] == [(2023, 12), (2024, 1), (2024, 2), (2024, 3)]
+        assert [item['expenses_total'] for item in result] == [10, 30, 10, 5]
+        assert [item['incomes_total'] for item in result] == [100] * 4
+
+    def test_get_summary_range_invalid(self, client):
+        with pytest.raises(InvalidSummaryRangeException):
+            SummaryService.get_summary_range(from_year=2024, from_month=2, to_year=2024, to_month=1, user_id=1)
+
+    def test_get_forecast(
+        self,
+        client,
+        expense_type_factory,
+        expense_factory,
+        income_type_factory,
+        saving_type_factory,
+        saving_value_factory,
+        user_factory,
+        query_counter
+    ):
+        user = user_factory.create()
+        ended = expense_type_factory.create(
+            recurrent=True, base_value=10, end_date=datetime(2024, 2, 15).date(), user_id=user.id
+        )
+        expense_factory.create(type_id=ended.id, month=1, year=2024, value=30)
+        income_type_factory.create(recurrent=True, base_value=100, user_id=user.id)
+        saving_type = saving_type_factory.create(user_id=user.id)
+        saving_value_factory.create(value=5, used=False, month=3, year=2024, type_id=saving_type.id)
+        user_id = user.id
+
+        with query_counter as counter:
+            result = SummaryService.get_forecast(months=4, user_id=user_id, year=2023, month=12)
+
+        assert counter.count == 3
+        assert [(item['year'], item['month']) for item in result] == [(2023, 12), (2024, 1), (2024, 2), (2024, 3)]
+        assert [item['expenses_total'] for item in result] == [10, 30, 10, 5]
+        assert [item['incomes_total'] for item in result] == [100] * 4
+        assert [item['running_balance'] for item in result] == [90, 160, 250, 345]
+
+    def test_get_forecast_reads_are_independent_of_the_window(
+        self, client, expense_type_factory, user_factory, query_counter
+    ):
+        user = user_factory.create()
+        expense_type_factory.create(recurrent=True, base_value=10, user_id=user.id)
+        user_id = user.id
+
+        with query_counter as counter:
+            result = SummaryService.get_forecast(months=SUMMARY_FORECAST_MAX_MONTHS, user_id=user_id)
+
+        assert counter.count == 3
+        assert len(result) == SUMMARY_FORECAST_MAX_MONTHS
+        assert result[-1]['running_balance'] == -10 * SUMMARY_FORECAST_MAX_MONTHS
+
+    def test_get_forecast_invalid(self, client):
+        with pytest.raises(InvalidSummaryRangeException):
+            SummaryService.get_forecast(months=SUMMARY_FORECAST_MAX_MONTHS + 1, user_id=1)